@@ -0,0 +1,111 @@
+"""
+Price alert API endpoints
+"""
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from app.models.alerts import AlertRule
+from app.schemas.requests import AlertRuleRequest
+from app.services.alert_engine import alert_engine
+from app.services.watchlist_poller import watchlist_poller
+from app.core.exceptions import InvalidRegionError
+from app.utils.sse import KEEPALIVE, sse_event
+
+router = APIRouter(prefix="/alerts", tags=["Alerts"])
+
+# Seconds between keep-alive comments on an idle stream
+_KEEPALIVE_INTERVAL = 15.0
+
+# Watchlist owner tag of items polled for alert rules
+_WATCH_OWNER = "alerts"
+
+
+@router.post("", response_model=AlertRule, status_code=201)
+async def create_alert(request: AlertRuleRequest):
+    """
+    Создать правило оповещения
+
+    - **region** / **item_id**: Предмет; он добавляется в watchlist, и его
+      книга лотов проверяется при каждом фоновом опросе
+    - **conditions**: Условия, должны выполняться все, например
+      `{"field": "unit_buyout_price", "op": "<", "value": 12000}` или
+      `{"field": "additional.qlt", "op": ">=", "value": 4}`
+    - **only_new**: Только лоты, выставленные после создания правила
+    """
+    try:
+        rule = alert_engine.add_rule(
+            request.region, request.item_id, request.conditions, request.only_new
+        )
+    except InvalidRegionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    watchlist_poller.add(rule.region, rule.item_id, owner=_WATCH_OWNER)
+    return rule
+
+
+@router.get("", response_model=list[AlertRule])
+async def list_alerts(
+    region: Optional[str] = Query(default=None, description="Фильтр по региону"),
+    item_id: Optional[str] = Query(default=None, description="Фильтр по предмету"),
+):
+    """Список правил оповещений"""
+    return alert_engine.list_rules(region, item_id)
+
+
+@router.get("/stats")
+async def get_alert_stats():
+    """Счётчики правил, срабатываний и очереди"""
+    return alert_engine.stats()
+
+
+@router.get("/stream")
+async def stream_alerts(
+    request: Request,
+    limit: Optional[int] = Query(
+        default=None, ge=1, description="Закрыть поток после N оповещений"
+    ),
+):
+    """
+    Поток срабатываний правил (Server-Sent Events)
+
+    Каждое срабатывание - событие `alert` с AlertMatch в data. Очередь
+    срабатываний одна: несколько потоков (и webhook) делят её между собой
+    """
+
+    async def events():
+        sent = 0
+        while limit is None or sent < limit:
+            if await request.is_disconnected():
+                break
+            match = await alert_engine.next_match(_KEEPALIVE_INTERVAL)
+            if match is None:
+                yield KEEPALIVE
+                continue
+            yield sse_event(match.model_dump_json(), event="alert")
+            sent += 1
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{rule_id}", response_model=AlertRule)
+async def get_alert(rule_id: str):
+    """Получить правило по ID"""
+    rule = alert_engine.get_rule(rule_id)
+    if rule is None:
+        raise HTTPException(status_code=404, detail=f"Alert rule '{rule_id}' not found")
+    return rule
+
+
+@router.delete("/{rule_id}")
+async def delete_alert(rule_id: str):
+    """Удалить правило; с последним правилом предмета снимается его опрос"""
+    rule = alert_engine.get_rule(rule_id)
+    if rule is None or not alert_engine.remove_rule(rule_id):
+        raise HTTPException(status_code=404, detail=f"Alert rule '{rule_id}' not found")
+    if not alert_engine.has_rules(rule.region, rule.item_id):
+        watchlist_poller.release(rule.region, rule.item_id, owner=_WATCH_OWNER)
+    return {"removed": True}
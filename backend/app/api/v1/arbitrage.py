@@ -0,0 +1,48 @@
+"""
+Cross-region arbitrage API endpoints
+"""
+
+from fastapi import APIRouter, Query
+from typing import Literal
+from app.models.arbitrage import ArbitrageResponse, ArbitrageScanStatus
+from app.services.arbitrage_scanner import arbitrage_scanner
+
+router = APIRouter(prefix="/arbitrage", tags=["Arbitrage"])
+
+
+@router.get("", response_model=ArbitrageResponse)
+async def get_arbitrage(
+    limit: int = Query(default=50, ge=1, le=1000, description="Количество (1-1000)"),
+    sort: Literal["spread", "spread_pct"] = Query(
+        default="spread", description="Сортировка: абсолютный или процентный спред"
+    ),
+    min_spread_pct: float = Query(
+        default=0, ge=0, description="Минимальный спред, % от цены покупки"
+    ),
+):
+    """
+    Предметы с наибольшим спредом между регионами
+
+    Спред - медиана недавних продаж в регионе продажи минус минимальная
+    цена выкупа в регионе покупки (цены за единицу). Результаты - из
+    последнего завершённого фонового прохода; пока его нет - частичные
+    результаты текущего (`partial: true`)
+    """
+    return arbitrage_scanner.get_opportunities(limit, sort, min_spread_pct)
+
+
+@router.get("/status", response_model=ArbitrageScanStatus)
+async def get_arbitrage_status():
+    """Прогресс фонового сканирования"""
+    return arbitrage_scanner.status()
+
+
+@router.post("/scan", response_model=ArbitrageScanStatus, status_code=202)
+async def start_arbitrage_scan():
+    """
+    Запустить проход сканирования в фоне
+
+    Если проход уже идёт, возвращается его состояние. Прерванный проход
+    продолжается с сохранённого места
+    """
+    return arbitrage_scanner.trigger()
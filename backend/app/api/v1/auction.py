@@ -2,21 +2,157 @@
 Auction API endpoints
 """
 
-from fastapi import APIRouter, Query, HTTPException
-from typing import Literal
+from fastapi import APIRouter, Query, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from datetime import datetime
+from typing import Any, Literal, Optional
 from app.models.auction import (
     AuctionLotsResponse,
     AuctionHistoryResponse,
+    AuctionBatchResponse,
+    RegionComparisonResponse,
+    StoredHistoryResponse,
+    CandlesResponse,
+    CandleInterval,
+    PriceStatsResponse,
+    LotEvent,
+    PriceAnomaly,
+    PriceBaseline,
     AuctionSortField,
     SortOrder,
 )
+from app.schemas.requests import AuctionBatchRequest
+from app.services.anomaly_detector import anomaly_detector
 from app.services.auction_service import auction_service
-from app.core.exceptions import StalcraftAPIError, InvalidRegionError
+from app.services.history_store import history_store
+from app.services.live_feed import live_feed
+from app.services.lot_diff import lot_tracker
+from app.services.stats_service import stats_service
+from app.services.watchlist_poller import watchlist_poller
+from app.core.exceptions import (
+    StalcraftAPIError,
+    InvalidRegionError,
+    SubscriberLimitError,
+)
+from app.config import settings
+from app.utils.sse import KEEPALIVE, sse_event
 
 router = APIRouter(prefix="/auction", tags=["Auction"])
 
 Region = Literal["eu", "ru", "na", "sea"]
 
+# Seconds between keep-alive comments on an idle live stream
+_KEEPALIVE_INTERVAL = 15.0
+
+
+@router.get(
+    "/cache/stats",
+    summary="Статистика кэша аукциона",
+    description="Счётчики hit/miss/eviction кэша ответов для настройки TTL",
+)
+async def get_cache_stats():
+    """Статистика кэша лотов и истории продаж"""
+    return auction_service.cache_stats()
+
+
+@router.get(
+    "/stream/stats",
+    summary="Статистика live-потоков",
+    description="Подписчики, разосланные сообщения и отключённые медленные клиенты",
+)
+async def get_stream_stats():
+    """Статистика live feed"""
+    return live_feed.stats()
+
+
+@router.get(
+    "/anomalies",
+    response_model=list[PriceAnomaly],
+    summary="Лоты с заниженной ценой",
+    description="Новые лоты, цена выкупа которых намного ниже нормальной цены предмета",
+)
+async def get_anomalies(
+    region: Optional[Region] = Query(default=None, description="Фильтр по региону"),
+    item_id: Optional[str] = Query(default=None, description="Фильтр по предмету"),
+    limit: int = Query(default=100, ge=1, le=1000, description="Количество (1-1000)"),
+):
+    """
+    Последние лоты с аномально низкой ценой (новые первыми)
+
+    Нормальная цена - EWMA цены за единицу по продажам предмета; лот
+    помечается, если его цена выкупа за единицу ниже на ANOMALY_THRESHOLD
+    отклонений. Проверяются новые лоты предметов из watchlist
+    """
+    return anomaly_detector.recent(region, item_id, limit)
+
+
+@router.get(
+    "/anomalies/stats",
+    summary="Статистика детектора аномалий",
+)
+async def get_anomaly_stats():
+    """Предметы с оценкой цены, учтённые продажи и проверенные лоты"""
+    return anomaly_detector.stats()
+
+
+@router.get(
+    "/watchlist",
+    summary="Состояние фонового опроса",
+    description="Предметы watchlist, их текущие интервалы опроса и бюджет запросов",
+)
+async def get_watchlist():
+    """Состояние watchlist poller"""
+    return watchlist_poller.stats()
+
+
+@router.post(
+    "/watchlist/{region}/{item_id}",
+    summary="Добавить предмет в watchlist",
+    description="Лоты предмета будут опрашиваться в фоне, кэш /lots - прогрет",
+)
+async def add_to_watchlist(region: Region, item_id: str):
+    """Добавить предмет в фоновый опрос"""
+    try:
+        return watchlist_poller.add(region, item_id).stats()
+    except InvalidRegionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete(
+    "/watchlist/{region}/{item_id}",
+    summary="Убрать предмет из watchlist",
+)
+async def remove_from_watchlist(region: Region, item_id: str):
+    """Убрать предмет из фонового опроса"""
+    if not watchlist_poller.remove(region, item_id):
+        raise HTTPException(status_code=404, detail="Item is not in the watchlist")
+    return {"removed": True}
+
+
+@router.get(
+    "/compare/{item_id}",
+    response_model=RegionComparisonResponse,
+    summary="Сравнить цены по регионам",
+    description="Минимальная цена выкупа, медиана недавних продаж и число лотов по всем регионам",
+)
+async def compare_regions(
+    item_id: str,
+    history_limit: int = Query(
+        default=100, ge=1, le=200, description="Количество недавних продаж (1-200)"
+    ),
+):
+    """
+    Сравнить цены предмета во всех регионах
+
+    - **item_id**: ID предмета
+    - **history_limit**: Сколько последних продаж учитывать в медиане
+
+    Цены - за единицу предмета. Ошибки отдельных регионов возвращаются
+    в поле `errors` региона
+    """
+    return await auction_service.compare_regions(item_id, history_limit)
+
 
 @router.get(
     "/{region}/{item_id}/lots",
@@ -51,16 +187,21 @@ async def get_auction_lots(
     - **sort**: Поле для сортировки
       (time_created, time_left, current_price, buyout_price)
     """
+    params: dict[str, Any] = dict(
+        region=region,
+        item_id=item_id,
+        additional=additional,
+        limit=limit,
+        offset=offset,
+        order=order,
+        sort=sort,
+    )
     try:
-        return await auction_service.get_lots(
-            region=region,
-            item_id=item_id,
-            additional=additional,
-            limit=limit,
-            offset=offset,
-            order=order,
-            sort=sort,
-        )
+        if settings.AUCTION_RESPONSE_MODE != "model":
+            # Fast path: pre-serialized JSON, no response_model re-validation
+            content = await auction_service.get_lots_json(**params)
+            return Response(content=content, media_type="application/json")
+        return await auction_service.get_lots(**params)
     except InvalidRegionError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except StalcraftAPIError as e:
@@ -93,15 +234,289 @@ async def get_auction_history(
     - **limit**: Количество записей в ответе (макс 200)
     - **offset**: Пропустить N записей (для пагинации)
     """
+    params: dict[str, Any] = dict(
+        region=region,
+        item_id=item_id,
+        additional=additional,
+        limit=limit,
+        offset=offset,
+    )
     try:
-        return await auction_service.get_history(
-            region=region,
-            item_id=item_id,
-            additional=additional,
-            limit=limit,
-            offset=offset,
+        if settings.AUCTION_RESPONSE_MODE != "model":
+            # Fast path: pre-serialized JSON, no response_model re-validation
+            content = await auction_service.get_history_json(**params)
+            return Response(content=content, media_type="application/json")
+        return await auction_service.get_history(**params)
+    except InvalidRegionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except StalcraftAPIError as e:
+        raise HTTPException(status_code=502, detail=f"Stalcraft API error: {str(e)}")
+
+
+@router.get(
+    "/{region}/{item_id}/history/stored",
+    response_model=StoredHistoryResponse,
+    summary="Сохранённая история продаж",
+    description="История продаж из локального хранилища (без ограничения в 200 записей)",
+)
+async def get_stored_history(
+    region: Region,
+    item_id: str,
+    since: Optional[datetime] = Query(default=None, description="Начало периода"),
+    until: Optional[datetime] = Query(
+        default=None, description="Конец периода (не включая)"
+    ),
+    limit: int = Query(
+        default=1000, ge=0, le=10000, description="Количество записей (0-10000)"
+    ),
+    refresh: bool = Query(default=True, description="Догрузить новые продажи"),
+):
+    """
+    Получить сохранённую историю продаж предмета
+
+    - **region**: Регион игры (EU, RU, NA, SEA)
+    - **item_id**: ID предмета (например, "y1q9")
+    - **since** / **until**: Период (ISO-8601)
+    - **limit**: Количество записей в ответе (новые первыми)
+    - **refresh**: Сначала догрузить продажи новее последней сохранённой
+    """
+    try:
+        return await history_store.get_history(
+            region, item_id, since=since, until=until, limit=limit, refresh=refresh
+        )
+    except InvalidRegionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except StalcraftAPIError as e:
+        raise HTTPException(status_code=502, detail=f"Stalcraft API error: {str(e)}")
+
+
+@router.get(
+    "/{region}/{item_id}/candles",
+    response_model=CandlesResponse,
+    summary="Свечи продаж (OHLC)",
+    description="Open/high/low/close, объём и VWAP продаж по интервалам 5m, 1h, 1d",
+)
+async def get_candles(
+    region: Region,
+    item_id: str,
+    interval: CandleInterval = Query(default="1h", description="Размер свечи"),
+    since: Optional[datetime] = Query(default=None, description="Начало периода"),
+    until: Optional[datetime] = Query(
+        default=None, description="Конец периода (не включая)"
+    ),
+    limit: int = Query(
+        default=500, ge=1, le=2000, description="Количество свечей (1-2000)"
+    ),
+):
+    """
+    Получить свечи продаж предмета
+
+    - **region**: Регион игры (EU, RU, NA, SEA)
+    - **item_id**: ID предмета (например, "y1q9")
+    - **interval**: 5m, 1h или 1d
+    - **since** / **until**: Период (ISO-8601)
+    - **limit**: Последние N свечей периода
+
+    Свечи строятся по сохранённой истории продаж; цены - за единицу предмета
+    """
+    try:
+        return await history_store.get_candles(
+            region, item_id, interval=interval, since=since, until=until, limit=limit
         )
     except InvalidRegionError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except StalcraftAPIError as e:
         raise HTTPException(status_code=502, detail=f"Stalcraft API error: {str(e)}")
+
+
+@router.get(
+    "/{region}/{item_id}/stats",
+    response_model=PriceStatsResponse,
+    summary="Статистика цен",
+    description="Медиана, перцентили, среднее, stddev, trimmed mean и гистограмма цен за единицу",
+)
+async def get_price_stats(
+    region: Region,
+    item_id: str,
+    since: Optional[datetime] = Query(
+        default=None, description="Начало периода (по умолчанию - 7 дней назад)"
+    ),
+    until: Optional[datetime] = Query(
+        default=None, description="Конец периода (не включая)"
+    ),
+    percentiles: list[float] = Query(
+        default=[5, 25, 75, 95], description="Перцентили (0-100)"
+    ),
+    trim: float = Query(
+        default=0.1, ge=0, lt=0.5, description="Доля отбрасываемых значений (0-0.5)"
+    ),
+    bins: int = Query(default=20, ge=1, le=200, description="Корзины гистограммы"),
+):
+    """
+    Получить статистику цен предмета
+
+    - **region**: Регион игры (EU, RU, NA, SEA)
+    - **item_id**: ID предмета (например, "y1q9")
+    - **since** / **until**: Период продаж (ISO-8601)
+    - **percentiles**: Перцентили, например `?percentiles=10&percentiles=90`
+    - **trim**: Доля самых низких и самых высоких цен, которые не учитываются
+      в trimmed mean
+    - **bins**: Количество корзин гистограммы распределения
+
+    Продажи берутся из локального хранилища истории, лоты - текущая книга
+    лотов. Все цены - за единицу предмета
+    """
+    if any(not 0 <= p <= 100 for p in percentiles):
+        raise HTTPException(
+            status_code=400, detail="Percentiles must be between 0 and 100"
+        )
+    try:
+        return await stats_service.get_stats(
+            region,
+            item_id,
+            since=since,
+            until=until,
+            percentiles=percentiles,
+            trim=trim,
+            bins=bins,
+        )
+    except InvalidRegionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except StalcraftAPIError as e:
+        raise HTTPException(status_code=502, detail=f"Stalcraft API error: {str(e)}")
+
+
+@router.get(
+    "/{region}/{item_id}/events",
+    response_model=list[LotEvent],
+    summary="События книги лотов",
+    description="Новые, выкупленные, истёкшие лоты и изменения цен (предметы из watchlist)",
+)
+async def get_lot_events(
+    region: Region,
+    item_id: str,
+    limit: int = Query(
+        default=100, ge=1, le=1000, description="Количество событий (1-1000)"
+    ),
+):
+    """
+    Получить последние изменения книги лотов
+
+    - **region**: Регион игры (EU, RU, NA, SEA)
+    - **item_id**: ID предмета (например, "y1q9")
+    - **limit**: Количество событий (новые первыми)
+
+    События вычисляются сравнением снимков книги лотов, поэтому доступны
+    только для предметов из watchlist
+    """
+    return lot_tracker.recent_events(region, item_id, limit)
+
+
+@router.get(
+    "/{region}/{item_id}/baseline",
+    response_model=PriceBaseline,
+    summary="Нормальная цена предмета",
+    description="Скользящая оценка цены за единицу, по которой ищутся аномалии",
+)
+async def get_price_baseline(region: Region, item_id: str):
+    """
+    Получить нормальную цену предмета
+
+    Оценка появляется после первой продажи, учтённой детектором (история
+    из локального хранилища или выкупленные лоты предметов из watchlist)
+    """
+    baseline = anomaly_detector.baseline(region, item_id)
+    if baseline is None:
+        raise HTTPException(status_code=404, detail="No sales observed for the item")
+    return baseline
+
+
+@router.get(
+    "/{region}/{item_id}/stream",
+    summary="Live-поток книги лотов",
+    description="Server-Sent Events: снимок книги лотов и её изменения после каждого фонового опроса",
+)
+async def stream_auction_lots(
+    request: Request,
+    region: Region,
+    item_id: str,
+    limit: Optional[int] = Query(
+        default=None, ge=1, description="Закрыть поток после N сообщений"
+    ),
+):
+    """
+    Подписаться на обновления книги лотов (Server-Sent Events)
+
+    - **region**: Регион игры (EU, RU, NA, SEA)
+    - **item_id**: ID предмета (например, "y1q9")
+
+    События потока:
+    - `snapshot` - AuctionLotsResponse (до 200 лотов, сначала новые):
+      сразу при подключении и после каждого изменения книги
+    - `events` - список LotEvent из того же опроса
+    - `error` - `{"detail": ...}`: upstream недоступен; после восстановления
+      снова приходит `snapshot`
+    - `evicted` - клиент не успевал читать поток и был отключён
+
+    Предмет добавляется в watchlist; все подписчики предмета делят один
+    фоновый цикл опроса
+    """
+    try:
+        subscriber = live_feed.subscribe(region, item_id)
+    except InvalidRegionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except SubscriberLimitError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    async def messages():
+        sent = 0
+        while limit is None or sent < limit:
+            if await request.is_disconnected():
+                break
+            message = await subscriber.next_message(_KEEPALIVE_INTERVAL)
+            if subscriber.evicted:
+                yield sse_event('{"reason": "slow consumer"}', event="evicted")
+                break
+            if message is None:
+                yield KEEPALIVE
+                continue
+            yield message
+            sent += 1
+
+    # Background task runs however the response ends, even before streaming
+    return StreamingResponse(
+        messages(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(live_feed.unsubscribe, subscriber),
+    )
+
+
+@router.post(
+    "/{region}/batch",
+    response_model=AuctionBatchResponse,
+    summary="Лоты и история для нескольких предметов",
+    description="Возвращает лоты и/или историю продаж для списка предметов одним запросом",
+)
+async def get_auction_batch(region: Region, request: AuctionBatchRequest):
+    """
+    Получить данные аукциона для нескольких предметов
+
+    - **region**: Регион игры (EU, RU, NA, SEA)
+    - **item_ids**: Список ID предметов
+    - **lots** / **history**: Какие данные загрузить
+    - **limit**: Количество записей на предмет (макс 200)
+
+    Ошибки отдельных предметов возвращаются в поле `errors` предмета
+    """
+    try:
+        return await auction_service.get_batch(
+            region=region,
+            item_ids=request.item_ids,
+            lots=request.lots,
+            history=request.history,
+            additional=request.additional,
+            limit=request.limit,
+        )
+    except InvalidRegionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
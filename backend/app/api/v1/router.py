@@ -3,13 +3,16 @@ Main API v1 router
 """
 
 from fastapi import APIRouter
-from app.api.v1 import auction, items
+from app.api.v1 import alerts, arbitrage, auction, items, sweeps
 
 api_router = APIRouter()
 
 # Include sub-routers
 api_router.include_router(auction.router)
 api_router.include_router(items.router)
+api_router.include_router(alerts.router)
+api_router.include_router(arbitrage.router)
+api_router.include_router(sweeps.router)
 
 
 @api_router.get("/")
@@ -17,5 +20,12 @@ async def api_root():
     """API v1 root endpoint"""
     return {
         "message": "SC-AUC-Monitoring API v1",
-        "endpoints": {"auction": "/auction", "items": "/items", "docs": "/api/docs"},
+        "endpoints": {
+            "auction": "/auction",
+            "items": "/items",
+            "alerts": "/alerts",
+            "arbitrage": "/arbitrage",
+            "sweeps": "/sweeps",
+            "docs": "/api/docs",
+        },
     }
@@ -0,0 +1,66 @@
+"""
+Market sweep API endpoints
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from typing import Literal, Optional
+from app.models.sweep import SweepStatus
+from app.services.market_sweep import market_sweeper
+from app.core.exceptions import InvalidRegionError
+
+router = APIRouter(prefix="/sweeps", tags=["Sweeps"])
+
+Region = Literal["eu", "ru", "na", "sea"]
+
+
+@router.post("/{region}", response_model=SweepStatus, status_code=202)
+async def start_sweep(
+    region: Region,
+    budget: Optional[int] = Query(
+        default=None, ge=1, description="Бюджет запросов (по умолчанию из настроек)"
+    ),
+    window: Optional[float] = Query(
+        default=None, gt=0, description="Временное окно, секунд"
+    ),
+):
+    """
+    Запустить проход по рынку региона в фоне
+
+    Лоты всех предметов индекса (realm региона) загружаются и прогревают
+    кэш /lots. Если проход по региону уже идёт, возвращается его состояние
+    """
+    try:
+        return market_sweeper.start_sweep(region, budget, window).status()
+    except InvalidRegionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("", response_model=list[SweepStatus])
+async def list_sweeps():
+    """Текущие и последние завершённые проходы"""
+    return [job.status() for job in reversed(market_sweeper.jobs.values())]
+
+
+@router.get("/{sweep_id}", response_model=SweepStatus)
+async def get_sweep(
+    sweep_id: str,
+    items: bool = Query(default=False, description="Включить результаты по предметам"),
+    failed_only: bool = Query(default=False, description="Только предметы с ошибками"),
+):
+    """Прогресс, бюджет и время запросов прохода"""
+    job = market_sweeper.get(sweep_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Sweep '{sweep_id}' not found")
+    status = job.status(include_items=items or failed_only)
+    if failed_only and status.items is not None:
+        status.items = [item for item in status.items if item.error]
+    return status
+
+
+@router.post("/{sweep_id}/cancel", response_model=SweepStatus)
+async def cancel_sweep(sweep_id: str):
+    """Отменить проход"""
+    job = await market_sweeper.cancel(sweep_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Sweep '{sweep_id}' not found")
+    return job.status()
@@ -2,9 +2,10 @@
 Base HTTP client utilities
 """
 
-import httpx
 from typing import Any
 
+from app.clients.http import http_pool
+
 
 class BaseHTTPClient:
     """
@@ -24,9 +25,8 @@ class BaseHTTPClient:
         """Базовый GET запрос"""
         url = f"{self.base_url}{endpoint}"
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url, headers=headers or {}, params=params or {}, timeout=self.timeout
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await http_pool.get(url).get(
+            url, headers=headers or {}, params=params or {}, timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
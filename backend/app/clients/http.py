@@ -0,0 +1,80 @@
+"""
+Shared HTTP connection pool for upstream hosts
+"""
+
+import importlib.util
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.config import settings
+
+
+class HTTPClientPool:
+    """
+    Пул HTTP клиентов - один httpx.AsyncClient на upstream host
+
+    Соединения (TCP + TLS) переиспользуются между запросами через keep-alive,
+    вместо нового handshake на каждый запрос
+    """
+
+    def __init__(self):
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    @staticmethod
+    def origin(url: str) -> str:
+        """scheme://host[:port] для URL"""
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    @staticmethod
+    def _http2_enabled() -> bool:
+        """HTTP/2 требует пакет h2 (httpx[http2])"""
+        if not settings.HTTP2_ENABLED:
+            return False
+        if importlib.util.find_spec("h2") is None:
+            print("⚠️  HTTP2_ENABLED=True, but 'h2' is not installed - using HTTP/1.1")
+            return False
+        return True
+
+    def _create_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+        return httpx.AsyncClient(limits=limits, http2=self._http2_enabled())
+
+    def get(self, url: str) -> httpx.AsyncClient:
+        """
+        Получить клиент для host из URL
+
+        Клиент создаётся лениво, поэтому пул работает и вне lifespan
+        (например, в тестах или скриптах)
+        """
+        origin = self.origin(url)
+        client = self._clients.get(origin)
+        if client is None or client.is_closed:
+            client = self._create_client()
+            self._clients[origin] = client
+        return client
+
+    async def startup(self, urls: list[str] | None = None):
+        """Заранее создать клиенты для известных upstream hosts"""
+        for url in urls or []:
+            self.get(url)
+
+    async def close(self):
+        """Закрыть все клиенты и их соединения"""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+    @property
+    def hosts(self) -> list[str]:
+        return list(self._clients.keys())
+
+
+# Singleton
+http_pool = HTTPClientPool()
@@ -4,6 +4,7 @@ Items Database Client - fetches item data from stalcraft-database GitHub reposit
 
 import httpx
 from app.config import settings
+from app.clients.resilience import resilient_get
 from app.models.items import Item, ItemName, ItemSearchResult
 from app.core.exceptions import ItemNotFoundError
 
@@ -67,34 +68,33 @@ class ItemsDatabaseClient:
         """
         url = self._get_item_url(realm, category, item_id)
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, timeout=10.0)
-                if response.status_code == 404:
-                    raise ItemNotFoundError(
-                        f"Item {item_id} not found in category {category}"
-                    )
-                response.raise_for_status()
-                data = response.json()
-
-                # Parse the item
-                item = Item(**data)
-
-                # Add display name and icon URL
-                item.display_name = self._extract_display_name(item.name)
-                item.icon_url = self._get_icon_url(realm, category, item_id)
-
-                return item
-            except httpx.HTTPStatusError as e:
-                if e.response.status_code == 404:
-                    raise ItemNotFoundError(
-                        f"Item {item_id} not found in category {category}"
-                    )
-                raise Exception(f"HTTP error fetching item: {str(e)}")
-            except Exception as e:
-                if isinstance(e, ItemNotFoundError):
-                    raise
-                raise Exception(f"Error fetching item: {str(e)}")
+        try:
+            response = await resilient_get(url, timeout=10.0)
+            if response.status_code == 404:
+                raise ItemNotFoundError(
+                    f"Item {item_id} not found in category {category}"
+                )
+            response.raise_for_status()
+            data = response.json()
+
+            # Parse the item
+            item = Item(**data)
+
+            # Add display name and icon URL
+            item.display_name = self._extract_display_name(item.name)
+            item.icon_url = self._get_icon_url(realm, category, item_id)
+
+            return item
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                raise ItemNotFoundError(
+                    f"Item {item_id} not found in category {category}"
+                )
+            raise Exception(f"HTTP error fetching item: {str(e)}")
+        except Exception as e:
+            if isinstance(e, ItemNotFoundError):
+                raise
+            raise Exception(f"Error fetching item: {str(e)}")
 
     async def list_category_items(
         self, category: str, realm: str = "ru"
@@ -113,35 +113,34 @@ class ItemsDatabaseClient:
         api_url = f"https://api.github.com/repos/{settings.GITHUB_DB_REPO}/contents/{realm}/items/{category}"
 
         items = []
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(api_url, timeout=10.0)
-                if response.status_code == 404:
-                    return []
-                response.raise_for_status()
-                files = response.json()
-
-                # Filter JSON files
-                for file in files:
-                    if file.get("name", "").endswith(".json"):
-                        item_id = file["name"][:-5]  # Remove .json extension
-                        try:
-                            # Fetch full item data
-                            item = await self.fetch_item(item_id, category, realm)
-                            items.append(
-                                ItemSearchResult(
-                                    id=item.id,
-                                    name=item.display_name or item.id,
-                                    category=category,
-                                    icon_url=item.icon_url,
-                                )
+        try:
+            response = await resilient_get(api_url, timeout=10.0)
+            if response.status_code == 404:
+                return []
+            response.raise_for_status()
+            files = response.json()
+
+            # Filter JSON files
+            for file in files:
+                if file.get("name", "").endswith(".json"):
+                    item_id = file["name"][:-5]  # Remove .json extension
+                    try:
+                        # Fetch full item data
+                        item = await self.fetch_item(item_id, category, realm)
+                        items.append(
+                            ItemSearchResult(
+                                id=item.id,
+                                name=item.display_name or item.id,
+                                category=category,
+                                icon_url=item.icon_url,
                             )
-                        except Exception:
-                            # Skip items that fail to fetch
-                            continue
-            except Exception:
-                # Return empty list if category listing fails
-                pass
+                        )
+                    except Exception:
+                        # Skip items that fail to fetch
+                        continue
+        except Exception:
+            # Return empty list if category listing fails
+            pass
 
         return items
 
@@ -0,0 +1,336 @@
+"""
+Client-side upstream rate limiting (token bucket + priority queue)
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any
+
+
+class Priority(IntEnum):
+    """Приоритет upstream запроса (меньше - раньше)"""
+
+    INTERACTIVE = 0
+    BACKGROUND = 10
+
+
+class SharedPriority:
+    """
+    Приоритет общего (single-flight) запроса: самый срочный из ожидающих
+
+    Присоединившийся запрос может только повысить приоритет, в том числе
+    уже стоящего в очереди token bucket и вложенных общих запросов
+    """
+
+    def __init__(self, priority: Priority):
+        self.priority = priority
+        self._queued: list[tuple["TokenBucket", asyncio.Future]] = []
+        self._nested: list["SharedPriority"] = []
+
+    def raise_to(self, priority: Priority) -> None:
+        if priority >= self.priority:
+            return
+        self.priority = priority
+        for bucket, future in self._queued:
+            bucket._promote(future, priority)
+        for nested in self._nested:
+            nested.raise_to(priority)
+
+
+_current_priority: ContextVar[Priority | SharedPriority] = ContextVar(
+    "upstream_priority", default=Priority.INTERACTIVE
+)
+
+
+@contextmanager
+def request_priority(priority: Priority) -> Iterator[None]:
+    """
+    Задать приоритет upstream запросов внутри блока
+
+    Пример (фоновая задача):
+        with request_priority(Priority.BACKGROUND):
+            await stalcraft_client.get_auction_lots(...)
+    """
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+@contextmanager
+def shared_priority() -> Iterator[SharedPriority]:
+    """
+    Выполнить блок с приоритетом, который могут повысить присоединившиеся
+
+    Используется SingleFlight: общий запрос идёт с приоритетом самого
+    срочного из ожидающих его, а не только того, кто его начал
+    """
+    outer = _current_priority.get()
+    shared = SharedPriority(current_priority())
+    if isinstance(outer, SharedPriority):
+        outer._nested.append(shared)
+    token = _current_priority.set(shared)
+    try:
+        yield shared
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> Priority:
+    value = _current_priority.get()
+    return value.priority if isinstance(value, SharedPriority) else value
+
+
+# Called on every upstream attempt made in the current context
+_attempt_observer: ContextVar[Callable[[], None] | None] = ContextVar(
+    "upstream_attempt_observer", default=None
+)
+
+
+@contextmanager
+def observe_upstream_attempts(observer: Callable[[], None]) -> Iterator[None]:
+    """
+    Вызывать observer на каждую upstream попытку внутри блока
+
+    Попытка - запрос, получивший токен rate limiter'а: повторы после ошибок
+    и 429 считаются отдельно; запросы, присоединившиеся к чужому
+    (single-flight) или отданные из кэша, - нет
+    """
+    token = _attempt_observer.set(observer)
+    try:
+        yield
+    finally:
+        _attempt_observer.reset(token)
+
+
+def notify_upstream_attempt() -> None:
+    observer = _attempt_observer.get()
+    if observer is not None:
+        observer()
+
+
+def _parse_float(value: str | None) -> float | None:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _reset_delay(value: float, wall_now: float) -> float:
+    """
+    Секунды до сброса лимита
+
+    Заголовок reset бывает как epoch (секунды или миллисекунды),
+    так и относительным количеством секунд
+    """
+    if value > 1e12:  # epoch milliseconds
+        return value / 1000 - wall_now
+    if value > 1e9:  # epoch seconds
+        return value - wall_now
+    return value
+
+
+class TokenBucket:
+    """
+    Token bucket с очередью ожидания по приоритету
+
+    Запрос ждёт свободный токен в очереди, а не получает 429.
+    Интерактивные запросы обслуживаются раньше фоновых,
+    внутри одного приоритета - в порядке поступления.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.capacity = float(max(burst, 1))
+        self.tokens = self.capacity
+        self._clock = clock
+        self._updated = clock()
+        self._paused_until = 0.0
+
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._dispatcher: asyncio.Task | None = None
+
+        # Counters
+        self.acquired = 0
+        self.waited = 0
+        self.throttled = 0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated
+        self._updated = now
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+
+    def _try_take(self) -> bool:
+        if self._clock() < self._paused_until:
+            return False
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def _delay(self) -> float:
+        """Сколько ждать до следующего токена"""
+        pause = self._paused_until - self._clock()
+        if pause > 0:
+            return pause
+        return max((1 - self.tokens) / self.rate, 0.001)
+
+    async def acquire(self, priority: Priority | None = None) -> None:
+        """Дождаться токена (приоритет по умолчанию - из контекста)"""
+        shared = None
+        if priority is None:
+            value = _current_priority.get()
+            if isinstance(value, SharedPriority):
+                shared = value
+            priority = current_priority()
+
+        if not self._waiters and self._try_take():
+            self.acquired += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._seq), future))
+        self.waited += 1
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        if shared is not None:
+            shared._queued.append((self, future))
+        try:
+            # Cancelled futures are skipped by the dispatcher
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted right before the cancellation (e.g. wait_for
+                # timeout): nobody will use the token, give it back
+                self._refund()
+            raise
+        finally:
+            if shared is not None:
+                shared._queued.remove((self, future))
+        self.acquired += 1
+
+    def _promote(self, future: asyncio.Future, priority: Priority) -> None:
+        """Повысить приоритет ожидающего в очереди запроса"""
+        for i, (current, seq, waiter) in enumerate(self._waiters):
+            if waiter is future:
+                if priority < current:
+                    self._waiters[i] = (int(priority), seq, waiter)
+                    heapq.heapify(self._waiters)
+                return
+
+    def _refund(self) -> None:
+        """Вернуть неиспользованный токен"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + 1)
+        if self._waiters and (self._dispatcher is None or self._dispatcher.done()):
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def _dispatch(self) -> None:
+        while self._waiters:
+            if self._waiters[0][2].done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._try_take():
+                await asyncio.sleep(self._delay())
+                continue
+            _, _, future = heapq.heappop(self._waiters)
+            future.set_result(None)
+
+    def pause(self, seconds: float) -> None:
+        """Приостановить выдачу токенов (например, после 429)"""
+        self._paused_until = max(self._paused_until, self._clock() + seconds)
+        self.tokens = 0
+        self.throttled += 1
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """
+        Подстроиться под rate-limit заголовки upstream
+
+        - X-RateLimit-Remaining ограничивает число доступных токенов
+        - при Remaining == 0 выдача токенов ставится на паузу до X-RateLimit-Reset
+        """
+        remaining = _parse_float(headers.get("x-ratelimit-remaining"))
+        if remaining is None:
+            return
+
+        self._refill()
+        self.tokens = min(self.tokens, remaining)
+        if remaining < 1:
+            reset = _parse_float(headers.get("x-ratelimit-reset"))
+            delay = _reset_delay(reset, time.time()) if reset is not None else 1.0
+            self.pause(max(delay, 0.0))
+
+    async def close(self) -> None:
+        """Остановить диспетчер и отменить ожидающие запросы"""
+        for _, _, future in self._waiters:
+            future.cancel()
+        self._waiters.clear()
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    def stats(self) -> dict[str, Any]:
+        self._refill()
+        return {
+            "rate": self.rate,
+            "tokens": round(self.tokens, 2),
+            "queued": self.queued,
+            "acquired": self.acquired,
+            "waited": self.waited,
+            "throttled": self.throttled,
+            "paused_for": round(max(self._paused_until - self._clock(), 0.0), 2),
+        }
+
+
+def retry_after_seconds(headers: Mapping[str, str], default: float = 1.0) -> float:
+    """Задержка из Retry-After / X-RateLimit-Reset (только секунды)"""
+    retry_after = _parse_float(headers.get("retry-after"))
+    if retry_after is not None:
+        return max(retry_after, 0.0)
+    reset = _parse_float(headers.get("x-ratelimit-reset"))
+    if reset is not None:
+        return max(_reset_delay(reset, time.time()), 0.0)
+    return default
+
+
+class RateLimiter:
+    """Реестр token bucket - по одному на host/token"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def bucket(self, key: str) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst)
+            self._buckets[key] = bucket
+        return bucket
+
+    def stats(self) -> dict[str, Any]:
+        return {key: bucket.stats() for key, bucket in self._buckets.items()}
@@ -0,0 +1,190 @@
+"""
+Retries with backoff and per-host circuit breakers for upstream GET requests
+"""
+
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+from enum import Enum
+from typing import Any
+
+import httpx
+
+from app.clients.http import http_pool
+from app.config import settings
+from app.core.exceptions import CircuitOpenError
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker для одного upstream host
+
+    - CLOSED: запросы идут, последовательные ошибки считаются
+    - OPEN: после failure_threshold ошибок запросы сразу отклоняются
+    - HALF_OPEN: через recovery_timeout пропускается один пробный запрос;
+      успех закрывает цепь, ошибка снова открывает
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        recovery_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.recovery_timeout = recovery_timeout
+        self._clock = clock
+
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_started: float | None = None
+
+        # Counters
+        self.rejected = 0
+        self.opened = 0
+
+    def allow_request(self) -> bool:
+        now = self._clock()
+
+        if self.state == CircuitState.OPEN:
+            if now - self._opened_at < self.recovery_timeout:
+                self.rejected += 1
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self._probe_started = None
+
+        if self.state == CircuitState.HALF_OPEN:
+            # One probe at a time; a probe that never reported back
+            # (e.g. cancelled) is replaced after recovery_timeout
+            if (
+                self._probe_started is not None
+                and now - self._probe_started < self.recovery_timeout
+            ):
+                self.rejected += 1
+                return False
+            self._probe_started = now
+
+        return True
+
+    def record_success(self) -> None:
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self._probe_started = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if (
+            self.state == CircuitState.HALF_OPEN
+            or self.failures >= self.failure_threshold
+        ):
+            if self.state != CircuitState.OPEN:
+                self.opened += 1
+            self.state = CircuitState.OPEN
+            self._opened_at = self._clock()
+            self._probe_started = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "state": self.state.value,
+            "failures": self.failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+class CircuitBreakerRegistry:
+    """Circuit breaker на каждый upstream host (demo/prod/wiki/GitHub)"""
+
+    def __init__(self):
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, url: str) -> CircuitBreaker:
+        origin = http_pool.origin(url)
+        breaker = self._breakers.get(origin)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                origin,
+                failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+                recovery_timeout=settings.CIRCUIT_RECOVERY_TIMEOUT,
+            )
+            self._breakers[origin] = breaker
+        return breaker
+
+    def stats(self) -> dict[str, Any]:
+        return {name: breaker.stats() for name, breaker in self._breakers.items()}
+
+
+def backoff_delay(attempt: int, base: float, max_delay: float) -> float:
+    """Exponential backoff с full jitter: U(0, min(max, base * 2^attempt))"""
+    return random.uniform(0, min(max_delay, base * (2**attempt)))
+
+
+async def resilient_get(
+    url: str,
+    *,
+    headers: dict[str, str] | None = None,
+    params: dict[str, Any] | None = None,
+    timeout: float = 10.0,
+    before_attempt: Callable[[], Awaitable[None]] | None = None,
+) -> httpx.Response:
+    """
+    Идемпотентный GET с повторами и circuit breaker
+
+    Транспортные ошибки и 5xx повторяются до UPSTREAM_RETRY_ATTEMPTS раз
+    с exponential backoff + jitter. Ответы < 500 возвращаются как есть.
+
+    Args:
+        before_attempt: Вызывается перед каждой попыткой (например, rate limiter)
+
+    Raises:
+        CircuitOpenError: Host недоступен (цепь разомкнута)
+        httpx.RequestError: Транспортная ошибка после всех повторов
+    """
+    breaker = circuit_breakers.get(url)
+    retries = settings.UPSTREAM_RETRY_ATTEMPTS
+    attempt = 0
+
+    while True:
+        if not breaker.allow_request():
+            raise CircuitOpenError(f"{breaker.name} is unavailable (circuit open)")
+        if before_attempt is not None:
+            await before_attempt()
+
+        try:
+            response = await http_pool.get(url).get(
+                url, headers=headers or {}, params=params or {}, timeout=timeout
+            )
+        except httpx.RequestError:
+            breaker.record_failure()
+            if attempt >= retries:
+                raise
+        else:
+            if response.status_code < 500:
+                breaker.record_success()
+                return response
+            breaker.record_failure()
+            if attempt >= retries:
+                return response
+
+        await asyncio.sleep(
+            backoff_delay(
+                attempt,
+                settings.UPSTREAM_RETRY_BASE_DELAY,
+                settings.UPSTREAM_RETRY_MAX_DELAY,
+            )
+        )
+        attempt += 1
+
+
+# Singleton
+circuit_breakers = CircuitBreakerRegistry()
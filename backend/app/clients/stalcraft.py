@@ -1,7 +1,26 @@
+import asyncio
+import hashlib
 import httpx
-from typing import Any, Literal
+from collections import deque
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from typing import Any, Literal, TypeVar
 from app.config import settings
-from app.core.exceptions import StalcraftAPIError
+from app.clients.http import http_pool
+from app.clients.rate_limit import (
+    RateLimiter,
+    TokenBucket,
+    notify_upstream_attempt,
+    retry_after_seconds,
+)
+from app.clients.resilience import resilient_get
+from app.clients.wiki_book import HistoryBook, LotBook
+from app.core.exceptions import CircuitOpenError, StalcraftAPIError
+from app.models.auction import AuctionLot, AuctionPriceHistory
+from app.utils import fastjson
+from app.utils.cache import ResponseCache
+from app.utils.singleflight import SingleFlight
+
+BookT = TypeVar("BookT", LotBook, HistoryBook)
 
 
 class StalcraftAPIClient:
@@ -14,6 +33,18 @@ class StalcraftAPIClient:
         self.base_url = settings.api_base_url
         self.api_source = settings.API_SOURCE
         self.timeout = 10.0
+        # Coalescing of identical in-flight requests
+        self._inflight = SingleFlight()
+        # Full wiki payloads, paginated locally
+        self._wiki_books = ResponseCache(
+            max_bytes=settings.WIKI_BOOK_CACHE_MAX_BYTES,
+            stale_ttl=settings.AUCTION_CACHE_STALE_TTL,
+        )
+        # Token bucket per host/token
+        self.rate_limiter = RateLimiter(
+            rate=settings.UPSTREAM_RATE_LIMIT_RPS,
+            burst=settings.UPSTREAM_RATE_LIMIT_BURST,
+        )
 
     def _get_headers(self) -> dict[str, str]:
         """Заголовки с авторизацией для всех запросов"""
@@ -52,6 +83,113 @@ class StalcraftAPIClient:
             # Official API uses kwargs as params
             return kwargs
 
+    async def _get(self, url: str, params: dict[str, Any]) -> dict[str, Any]:
+        """
+        GET запрос к API
+
+        Одновременные запросы с одинаковыми URL и параметрами объединяются
+        в один upstream запрос. Для Wiki API параметры пагинации не
+        передаются, поэтому объединяются все запросы к одному предмету.
+        Результат общий для всех ожидающих - его нельзя изменять.
+        """
+        key = (url, tuple(sorted(params.items())))
+        return await self._inflight.do(key, lambda: self._fetch(url, params))
+
+    def _rate_limit_key(self, url: str, headers: dict[str, str]) -> str:
+        """Ключ лимита: host + отпечаток токена (сам токен не хранится)"""
+        credential = headers.get("Authorization") or headers.get("X-Internal-Key", "")
+        fingerprint = hashlib.sha256(credential.encode()).hexdigest()[:8]
+        return f"{http_pool.origin(url)}#{fingerprint}"
+
+    async def _acquire(self, bucket: TokenBucket) -> None:
+        """Дождаться токена rate limiter'а (не дольше MAX_WAIT)"""
+        try:
+            await asyncio.wait_for(
+                bucket.acquire(), timeout=settings.UPSTREAM_RATE_LIMIT_MAX_WAIT
+            )
+        except asyncio.TimeoutError:
+            raise StalcraftAPIError("Rate limit queue timeout")
+        notify_upstream_attempt()
+
+    async def _fetch(self, url: str, params: dict[str, Any]) -> dict[str, Any]:
+        """
+        GET запрос через общий пул соединений
+
+        - каждая попытка ждёт токен rate limiter'а
+        - транспортные ошибки и 5xx повторяются с backoff (resilient_get)
+        - на 429 лимит ставится на паузу (Retry-After) и запрос повторяется
+        """
+        headers = self._get_headers()
+        bucket = self.rate_limiter.bucket(self._rate_limit_key(url, headers))
+        retries_left = settings.UPSTREAM_RATE_LIMIT_MAX_429_RETRIES
+
+        while True:
+            try:
+                response = await resilient_get(
+                    url,
+                    headers=headers,
+                    params=params,
+                    timeout=self.timeout,
+                    before_attempt=lambda: self._acquire(bucket),
+                )
+            except CircuitOpenError as e:
+                raise StalcraftAPIError(str(e))
+            except httpx.RequestError as e:
+                raise StalcraftAPIError(f"Request error: {str(e)}")
+
+            bucket.update_from_headers(response.headers)
+            if response.status_code == 429 and retries_left > 0:
+                retries_left -= 1
+                bucket.pause(retry_after_seconds(response.headers))
+                continue
+
+            try:
+                response.raise_for_status()
+            except httpx.HTTPStatusError as e:
+                raise StalcraftAPIError(
+                    f"API error {e.response.status_code}: {e.response.text}"
+                )
+            return fastjson.loads(response.content)
+
+    async def _wiki_book(
+        self,
+        endpoint: str,
+        region: str,
+        item_id: str,
+        parse: Callable[[dict[str, Any]], BookT],
+    ) -> BookT:
+        """
+        Полный ответ Wiki API по предмету, разобранный parse
+
+        Загружается один раз на (endpoint, region, item) и кэшируется на
+        WIKI_BOOK_TTL; все страницы строятся из него локально
+        """
+        key = (endpoint, region.upper(), item_id)
+
+        async def fetch() -> BookT:
+            url = self._build_url(endpoint, region, item_id)
+            data = await self._get(url, self._build_params(region, item_id, endpoint))
+            return parse(data)
+
+        return await self._wiki_books.get_or_fetch(
+            key,
+            settings.WIKI_BOOK_TTL,
+            lambda: self._inflight.do(("wiki-book",) + key, fetch),
+            lambda book: book.size,
+        )
+
+    async def _lot_book(self, region: str, item_id: str) -> LotBook:
+        """Полный список лотов предмета из Wiki API"""
+        return await self._wiki_book(
+            "available-lots", region, item_id, LotBook.from_payload
+        )
+
+    async def _history_book(self, region: str, item_id: str) -> HistoryBook:
+        """Полная история продаж предмета из Wiki API"""
+        return await self._wiki_book(
+            "history", region, item_id, HistoryBook.from_payload
+        )
+
     async def get_auction_lots(
         self,
         region: str,
@@ -80,39 +218,30 @@ class StalcraftAPIClient:
             {"total": int, "lots": [...]}
         """
         if self.api_source == "wiki":
-            # Wiki API uses different endpoint and params
-            url = self._build_url("available-lots", region, item_id)
-            params = self._build_params(region, item_id, "available-lots")
-        else:
-            # Official API
-            url = self._build_url("lots", region, item_id)
-            params = self._build_params(
-                region,
-                item_id,
-                "lots",
-                additional=str(additional).lower(),
-                limit=str(limit),
-                offset=str(offset),
+            # Wiki API returns the whole book - paginate it locally
+            book = await self._lot_book(region, item_id)
+            return book.page(
+                limit=limit,
+                offset=offset,
                 order=order,
                 sort=sort,
+                additional=additional,
             )
 
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    url,
-                    headers=self._get_headers(),
-                    params=params,
-                    timeout=self.timeout,
-                )
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPStatusError as e:
-            raise StalcraftAPIError(
-                f"API error {e.response.status_code}: {e.response.text}"
-            )
-        except httpx.RequestError as e:
-            raise StalcraftAPIError(f"Request error: {str(e)}")
+        # Official API
+        url = self._build_url("lots", region, item_id)
+        params = self._build_params(
+            region,
+            item_id,
+            "lots",
+            additional=str(additional).lower(),
+            limit=str(limit),
+            offset=str(offset),
+            order=order,
+            sort=sort,
+        )
+
+        return await self._get(url, params)
 
     async def get_auction_history(
         self,
@@ -136,37 +265,132 @@ class StalcraftAPIClient:
             {"total": int, "prices": [...]}
         """
         if self.api_source == "wiki":
-            # Wiki API uses different endpoint and params
-            url = self._build_url("history", region, item_id)
-            params = self._build_params(region, item_id, "history")
-        else:
-            # Official API
-            url = self._build_url("history", region, item_id)
-            params = self._build_params(
+            # Wiki API returns the whole history - paginate it locally
+            book = await self._history_book(region, item_id)
+            return book.page(limit=limit, offset=offset, additional=additional)
+
+        # Official API
+        url = self._build_url("history", region, item_id)
+        params = self._build_params(
+            region,
+            item_id,
+            "history",
+            additional=str(additional).lower(),
+            limit=str(limit),
+            offset=str(offset),
+        )
+
+        return await self._get(url, params)
+
+    async def _iter_pages(
+        self,
+        fetch_page: Callable[[int, int], Awaitable[dict[str, Any]]],
+        records_key: str,
+        page_size: int,
+        prefetch: int,
+    ) -> AsyncGenerator[dict[str, Any], None]:
+        """
+        Обход всех страниц с ограниченной параллельной предзагрузкой
+
+        Первая страница даёт `total`, по нему планируются остальные offset'ы.
+        В полёте не больше `prefetch` страниц; записи отдаются по порядку,
+        как только приходит очередная страница.
+        """
+        first = await fetch_page(0, page_size)
+        for record in first.get(records_key) or []:
+            yield record
+
+        offsets = iter(range(page_size, first.get("total", 0), page_size))
+        pending: deque[asyncio.Task] = deque()
+
+        def schedule_next() -> None:
+            offset = next(offsets, None)
+            if offset is not None:
+                pending.append(asyncio.ensure_future(fetch_page(offset, page_size)))
+
+        try:
+            for _ in range(max(prefetch, 1)):
+                schedule_next()
+
+            while pending:
+                page = await pending.popleft()
+                schedule_next()
+                records = page.get(records_key) or []
+                if not records:
+                    # The book shrank since the first page
+                    break
+                for record in records:
+                    yield record
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def iter_auction_lots(
+        self,
+        region: str,
+        item_id: str,
+        additional: bool = False,
+        order: Literal["asc", "desc"] = "desc",
+        sort: Literal[
+            "time_created", "time_left", "current_price", "buyout_price"
+        ] = "time_created",
+        page_size: int = 200,
+        prefetch: int | None = None,
+    ) -> AsyncGenerator[AuctionLot, None]:
+        """
+        Обойти все активные лоты предмета страницами по page_size
+
+        Лоты отдаются по мере загрузки страниц, без сборки одного большого
+        списка. Книга лотов живая: между страницами лоты могут сдвигаться,
+        поэтому возможны редкие дубли/пропуски на границах страниц.
+
+        Args:
+            prefetch: Сколько следующих страниц грузить параллельно
+                (по умолчанию AUCTION_PAGE_PREFETCH)
+        """
+
+        async def fetch_page(offset: int, limit: int) -> dict[str, Any]:
+            return await self.get_auction_lots(
                 region,
                 item_id,
-                "history",
-                additional=str(additional).lower(),
-                limit=str(limit),
-                offset=str(offset),
+                additional=additional,
+                limit=limit,
+                offset=offset,
+                order=order,
+                sort=sort,
             )
 
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    url,
-                    headers=self._get_headers(),
-                    params=params,
-                    timeout=self.timeout,
-                )
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPStatusError as e:
-            raise StalcraftAPIError(
-                f"API error {e.response.status_code}: {e.response.text}"
+        async for lot in self._iter_pages(
+            fetch_page, "lots", page_size, prefetch or settings.AUCTION_PAGE_PREFETCH
+        ):
+            yield AuctionLot.model_validate(lot)
+
+    async def iter_auction_history(
+        self,
+        region: str,
+        item_id: str,
+        additional: bool = False,
+        page_size: int = 200,
+        prefetch: int | None = None,
+    ) -> AsyncGenerator[AuctionPriceHistory, None]:
+        """
+        Обойти всю историю продаж предмета (новые продажи первыми)
+
+        Args:
+            prefetch: Сколько следующих страниц грузить параллельно
+                (по умолчанию AUCTION_PAGE_PREFETCH)
+        """
+
+        async def fetch_page(offset: int, limit: int) -> dict[str, Any]:
+            return await self.get_auction_history(
+                region, item_id, additional=additional, limit=limit, offset=offset
             )
-        except httpx.RequestError as e:
-            raise StalcraftAPIError(f"Request error: {str(e)}")
+
+        async for sale in self._iter_pages(
+            fetch_page, "prices", page_size, prefetch or settings.AUCTION_PAGE_PREFETCH
+        ):
+            yield AuctionPriceHistory.model_validate(sale)
 
 
 # Singleton
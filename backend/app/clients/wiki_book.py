@@ -0,0 +1,125 @@
+"""
+Wiki API full-book structures with local sort, slice and pagination
+
+Wiki API всегда отдаёт полный список лотов / историю предмета и не
+поддерживает limit/offset/order/sort. Полный ответ кэшируется один раз,
+а параметры официального API применяются локально.
+"""
+
+from datetime import datetime
+from typing import Any, Callable
+
+from app.models.auction import AuctionSortField, SortOrder
+from app.utils import fastjson
+
+
+def _timestamp(value: Any) -> float:
+    """ISO-8601 строка -> epoch seconds (некорректные значения - в начало)"""
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def _price(*fields: str) -> Callable[[dict[str, Any]], int]:
+    """Первое непустое ценовое поле лота"""
+
+    def key(lot: dict[str, Any]) -> int:
+        for field in fields:
+            value = lot.get(field)
+            if value is not None:
+                return value
+        return 0
+
+    return key
+
+
+# Ключи сортировки в терминах параметра `sort` официального API
+_LOT_SORT_KEYS: dict[str, Callable[[dict[str, Any]], Any]] = {
+    "time_created": lambda lot: _timestamp(lot.get("startTime")),
+    "time_left": lambda lot: _timestamp(lot.get("endTime")),
+    "current_price": _price("currentPrice", "startPrice"),
+    "buyout_price": _price("buyoutPrice"),
+}
+
+
+def _strip_additional(records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Убрать additional, как официальный API при additional=false"""
+    return [{**record, "additional": {}} for record in records]
+
+
+def _payload_size(payload: dict[str, Any]) -> int:
+    return len(fastjson.dumps(payload))
+
+
+class LotBook:
+    """
+    Полный список лотов предмета
+
+    Отсортированные представления строятся лениво, один раз на поле сортировки;
+    страница - срез представления (desc - срез с конца, без разворота списка)
+    """
+
+    def __init__(self, lots: list[dict[str, Any]], total: int, size: int):
+        self.lots = lots
+        self.total = total
+        self.size = size
+        self._views: dict[str, list[dict[str, Any]]] = {}
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> "LotBook":
+        lots = payload.get("lots") or []
+        return cls(lots, payload.get("total", len(lots)), _payload_size(payload))
+
+    def _view(self, sort: AuctionSortField) -> list[dict[str, Any]]:
+        view = self._views.get(sort)
+        if view is None:
+            view = sorted(self.lots, key=_LOT_SORT_KEYS[sort])
+            self._views[sort] = view
+        return view
+
+    def page(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        order: SortOrder = "desc",
+        sort: AuctionSortField = "time_created",
+        additional: bool = False,
+    ) -> dict[str, Any]:
+        """Страница в формате официального API: {"total", "lots"}"""
+        view = self._view(sort)
+        if order == "asc":
+            lots = view[offset : offset + limit]
+        else:
+            end = max(len(view) - offset, 0)
+            start = max(end - limit, 0)
+            lots = view[start:end][::-1]
+
+        if not additional:
+            lots = _strip_additional(lots)
+        return {"total": self.total, "lots": lots}
+
+
+class HistoryBook:
+    """Полная история продаж предмета (новые продажи первыми)"""
+
+    def __init__(self, prices: list[dict[str, Any]], total: int, size: int):
+        self.prices = sorted(
+            prices, key=lambda sale: _timestamp(sale.get("time")), reverse=True
+        )
+        self.total = total
+        self.size = size
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> "HistoryBook":
+        prices = payload.get("prices") or []
+        return cls(prices, payload.get("total", len(prices)), _payload_size(payload))
+
+    def page(
+        self, limit: int = 20, offset: int = 0, additional: bool = False
+    ) -> dict[str, Any]:
+        """Страница в формате официального API: {"total", "prices"}"""
+        prices = self.prices[offset : offset + limit]
+        if not additional:
+            prices = _strip_additional(prices)
+        return {"total": self.total, "prices": prices}
@@ -28,6 +28,106 @@ class Settings(BaseSettings):
     STALCRAFT_WIKI_HOST: str = "stalcraft.wiki"
     STALCRAFT_WIKI_API_KEY: str = "cb2b4565-a129-4e9c-bbd1-88427f79468d"
 
+    # HTTP connection pool (shared by all upstream clients)
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP2_ENABLED: bool = False  # requires httpx[http2]
+
+    # Upstream rate limiter (token bucket per host/token)
+    UPSTREAM_RATE_LIMIT_RPS: float = 5.0
+    UPSTREAM_RATE_LIMIT_BURST: int = 10
+    UPSTREAM_RATE_LIMIT_MAX_WAIT: float = 30.0  # max seconds in queue
+    UPSTREAM_RATE_LIMIT_MAX_429_RETRIES: int = 3
+
+    # Upstream retries (idempotent GETs) and per-host circuit breaker
+    UPSTREAM_RETRY_ATTEMPTS: int = 2
+    UPSTREAM_RETRY_BASE_DELAY: float = 0.2
+    UPSTREAM_RETRY_MAX_DELAY: float = 2.0
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RECOVERY_TIMEOUT: float = 30.0
+
+    # Auction response cache (TTL + LRU, stale-while-revalidate)
+    AUCTION_CACHE_ENABLED: bool = True
+    AUCTION_CACHE_LOTS_TTL: float = 15.0
+    AUCTION_CACHE_HISTORY_TTL: float = 60.0
+    AUCTION_CACHE_STALE_TTL: float = 30.0
+    AUCTION_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # Concurrent page prefetch for full-book / deep-history iteration
+    AUCTION_PAGE_PREFETCH: int = 4
+
+    # Lots/history response mode:
+    # model - Pydantic models + FastAPI response_model (default)
+    # fast - orjson + precompiled TypeAdapter, pre-serialized bytes
+    # passthrough - no validation, upstream JSON is returned as is
+    AUCTION_RESPONSE_MODE: Literal["model", "fast", "passthrough"] = "model"
+
+    # Batch endpoint: max items per request and concurrent upstream fetches
+    AUCTION_BATCH_MAX_ITEMS: int = 50
+    AUCTION_BATCH_CONCURRENCY: int = 8
+
+    # /compare min unit price: lot pages read per region (interactive requests);
+    # beyond it the minimum is marked approximate
+    COMPARE_MAX_LOT_PAGES: int = 3
+
+    # Wiki API full-book cache (limit/offset/order/sort applied locally)
+    WIKI_BOOK_TTL: float = 30.0
+    WIKI_BOOK_CACHE_MAX_BYTES: int = 128 * 1024 * 1024
+
+    # Background watchlist poller ("REGION:item_id" entries)
+    WATCHLIST: list[str] = []
+    WATCHLIST_MIN_INTERVAL: float = 15.0  # hot items
+    WATCHLIST_MAX_INTERVAL: float = 600.0  # dead items
+    WATCHLIST_BACKOFF_FACTOR: float = 1.5  # interval growth when nothing changed
+    WATCHLIST_REQUEST_BUDGET: int = 60  # upstream requests per minute, all items
+    WATCHLIST_CONCURRENCY: int = 4
+    WATCHLIST_HISTORY_INTERVAL: float = 300.0  # sale history refresh, 0 - off
+
+    # Lot-book diff events kept per watched item
+    LOT_EVENTS_HISTORY: int = 500
+
+    # Price-alert rules: match queue size and optional webhook consumer
+    ALERTS_QUEUE_SIZE: int = 10000
+    ALERTS_WEBHOOK_URL: str = ""
+
+    # Live lot feed (SSE): messages buffered per connection, total connections
+    LIVE_SUBSCRIBER_BUFFER: int = 32
+    LIVE_MAX_SUBSCRIBERS: int = 5000
+
+    # Underpriced-lot detector: EWMA of log unit price per item
+    ANOMALY_THRESHOLD: float = 3.0  # deviations below normal to flag a lot
+    ANOMALY_EWMA_SPAN: int = 50  # sales; alpha = 2 / (span + 1)
+    ANOMALY_MIN_SAMPLES: int = 20  # sales before lots are checked
+    ANOMALY_MIN_DEVIATION: float = 0.05  # floor of the deviation (~5% of price)
+    ANOMALY_HISTORY: int = 500  # flagged lots kept
+
+    # Local sale-history store (SQLite, incremental refresh by watermark)
+    HISTORY_DB_PATH: str = "data/history.sqlite3"
+    HISTORY_REFRESH_INTERVAL: float = 60.0  # min seconds between refreshes
+    HISTORY_BACKFILL_MAX_RECORDS: int = 10000  # first refresh of a series
+
+    # Price statistics endpoint
+    STATS_DEFAULT_WINDOW_DAYS: float = 7.0
+    STATS_MAX_LOTS: int = 2000  # cheapest active lots in the lot distribution
+    STATS_LOTS_CACHE_MAX_BYTES: int = 16 * 1024 * 1024  # memoized lot prices
+
+    # Cross-region arbitrage scanner (0 interval - manual runs only)
+    ARBITRAGE_STATE_PATH: str = "data/arbitrage.json"
+    ARBITRAGE_SCAN_INTERVAL: float = 0.0  # seconds between passes
+    ARBITRAGE_CONCURRENCY: int = 4  # items compared at once
+    ARBITRAGE_HISTORY_LIMIT: int = 100  # recent sales per region for the median
+    ARBITRAGE_MIN_SALES: int = 5  # sell side needs this many recent sales
+    ARBITRAGE_CHECKPOINT_EVERY: int = 50  # items between progress saves
+
+    # Market sweeps: lots of every indexed item of a region, within a budget
+    SWEEP_REQUEST_BUDGET: int = 5000  # upstream requests per sweep
+    SWEEP_TIME_WINDOW: float = 1800.0  # seconds; no new requests after it
+    SWEEP_CONCURRENCY: int = 4
+    SWEEP_INTERVAL: float = 0.0  # seconds between scheduled sweeps, 0 - off
+    SWEEP_REGIONS: list[str] = []  # regions of scheduled sweeps
+    SWEEP_HISTORY: int = 10  # finished sweeps kept for status
+
     # Regions
     SUPPORTED_REGIONS: list[str] = ["EU", "RU", "NA", "SEA"]
 
@@ -36,6 +136,10 @@ class Settings(BaseSettings):
     GITHUB_DB_REPO: str = "EXBO-Studio/stalcraft-database"
     GITHUB_DB_BRANCH: str = "main"
     GITHUB_TOKEN: str = ""  # GitHub token для API запросов
+    # source=local: checked-out repository or its tar(.gz) archive
+    ITEMS_DB_LOCAL_PATH: str = "data/stalcraft-database"
+    ITEMS_DB_WORKERS: int = 0  # parser processes, 0 - cpu count
+    ITEMS_DB_CONCURRENCY: int = 20  # item downloads in flight, all realms
 
     # CORS
     CORS_ORIGINS: list[str] = ["http://localhost:8000", "http://127.0.0.1:8000"]
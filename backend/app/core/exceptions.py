@@ -20,3 +20,15 @@ class InvalidRegionError(SCAUCException):
     """Невалидный регион"""
 
     pass
+
+
+class CircuitOpenError(SCAUCException):
+    """Upstream host недоступен (circuit breaker разомкнут)"""
+
+    pass
+
+
+class SubscriberLimitError(SCAUCException):
+    """Превышен лимит подписчиков live-потока"""
+
+    pass
@@ -6,21 +6,50 @@ from pathlib import Path
 from contextlib import asynccontextmanager
 from app.config import settings
 from app.api.v1.router import api_router
+from app.clients.http import http_pool
+from app.clients.resilience import circuit_breakers
+from app.clients.stalcraft import stalcraft_client
+from app.services.alert_engine import alert_engine
+from app.services.anomaly_detector import anomaly_detector
+from app.services.arbitrage_scanner import arbitrage_scanner
+from app.services.history_store import history_store
 from app.services.items_database_manager import items_db_manager
+from app.services.market_sweep import market_sweeper
+from app.services.watchlist_poller import watchlist_poller
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifecycle events"""
-    # Startup:  Initialize items database
+    # Startup:  Open pooled HTTP clients, initialize items database,
+    # start background watchlist polling, alert delivery, arbitrage scans
+    # and scheduled market sweeps
     print("🚀 Starting SC-AUC-Monitoring...")
+    await http_pool.startup(
+        [
+            stalcraft_client.base_url,
+            items_db_manager.raw_base_url,
+            items_db_manager.api_base_url,
+        ]
+    )
     await items_db_manager.initialize()
+    await anomaly_detector.seed(history_store)
+    watchlist_poller.start()
+    alert_engine.start()
+    arbitrage_scanner.start()
+    market_sweeper.start()
     print("✅ Application ready!")
 
     yield
 
     # Shutdown
     print("👋 Shutting down...")
+    await watchlist_poller.stop()
+    await alert_engine.stop()
+    await arbitrage_scanner.stop()
+    await market_sweeper.stop()
+    history_store.close()
+    await http_pool.close()
 
 
 app = FastAPI(
@@ -82,4 +111,5 @@ async def health():
         "items_db_total": sum(
             len(items) for items in items_db_manager.search_index.values()
         ),
+        "upstream_circuits": circuit_breakers.stats(),
     }
@@ -0,0 +1,61 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Literal, Optional
+
+from app.models.auction import AuctionLot
+
+
+AlertOperator = Literal["<", "<=", ">", ">=", "==", "!="]
+
+# Поля лота для условий; additional.<ключ> - числовое поле из additional
+ALERT_FIELD_PATTERN = (
+    r"^(buyout_price|unit_buyout_price|current_price|unit_current_price|amount"
+    r"|additional\.\w+)$"
+)
+
+
+class AlertCondition(BaseModel):
+    """Условие правила: <поле лота> <оператор> <значение>"""
+
+    field: str = Field(
+        ...,
+        pattern=ALERT_FIELD_PATTERN,
+        description="buyout_price, unit_buyout_price, current_price, "
+        "unit_current_price, amount или additional.<ключ> (например, additional.qlt)",
+    )
+    op: AlertOperator = Field(..., description="Оператор сравнения")
+    value: float = Field(..., description="Значение")
+
+    class Config:
+        json_schema_extra = {
+            "example": {"field": "unit_buyout_price", "op": "<", "value": 12000}
+        }
+
+
+class AlertRule(BaseModel):
+    """Правило оповещения для предмета в регионе"""
+
+    id: str = Field(..., description="ID правила")
+    region: str = Field(..., description="Регион")
+    item_id: str = Field(..., description="ID предмета")
+    conditions: list[AlertCondition] = Field(
+        ..., description="Условия (должны выполняться все)"
+    )
+    only_new: bool = Field(
+        default=False, description="Только лоты, выставленные после создания правила"
+    )
+    created_at: datetime = Field(..., description="Время создания")
+    matches: int = Field(default=0, description="Сколько раз правило сработало")
+
+
+class AlertMatch(BaseModel):
+    """Срабатывание правила на лоте"""
+
+    rule_id: str = Field(..., description="ID правила")
+    region: str = Field(..., description="Регион")
+    item_id: str = Field(..., description="ID предмета")
+    matched_at: datetime = Field(..., description="Время срабатывания")
+    lot: AuctionLot = Field(..., description="Лот, на котором сработало правило")
+    unit_buyout_price: Optional[float] = Field(
+        None, description="Цена выкупа за единицу"
+    )
@@ -0,0 +1,53 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Literal, Optional
+
+
+ScanState = Literal["idle", "running", "completed", "failed"]
+
+
+class ArbitrageOpportunity(BaseModel):
+    """Лучший спред предмета: купить в одном регионе, продать в другом"""
+
+    item_id: str = Field(..., description="ID предмета")
+    name: Optional[str] = Field(default=None, description="Название предмета")
+    buy_region: str = Field(..., description="Регион с минимальной ценой выкупа")
+    sell_region: str = Field(..., description="Регион с медианой продаж")
+    buy_price: float = Field(..., description="Минимальная цена выкупа за единицу")
+    sell_price: float = Field(..., description="Медианная цена продажи за единицу")
+    spread: float = Field(..., description="sell_price - buy_price")
+    spread_pct: float = Field(..., description="Спред в процентах от buy_price")
+    recent_sales: int = Field(
+        ..., description="Количество недавних продаж в регионе продажи"
+    )
+
+
+class ArbitrageScanStatus(BaseModel):
+    """Состояние фонового сканирования"""
+
+    state: ScanState = Field(..., description="idle, running, completed или failed")
+    started_at: Optional[datetime] = Field(None, description="Начало текущего прохода")
+    finished_at: Optional[datetime] = Field(
+        None, description="Окончание последнего завершённого прохода"
+    )
+    total_items: int = Field(0, description="Предметов в текущем проходе")
+    scanned_items: int = Field(0, description="Обработано предметов")
+    failed_items: int = Field(0, description="Предметов с ошибками загрузки")
+    opportunities: int = Field(0, description="Найдено спредов в текущем проходе")
+    last_error: Optional[str] = Field(None, description="Ошибка прохода")
+
+
+class ArbitrageResponse(BaseModel):
+    """Предметы, отсортированные по спреду между регионами"""
+
+    status: ArbitrageScanStatus = Field(..., description="Состояние сканирования")
+    scanned_at: Optional[datetime] = Field(
+        None, description="Когда получены результаты (конец прохода)"
+    )
+    partial: bool = Field(
+        False, description="Результаты незавершённого прохода (первый запуск)"
+    )
+    total: int = Field(..., description="Спредов после фильтров")
+    opportunities: list[ArbitrageOpportunity] = Field(
+        default_factory=list, description="Спреды, лучшие первыми"
+    )
@@ -89,3 +89,202 @@ class AuctionHistoryResponse(BaseModel):
     prices: list[AuctionPriceHistory] = Field(
         default_factory=list, description="История цен (отсортирована по времени)"
     )
+
+
+class AuctionBatchItem(BaseModel):
+    """Результат batch-запроса для одного предмета"""
+
+    item_id: str = Field(..., description="ID предмета")
+    lots: Optional[AuctionLotsResponse] = Field(
+        default=None, description="Активные лоты"
+    )
+    history: Optional[AuctionHistoryResponse] = Field(
+        default=None, description="История продаж"
+    )
+    errors: dict[str, str] = Field(
+        default_factory=dict,
+        description="Ошибки по типу данных ('lots' / 'history'), если были",
+    )
+
+
+class AuctionBatchResponse(BaseModel):
+    """Ответ batch-запроса для нескольких предметов"""
+
+    region: str = Field(..., description="Регион")
+    items: list[AuctionBatchItem] = Field(
+        default_factory=list, description="Результаты в порядке запроса"
+    )
+
+
+class RegionPriceSummary(BaseModel):
+    """Сводка цен предмета в одном регионе"""
+
+    region: str = Field(..., description="Регион")
+    lot_count: Optional[int] = Field(
+        default=None, description="Количество активных лотов"
+    )
+    min_buyout_price: Optional[float] = Field(
+        default=None, description="Минимальная цена выкупа за единицу"
+    )
+    min_buyout_approximate: bool = Field(
+        default=False,
+        description="Книга лотов прочитана не целиком (COMPARE_MAX_LOT_PAGES): "
+        "минимум может быть выше настоящего",
+    )
+    median_sale_price: Optional[float] = Field(
+        default=None, description="Медианная цена продажи за единицу (недавние продажи)"
+    )
+    recent_sales: int = Field(default=0, description="Количество учтённых продаж")
+    errors: dict[str, str] = Field(
+        default_factory=dict, description="Ошибки загрузки ('lots' / 'history')"
+    )
+
+
+class RegionComparisonResponse(BaseModel):
+    """Сравнение цен предмета по регионам"""
+
+    item_id: str = Field(..., description="ID предмета")
+    regions: list[RegionPriceSummary] = Field(
+        default_factory=list, description="Сводка по каждому региону"
+    )
+    cheapest_region: Optional[str] = Field(
+        None, description="Регион с минимальной ценой выкупа"
+    )
+
+
+class StoredHistoryResponse(BaseModel):
+    """История продаж из локального хранилища"""
+
+    region: str = Field(..., description="Регион")
+    item_id: str = Field(..., description="ID предмета")
+    total: int = Field(..., description="Количество записей в запрошенном диапазоне")
+    stored: int = Field(..., description="Всего записей предмета в хранилище")
+    watermark: Optional[datetime] = Field(
+        None, description="Время последней загруженной продажи"
+    )
+    oldest: Optional[datetime] = Field(
+        None, description="Время самой старой сохранённой продажи"
+    )
+    prices: list[AuctionPriceHistory] = Field(
+        default_factory=list, description="Продажи (новые первыми)"
+    )
+
+
+CandleInterval = Literal["5m", "1h", "1d"]
+
+
+class Candle(BaseModel):
+    """OHLC свеча продаж (цены - за единицу предмета)"""
+
+    time: datetime = Field(..., description="Начало интервала (UTC)")
+    open: float = Field(..., description="Цена первой продажи")
+    high: float = Field(..., description="Максимальная цена")
+    low: float = Field(..., description="Минимальная цена")
+    close: float = Field(..., description="Цена последней продажи")
+    volume: int = Field(..., description="Продано предметов")
+    vwap: float = Field(..., description="Средняя цена, взвешенная по количеству")
+    trades: int = Field(..., description="Количество продаж")
+
+
+class CandlesResponse(BaseModel):
+    """Свечи продаж предмета"""
+
+    region: str = Field(..., description="Регион")
+    item_id: str = Field(..., description="ID предмета")
+    interval: CandleInterval = Field(..., description="Размер свечи")
+    candles: list[Candle] = Field(
+        default_factory=list, description="Свечи (старые первыми)"
+    )
+
+
+class PriceDistribution(BaseModel):
+    """Распределение цен за единицу предмета"""
+
+    count: int = Field(default=0, description="Количество записей")
+    mean: Optional[float] = Field(default=None, description="Среднее")
+    stddev: Optional[float] = Field(default=None, description="Стандартное отклонение")
+    min: Optional[float] = Field(default=None, description="Минимум")
+    max: Optional[float] = Field(default=None, description="Максимум")
+    median: Optional[float] = Field(default=None, description="Медиана")
+    trimmed_mean: Optional[float] = Field(
+        default=None, description="Среднее без крайних значений (см. trim)"
+    )
+    percentiles: dict[str, float] = Field(
+        default_factory=dict, description="Перцентили: {'p5': ..., 'p95': ...}"
+    )
+    histogram: list[int] = Field(
+        default_factory=list, description="Количество записей по корзинам цен"
+    )
+    bin_edges: list[float] = Field(
+        default_factory=list, description="Границы корзин (len(histogram) + 1)"
+    )
+
+
+class PriceStatsResponse(BaseModel):
+    """Статистика цен предмета за период"""
+
+    region: str = Field(..., description="Регион")
+    item_id: str = Field(..., description="ID предмета")
+    since: datetime = Field(..., description="Начало периода")
+    until: Optional[datetime] = Field(None, description="Конец периода")
+    trim: float = Field(..., description="Доля отброшенных значений с каждой стороны")
+    sales: PriceDistribution = Field(..., description="Цены продаж за единицу")
+    sales_volume: int = Field(0, description="Продано предметов")
+    sales_vwap: Optional[float] = Field(
+        None, description="Средняя цена продаж, взвешенная по количеству"
+    )
+    lots: PriceDistribution = Field(
+        ..., description="Цены выкупа активных лотов за единицу"
+    )
+
+
+LotEventType = Literal["new", "sold", "expired", "price_changed"]
+
+
+class LotEvent(BaseModel):
+    """Изменение книги лотов между двумя снимками"""
+
+    type: LotEventType = Field(
+        ...,
+        description="new - новый лот, sold - исчез до endTime (вероятно, выкуплен), "
+        "expired - истёк, price_changed - изменилась текущая цена (ставка)",
+    )
+    region: str = Field(..., description="Регион")
+    item_id: str = Field(..., description="ID предмета")
+    detected_at: datetime = Field(..., description="Время обнаружения")
+    amount: int = Field(..., description="Количество предметов в лоте")
+    buyout_price: int = Field(..., description="Цена выкупа лота")
+    price: int = Field(..., description="Текущая цена лота")
+    previous_price: Optional[int] = Field(
+        None, description="Прошлая текущая цена (для price_changed)"
+    )
+    start_time: datetime = Field(..., description="Время создания лота")
+    end_time: datetime = Field(..., description="Время окончания лота")
+
+
+class PriceBaseline(BaseModel):
+    """Скользящая оценка нормальной цены предмета (EWMA по log цены за единицу)"""
+
+    region: str = Field(..., description="Регион")
+    item_id: str = Field(..., description="ID предмета")
+    samples: int = Field(..., description="Учтено продаж")
+    price: float = Field(..., description="Нормальная цена за единицу (exp среднего)")
+    deviation: float = Field(
+        ..., description="Стандартное отклонение log цены (≈ доля от цены)"
+    )
+    ready: bool = Field(..., description="Достаточно продаж для поиска аномалий")
+    updated_at: datetime = Field(..., description="Время последнего обновления")
+
+
+class PriceAnomaly(BaseModel):
+    """Новый лот с ценой выкупа намного ниже нормальной"""
+
+    region: str = Field(..., description="Регион")
+    item_id: str = Field(..., description="ID предмета")
+    detected_at: datetime = Field(..., description="Время обнаружения")
+    unit_buyout_price: float = Field(..., description="Цена выкупа за единицу")
+    baseline_price: float = Field(..., description="Нормальная цена за единицу")
+    deviations: float = Field(
+        ..., description="На сколько отклонений цена ниже нормальной"
+    )
+    lot: LotEvent = Field(..., description="Событие появления лота")
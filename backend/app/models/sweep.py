@@ -0,0 +1,64 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Literal, Optional
+
+
+SweepState = Literal[
+    "running",
+    "completed",
+    "cancelled",
+    "budget_exhausted",
+    "deadline_reached",
+    "failed",
+]
+
+
+class SweepItemResult(BaseModel):
+    """Результат обновления лотов одного предмета"""
+
+    item_id: str = Field(..., description="ID предмета")
+    latency_ms: float = Field(
+        ..., description="Время запроса от отправки первой попытки, мс"
+    )
+    lot_count: Optional[int] = Field(
+        default=None, description="Количество активных лотов"
+    )
+    min_buyout_price: Optional[float] = Field(
+        default=None,
+        description="Минимальная цена выкупа за единицу (среди загруженных)",
+    )
+    error: Optional[str] = Field(default=None, description="Ошибка загрузки")
+
+
+class SweepLatency(BaseModel):
+    """Распределение времени запросов, мс"""
+
+    avg: Optional[float] = None
+    p50: Optional[float] = None
+    p95: Optional[float] = None
+    max: Optional[float] = None
+
+
+class SweepStatus(BaseModel):
+    """Состояние прохода по рынку региона"""
+
+    id: str = Field(..., description="ID прохода")
+    region: str = Field(..., description="Регион")
+    realm: str = Field(..., description="Realm индекса предметов")
+    state: SweepState = Field(..., description="Состояние прохода")
+    started_at: datetime = Field(..., description="Начало")
+    finished_at: Optional[datetime] = Field(None, description="Окончание")
+    deadline: datetime = Field(..., description="Новые запросы не начинаются позже")
+    request_budget: int = Field(..., description="Бюджет запросов")
+    requests_used: int = Field(
+        0, description="Upstream попыток (с повторами после ошибок и 429)"
+    )
+    total_items: int = Field(..., description="Предметов в индексе realm")
+    done_items: int = Field(0, description="Обработано предметов")
+    failed_items: int = Field(0, description="Предметов с ошибками")
+    progress: float = Field(0.0, description="Доля обработанных предметов (0-1)")
+    latency_ms: SweepLatency = Field(default_factory=SweepLatency)
+    last_error: Optional[str] = Field(None, description="Ошибка прохода")
+    items: Optional[list[SweepItemResult]] = Field(
+        None, description="Результаты по предметам (по запросу)"
+    )
@@ -4,6 +4,9 @@ Request schemas for API endpoints
 
 from pydantic import BaseModel, Field
 
+from app.config import settings
+from app.models.alerts import AlertCondition
+
 
 class AuctionLotsRequest(BaseModel):
     """Запрос активных лотов"""
@@ -20,8 +23,38 @@ class AuctionHistoryRequest(BaseModel):
     limit: int = Field(default=50, description="Количество записей", ge=1, le=100)
 
 
+class AuctionBatchRequest(BaseModel):
+    """Запрос лотов и/или истории для нескольких предметов"""
+
+    item_ids: list[str] = Field(
+        ...,
+        description="ID предметов",
+        min_length=1,
+        max_length=settings.AUCTION_BATCH_MAX_ITEMS,
+    )
+    lots: bool = Field(default=True, description="Загрузить активные лоты")
+    history: bool = Field(default=False, description="Загрузить историю продаж")
+    additional: bool = Field(
+        default=False, description="Включить дополнительную информацию"
+    )
+    limit: int = Field(default=20, description="Записей на предмет", ge=0, le=200)
+
+
 class ItemSearchRequest(BaseModel):
     """Запрос поиска предметов"""
 
     query: str = Field(..., description="Поисковый запрос", min_length=1)
     realm: str = Field(default="global", description="Realm (global, ru)")
+
+
+class AlertRuleRequest(BaseModel):
+    """Создание правила оповещения"""
+
+    region: str = Field(..., description="Регион (EU, RU, NA, SEA)")
+    item_id: str = Field(..., description="ID предмета")
+    conditions: list[AlertCondition] = Field(
+        ..., description="Условия (должны выполняться все)", min_length=1
+    )
+    only_new: bool = Field(
+        default=False, description="Только лоты, выставленные после создания правила"
+    )
@@ -0,0 +1,291 @@
+"""
+Alert engine - правила оповещений о ценах
+
+Правила индексируются по (регион, предмет): каждая новая книга лотов
+проверяется только правилами своего предмета, сколько бы правил ни было
+всего. Условия компилируются в функции при создании правила. Правило
+срабатывает на лоте один раз за время его жизни (до endTime лота), даже
+если лот выпадает из опрашиваемой страницы и возвращается в неё.
+
+Срабатывания складываются в ограниченную очередь (при переполнении
+вытесняются самые старые), которую разбирает SSE-поток /alerts/stream
+или webhook (ALERTS_WEBHOOK_URL).
+"""
+
+import asyncio
+import operator
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timezone
+from typing import Any
+
+import httpx
+
+from app.clients.http import http_pool
+from app.config import settings
+from app.core.exceptions import InvalidRegionError
+from app.models.alerts import AlertCondition, AlertMatch, AlertRule
+from app.models.auction import AuctionLot
+from app.services.lot_diff import LotKey, lot_key
+
+_OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+FieldGetter = Callable[[AuctionLot], float | None]
+
+
+def _unit(price: int | None, amount: int) -> float | None:
+    if not price:
+        return None
+    return price / amount if amount > 0 else float(price)
+
+
+def _field_getter(field: str) -> FieldGetter:
+    """Функция чтения поля лота (None - поля нет, условие не выполнено)"""
+    if field.startswith("additional."):
+        key = field.split(".", 1)[1]
+
+        def additional(lot: AuctionLot) -> float | None:
+            value = lot.additional.get(key)
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return None
+            return value
+
+        return additional
+
+    getters: dict[str, FieldGetter] = {
+        "buyout_price": lambda lot: lot.buyoutPrice or None,
+        "unit_buyout_price": lambda lot: _unit(lot.buyoutPrice, lot.amount),
+        "current_price": lambda lot: lot.currentPrice or lot.startPrice,
+        "unit_current_price": lambda lot: _unit(
+            lot.currentPrice or lot.startPrice, lot.amount
+        ),
+        "amount": lambda lot: lot.amount,
+    }
+    return getters[field]
+
+
+class _CompiledRule:
+    """Правило с условиями, скомпилированными в функции"""
+
+    def __init__(self, rule: AlertRule):
+        self.rule = rule
+        self.checks = [
+            (_field_getter(c.field), _OPERATORS[c.op], c.value) for c in rule.conditions
+        ]
+        # additional.* conditions need lots loaded with additional=true
+        self.uses_additional = any(
+            c.field.startswith("additional.") for c in rule.conditions
+        )
+        # Lots that already fired -> their endTime (forgotten after it)
+        self.fired: dict[LotKey, datetime] = {}
+
+    def matches(self, lot: AuctionLot) -> bool:
+        if self.rule.only_new and lot.startTime < self.rule.created_at:
+            return False
+        for get, compare, value in self.checks:
+            field_value = get(lot)
+            if field_value is None or not compare(field_value, value):
+                return False
+        return True
+
+
+class AlertEngine:
+    """Индекс правил оповещений и очередь срабатываний"""
+
+    def __init__(self):
+        self._index: dict[tuple[str, str], dict[str, _CompiledRule]] = {}
+        self._rules: dict[str, _CompiledRule] = {}
+        self.queue: asyncio.Queue[AlertMatch] = asyncio.Queue(
+            maxsize=settings.ALERTS_QUEUE_SIZE
+        )
+        self._webhook_task: asyncio.Task | None = None
+
+        # Counters
+        self.evaluated_lots = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.webhook_sent = 0
+        self.webhook_errors = 0
+
+    # ==================== Rules ====================
+
+    def add_rule(
+        self,
+        region: str,
+        item_id: str,
+        conditions: list[AlertCondition],
+        only_new: bool = False,
+    ) -> AlertRule:
+        region = region.upper()
+        if region not in settings.SUPPORTED_REGIONS:
+            raise InvalidRegionError(
+                f"Invalid region '{region}'. "
+                f"Supported: {', '.join(settings.SUPPORTED_REGIONS)}"
+            )
+
+        rule = AlertRule(
+            id=uuid.uuid4().hex,
+            region=region,
+            item_id=item_id,
+            conditions=conditions,
+            only_new=only_new,
+            created_at=datetime.now(timezone.utc),
+        )
+        compiled = _CompiledRule(rule)
+        self._rules[rule.id] = compiled
+        self._index.setdefault((region, item_id), {})[rule.id] = compiled
+        return rule
+
+    def remove_rule(self, rule_id: str) -> bool:
+        compiled = self._rules.pop(rule_id, None)
+        if compiled is None:
+            return False
+        key = (compiled.rule.region, compiled.rule.item_id)
+        rules = self._index[key]
+        rules.pop(rule_id)
+        if not rules:
+            del self._index[key]
+        return True
+
+    def get_rule(self, rule_id: str) -> AlertRule | None:
+        compiled = self._rules.get(rule_id)
+        return compiled.rule if compiled else None
+
+    def list_rules(
+        self, region: str | None = None, item_id: str | None = None
+    ) -> list[AlertRule]:
+        if region is not None and item_id is not None:
+            rules = self._index.get((region.upper(), item_id), {})
+            return [c.rule for c in rules.values()]
+        return [
+            c.rule
+            for c in self._rules.values()
+            if (region is None or c.rule.region == region.upper())
+            and (item_id is None or c.rule.item_id == item_id)
+        ]
+
+    def has_rules(self, region: str, item_id: str) -> bool:
+        return (region.upper(), item_id) in self._index
+
+    def needs_additional(self, region: str, item_id: str) -> bool:
+        """Есть ли у предмета правила с условиями на additional.*"""
+        rules = self._index.get((region.upper(), item_id), {})
+        return any(compiled.uses_additional for compiled in rules.values())
+
+    # ==================== Evaluation ====================
+
+    def evaluate(
+        self,
+        region: str,
+        item_id: str,
+        lots: list[AuctionLot],
+        now: datetime | None = None,
+    ) -> list[AlertMatch]:
+        """
+        Проверить свежую книгу лотов правилами предмета
+
+        Лот, на котором правило уже сработало, повторно не отправляется
+        до его endTime
+        """
+        rules = self._index.get((region.upper(), item_id))
+        if not rules:
+            return []
+
+        now = now or datetime.now(timezone.utc)
+        keys = [lot_key(lot) for lot in lots]
+        matches: list[AlertMatch] = []
+
+        for compiled in rules.values():
+            compiled.fired = {
+                key: end for key, end in compiled.fired.items() if end > now
+            }
+            for lot, key in zip(lots, keys):
+                if key in compiled.fired or not compiled.matches(lot):
+                    continue
+                compiled.fired[key] = lot.endTime
+                compiled.rule.matches += 1
+                matches.append(
+                    AlertMatch(
+                        rule_id=compiled.rule.id,
+                        region=compiled.rule.region,
+                        item_id=item_id,
+                        matched_at=now,
+                        lot=lot,
+                        unit_buyout_price=_unit(lot.buyoutPrice, lot.amount),
+                    )
+                )
+
+        self.evaluated_lots += len(lots) * len(rules)
+        for match in matches:
+            self._deliver(match)
+        return matches
+
+    def _deliver(self, match: AlertMatch) -> None:
+        """Положить в очередь; при переполнении вытеснить самое старое"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(match)
+        self.delivered += 1
+
+    async def next_match(self, timeout: float) -> AlertMatch | None:
+        """Следующее срабатывание из очереди (None - таймаут)"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    # ==================== Webhook consumer ====================
+
+    async def _run_webhook(self, url: str) -> None:
+        while True:
+            match = await self.queue.get()
+            try:
+                response = await http_pool.get(url).post(
+                    url,
+                    content=match.model_dump_json(),
+                    headers={"Content-Type": "application/json"},
+                )
+                response.raise_for_status()
+                self.webhook_sent += 1
+            except httpx.HTTPError as e:
+                self.webhook_errors += 1
+                print(f"⚠️ Alert webhook failed: {e}")
+
+    def start(self) -> None:
+        """Запустить webhook-потребителя очереди (если задан ALERTS_WEBHOOK_URL)"""
+        if settings.ALERTS_WEBHOOK_URL and self._webhook_task is None:
+            self._webhook_task = asyncio.create_task(
+                self._run_webhook(settings.ALERTS_WEBHOOK_URL)
+            )
+            print("🔔 Alert webhook consumer started")
+
+    async def stop(self) -> None:
+        if self._webhook_task is not None:
+            self._webhook_task.cancel()
+            await asyncio.gather(self._webhook_task, return_exceptions=True)
+            self._webhook_task = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "rules": len(self._rules),
+            "items": len(self._index),
+            "evaluated_lots": self.evaluated_lots,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "queued": self.queue.qsize(),
+            "webhook": bool(settings.ALERTS_WEBHOOK_URL),
+            "webhook_sent": self.webhook_sent,
+            "webhook_errors": self.webhook_errors,
+        }
+
+
+# Singleton
+alert_engine = AlertEngine()
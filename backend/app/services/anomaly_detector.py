@@ -0,0 +1,205 @@
+"""
+Anomaly detector - поиск лотов с ценой намного ниже нормальной
+
+Для каждого предмета хранится скользящая оценка нормальной цены: EWMA
+среднего и дисперсии логарифма цены за единицу. Оценка обновляется
+инкрементально (O(1) памяти и времени на предмет) только по подтверждённым
+продажам - новым записям history_store. Событие sold из lot_tracker не
+учитывается: это та же продажа (она придёт и в историю) либо снятый
+продавцом лот.
+При старте оценки восстанавливаются по продажам, уже сохранённым в
+history_store (seed); для предметов watchlist история догружается
+фоновым опросом.
+Выбросы перед обновлением обрезаются до ±_CLIP отклонений, поэтому
+единичная продажа за бесценок не сдвигает оценку.
+
+Новый лот (событие new из lot_tracker) помечается, если его цена выкупа
+за единицу ниже нормальной на ANOMALY_THRESHOLD отклонений и больше.
+"""
+
+import math
+import sqlite3
+from collections import deque
+from datetime import datetime, timezone
+
+from app.config import settings
+from app.models.auction import LotEvent, PriceAnomaly, PriceBaseline
+from app.services.history_store import HistoryStore, SaleRow, from_ms, history_store
+from app.services.lot_diff import lot_tracker
+
+# Updates are clipped to this many deviations around the mean
+_CLIP = 3.0
+
+
+class _EwmaState:
+    """EWMA среднего и дисперсии log цены одного предмета"""
+
+    __slots__ = ("mean", "var", "count", "updated_at")
+
+    def __init__(self, x: float, now: datetime):
+        self.mean = x
+        self.var = 0.0
+        self.count = 1
+        self.updated_at = now
+
+    def std(self) -> float:
+        return max(math.sqrt(self.var), settings.ANOMALY_MIN_DEVIATION)
+
+    def update(self, x: float, alpha: float, now: datetime) -> None:
+        if self.count >= settings.ANOMALY_MIN_SAMPLES:
+            bound = _CLIP * self.std()
+            x = min(max(x, self.mean - bound), self.mean + bound)
+        diff = x - self.mean
+        increment = alpha * diff
+        self.mean += increment
+        self.var = (1 - alpha) * (self.var + diff * increment)
+        self.count += 1
+        self.updated_at = now
+
+
+class AnomalyDetector:
+    """Потоковый детектор заниженных цен по всем наблюдаемым предметам"""
+
+    def __init__(self):
+        self._states: dict[tuple[str, str], _EwmaState] = {}
+        self._anomalies: deque[PriceAnomaly] = deque(maxlen=settings.ANOMALY_HISTORY)
+
+        # Counters
+        self.observed = 0
+        self.checked = 0
+        self.flagged = 0
+
+    # ==================== Baseline ====================
+
+    def observe(
+        self,
+        region: str,
+        item_id: str,
+        unit_price: float,
+        now: datetime | None = None,
+    ) -> None:
+        """Учесть продажу по цене за единицу"""
+        if unit_price <= 0:
+            return
+        now = now or datetime.now(timezone.utc)
+        key = (region.upper(), item_id)
+        x = math.log(unit_price)
+        state = self._states.get(key)
+        if state is None:
+            self._states[key] = _EwmaState(x, now)
+        else:
+            state.update(x, 2 / (settings.ANOMALY_EWMA_SPAN + 1), now)
+        self.observed += 1
+
+    def baseline(self, region: str, item_id: str) -> PriceBaseline | None:
+        region = region.upper()
+        state = self._states.get((region, item_id))
+        if state is None:
+            return None
+        return PriceBaseline(
+            region=region,
+            item_id=item_id,
+            samples=state.count,
+            price=round(math.exp(state.mean), 2),
+            deviation=round(state.std(), 4),
+            ready=state.count >= settings.ANOMALY_MIN_SAMPLES,
+            updated_at=state.updated_at,
+        )
+
+    # ==================== Detection ====================
+
+    def check(self, event: LotEvent) -> PriceAnomaly | None:
+        """Проверить новый лот относительно нормальной цены предмета"""
+        state = self._states.get((event.region, event.item_id))
+        if (
+            state is None
+            or state.count < settings.ANOMALY_MIN_SAMPLES
+            or event.buyout_price <= 0
+        ):
+            return None
+
+        self.checked += 1
+        unit_price = event.buyout_price / max(event.amount, 1)
+        deviations = (state.mean - math.log(unit_price)) / state.std()
+        if deviations < settings.ANOMALY_THRESHOLD:
+            return None
+
+        anomaly = PriceAnomaly(
+            region=event.region,
+            item_id=event.item_id,
+            detected_at=event.detected_at,
+            unit_buyout_price=unit_price,
+            baseline_price=round(math.exp(state.mean), 2),
+            deviations=round(deviations, 2),
+            lot=event,
+        )
+        self._anomalies.append(anomaly)
+        self.flagged += 1
+        return anomaly
+
+    def on_lot_events(self, events: list[LotEvent]) -> None:
+        """Слушатель lot_tracker: проверить новые лоты"""
+        for event in events:
+            if event.type == "new":
+                self.check(event)
+
+    def on_sales(self, region: str, item_id: str, sales: list[SaleRow]) -> None:
+        """Слушатель history_store: новые продажи, от старых к новым"""
+        now = datetime.now(timezone.utc)
+        for _, price, amount in sales:
+            self.observe(region, item_id, price / max(amount, 1), now)
+
+    async def seed(self, store: HistoryStore) -> int:
+        """
+        Восстановить оценки по продажам, сохранённым в store (при старте)
+
+        Учитываются последние 4 * ANOMALY_EWMA_SPAN продаж серии - более
+        старые EWMA всё равно почти забыла. Returns: количество предметов
+        """
+        try:
+            series = await store.recent_sale_rows(4 * settings.ANOMALY_EWMA_SPAN)
+        except sqlite3.Error as e:
+            print(f"⚠️ Anomaly baselines not seeded: {e}")
+            return 0
+
+        seeded = 0
+        for (region, item_id), rows in series.items():
+            if (region, item_id) in self._states:
+                continue
+            for time_ms, price, amount in rows:
+                self.observe(region, item_id, price / max(amount, 1), from_ms(time_ms))
+            seeded += 1
+        print(f"📈 Anomaly baselines seeded from stored history ({seeded} items)")
+        return seeded
+
+    def recent(
+        self,
+        region: str | None = None,
+        item_id: str | None = None,
+        limit: int = 100,
+    ) -> list[PriceAnomaly]:
+        """Последние аномалии (новые первыми)"""
+        region = region.upper() if region else None
+        result = []
+        for anomaly in reversed(self._anomalies):
+            if (region is None or anomaly.region == region) and (
+                item_id is None or anomaly.item_id == item_id
+            ):
+                result.append(anomaly)
+                if len(result) >= limit:
+                    break
+        return result
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "items": len(self._states),
+            "observed_sales": self.observed,
+            "checked_lots": self.checked,
+            "flagged": self.flagged,
+        }
+
+
+# Singleton
+anomaly_detector = AnomalyDetector()
+lot_tracker.add_listener(anomaly_detector.on_lot_events)
+history_store.add_listener(anomaly_detector.on_sales)
@@ -0,0 +1,316 @@
+"""
+Arbitrage scanner - фоновый поиск межрегиональных спредов
+
+Проход сканирования берёт все предметы индекса items_db_manager и для
+каждого сравнивает регионы (auction_service.compare_regions): спред -
+разница между медианой недавних продаж в одном регионе и минимальной
+ценой выкупа за единицу в другом. Предметы обрабатываются
+ARBITRAGE_CONCURRENCY воркерами с фоновым приоритетом запросов и мимо
+общего кэша ответов, чтобы проход не вытеснял пользовательские записи.
+
+Прогресс прохода периодически сохраняется в ARBITRAGE_STATE_PATH:
+прерванный проход (перезапуск приложения) продолжается с того же места.
+Результаты последнего завершённого прохода отдаются, пока идёт следующий.
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Literal
+
+from app.clients.rate_limit import Priority, request_priority
+from app.config import settings
+from app.models.arbitrage import (
+    ArbitrageOpportunity,
+    ArbitrageResponse,
+    ArbitrageScanStatus,
+    ScanState,
+)
+from app.models.auction import RegionComparisonResponse
+from app.services.auction_service import auction_service
+from app.services.items_database_manager import items_db_manager
+
+
+def best_spread(
+    comparison: RegionComparisonResponse, min_sales: int
+) -> ArbitrageOpportunity | None:
+    """Лучшая пара регионов (купить дешевле, продать дороже) или None"""
+    best: ArbitrageOpportunity | None = None
+    for buy in comparison.regions:
+        if buy.min_buyout_price is None:
+            continue
+        for sell in comparison.regions:
+            if (
+                sell.region == buy.region
+                or sell.median_sale_price is None
+                or sell.recent_sales < min_sales
+            ):
+                continue
+            spread = sell.median_sale_price - buy.min_buyout_price
+            if spread <= 0 or (best is not None and spread <= best.spread):
+                continue
+            best = ArbitrageOpportunity(
+                item_id=comparison.item_id,
+                buy_region=buy.region,
+                sell_region=sell.region,
+                buy_price=buy.min_buyout_price,
+                sell_price=sell.median_sale_price,
+                spread=spread,
+                spread_pct=round(spread / buy.min_buyout_price * 100, 2),
+                recent_sales=sell.recent_sales,
+            )
+    return best
+
+
+class ArbitrageScanner:
+    """Фоновое сканирование спредов с сохранением прогресса"""
+
+    def __init__(self, state_path: str | Path):
+        self.state_path = Path(state_path)
+        self.service = auction_service
+        self.items = items_db_manager
+
+        # Pass in progress: {started_at, item_ids, results, failed}
+        self._run: dict[str, Any] | None = None
+        # Last completed pass: {finished_at, results}
+        self._last: dict[str, Any] | None = None
+        self._loaded = False
+        self._task: asyncio.Task | None = None
+        self._scanning = False
+        self._last_error: str | None = None
+
+    # ==================== State ====================
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.state_path.exists():
+            return
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+            self._run = state.get("run")
+            self._last = state.get("last")
+        except (ValueError, OSError) as e:
+            print(f"⚠️ Arbitrage state not loaded: {e}")
+
+    def _write(self, payload: str) -> None:
+        # Replace atomically: a crash mid-write keeps the previous checkpoint
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix(".tmp")
+        tmp_path.write_text(payload, encoding="utf-8")
+        os.replace(tmp_path, self.state_path)
+
+    async def _save(self) -> None:
+        payload = json.dumps({"run": self._run, "last": self._last}, ensure_ascii=False)
+        await asyncio.to_thread(self._write, payload)
+
+    # ==================== Scanning ====================
+
+    def _item_names(self) -> dict[str, str]:
+        names: dict[str, str] = {}
+        for realm_items in self.items.search_index.values():
+            for item in realm_items:
+                names.setdefault(item["id"].rsplit("/", 1)[-1], item["name"])
+        return names
+
+    def _begin_run(self) -> None:
+        item_ids: list[str] = []
+        for realm in self.items.search_index:
+            item_ids.extend(self.items.auction_item_ids(realm))
+        self._run = {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "item_ids": list(dict.fromkeys(item_ids)),
+            "results": {},
+            "failed": [],
+        }
+
+    async def _scan_item(
+        self, run: dict[str, Any], item_id: str, names: dict[str, str]
+    ) -> None:
+        # A full pass would evict what interactive users have cached
+        comparison = await self.service.compare_regions(
+            item_id, settings.ARBITRAGE_HISTORY_LIMIT, cached=False
+        )
+        if all(region.errors for region in comparison.regions):
+            run["failed"].append(item_id)
+
+        opportunity = best_spread(comparison, settings.ARBITRAGE_MIN_SALES)
+        if opportunity is not None:
+            opportunity.name = names.get(item_id)
+            run["results"][item_id] = opportunity.model_dump(mode="json")
+        else:
+            run["results"][item_id] = None
+
+    async def _scan(self) -> None:
+        """Пройти (или допройти) текущий проход"""
+        run = self._run
+        assert run is not None, "_begin_run() or a checkpoint starts the pass"
+        results = run["results"]
+        pending = iter([i for i in run["item_ids"] if i not in results])
+        names = self._item_names()
+        scanned_since_save = 0
+
+        async def worker() -> None:
+            nonlocal scanned_since_save
+            # Workers share one iterator: no task per item
+            for item_id in pending:
+                try:
+                    await self._scan_item(run, item_id, names)
+                except Exception as e:
+                    print(f"❌ Arbitrage scan error {item_id}: {e}")
+                    results[item_id] = None
+                    run["failed"].append(item_id)
+                scanned_since_save += 1
+                if scanned_since_save >= settings.ARBITRAGE_CHECKPOINT_EVERY:
+                    scanned_since_save = 0
+                    await self._save()
+
+        self._scanning = True
+        started = time.monotonic()
+        try:
+            with request_priority(Priority.BACKGROUND):
+                await asyncio.gather(
+                    *[worker() for _ in range(settings.ARBITRAGE_CONCURRENCY)]
+                )
+        except BaseException:
+            # Checkpoint on cancel too: the pass resumes after a restart
+            await self._save()
+            raise
+        finally:
+            self._scanning = False
+
+        found = {k: v for k, v in results.items() if v is not None}
+        self._last = {
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "results": found,
+        }
+        self._run = None
+        self._last_error = None
+        await self._save()
+        print(
+            f"💱 Arbitrage scan finished: {len(results)} items, "
+            f"{len(found)} spreads in {time.monotonic() - started:.0f}s"
+        )
+
+    def _delay_until_next(self) -> float:
+        """Секунд до следующего планового прохода"""
+        if self._run is not None or self._last is None:
+            return 0.0
+        finished = datetime.fromisoformat(self._last["finished_at"])
+        elapsed = (datetime.now(timezone.utc) - finished).total_seconds()
+        return max(settings.ARBITRAGE_SCAN_INTERVAL - elapsed, 0.0)
+
+    async def _loop(self, scheduled: bool) -> None:
+        delay = self._delay_until_next() if scheduled else 0.0
+        while True:
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self._run is None:
+                self._begin_run()
+            try:
+                await self._scan()
+            except Exception as e:
+                self._last_error = str(e)
+                print(f"❌ Arbitrage scan failed: {e}")
+            if settings.ARBITRAGE_SCAN_INTERVAL <= 0:
+                return
+            delay = settings.ARBITRAGE_SCAN_INTERVAL
+
+    def trigger(self) -> ArbitrageScanStatus:
+        """Запустить проход сейчас (если он ещё не идёт)"""
+        self._load()
+        if not self._scanning:
+            if self._task is not None:
+                # Waiting for the next scheduled pass
+                self._task.cancel()
+            self._task = asyncio.create_task(self._loop(scheduled=False))
+        return self.status()
+
+    def start(self) -> None:
+        """Продолжить прерванный проход и/или запустить расписание"""
+        self._load()
+        if self._task is not None:
+            return
+        if self._run is not None or settings.ARBITRAGE_SCAN_INTERVAL > 0:
+            self._task = asyncio.create_task(self._loop(scheduled=True))
+            print("💱 Arbitrage scanner started")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    # ==================== Results ====================
+
+    def status(self) -> ArbitrageScanStatus:
+        self._load()
+        run = self._run
+        state: ScanState
+        if self._scanning:
+            state = "running"
+        elif self._last_error:
+            state = "failed"
+        elif self._last is not None:
+            state = "completed"
+        else:
+            state = "idle"
+
+        results = run["results"] if run else {}
+        return ArbitrageScanStatus(
+            state=state,
+            started_at=run["started_at"] if run else None,
+            finished_at=self._last["finished_at"] if self._last else None,
+            total_items=len(run["item_ids"]) if run else 0,
+            scanned_items=len(results),
+            failed_items=len(run["failed"]) if run else 0,
+            opportunities=sum(1 for v in results.values() if v is not None),
+            last_error=self._last_error,
+        )
+
+    def get_opportunities(
+        self,
+        limit: int = 50,
+        sort: Literal["spread", "spread_pct"] = "spread",
+        min_spread_pct: float = 0.0,
+    ) -> ArbitrageResponse:
+        """
+        Спреды последнего завершённого прохода, лучшие первыми
+
+        До первого завершённого прохода - частичные результаты текущего
+        """
+        self._load()
+        if self._last is not None:
+            results, scanned_at, partial = (
+                self._last["results"].values(),
+                self._last["finished_at"],
+                False,
+            )
+        elif self._run is not None:
+            results = [v for v in self._run["results"].values() if v is not None]
+            scanned_at, partial = None, True
+        else:
+            results, scanned_at, partial = [], None, False
+
+        opportunities = [
+            ArbitrageOpportunity.model_validate(v)
+            for v in results
+            if v["spread_pct"] >= min_spread_pct
+        ]
+        opportunities.sort(key=lambda o: getattr(o, sort), reverse=True)
+
+        return ArbitrageResponse(
+            status=self.status(),
+            scanned_at=scanned_at,
+            partial=partial,
+            total=len(opportunities),
+            opportunities=opportunities[:limit],
+        )
+
+
+# Singleton
+arbitrage_scanner = ArbitrageScanner(settings.ARBITRAGE_STATE_PATH)
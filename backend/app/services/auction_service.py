@@ -2,11 +2,38 @@
 Auction service - бизнес-логика для работы с аукционом
 """
 
-from typing import Literal
+import asyncio
+import statistics
+from typing import Any, Literal
+from pydantic import BaseModel, TypeAdapter
 from app.clients.stalcraft import stalcraft_client
-from app.models.auction import AuctionLotsResponse, AuctionHistoryResponse
-from app.core.exceptions import InvalidRegionError
+from app.models.auction import (
+    AuctionLot,
+    AuctionLotsResponse,
+    AuctionHistoryResponse,
+    AuctionBatchItem,
+    AuctionBatchResponse,
+    RegionPriceSummary,
+    RegionComparisonResponse,
+)
+from app.core.exceptions import InvalidRegionError, StalcraftAPIError
 from app.config import settings
+from app.utils import fastjson
+from app.utils.cache import ResponseCache
+
+# Precompiled validators/serializers for the fast path
+_LOTS_ADAPTER = TypeAdapter(AuctionLotsResponse)
+_HISTORY_ADAPTER = TypeAdapter(AuctionHistoryResponse)
+
+
+def _response_size(response: BaseModel) -> int:
+    """Оценка размера ответа в байтах (для бюджета памяти кэша)"""
+    return len(response.model_dump_json())
+
+
+def _unit_price(price: int, amount: int) -> float:
+    """Цена за единицу предмета"""
+    return price / amount if amount > 0 else float(price)
 
 
 class AuctionService:
@@ -14,6 +41,11 @@ class AuctionService:
 
     def __init__(self):
         self.client = stalcraft_client
+        self.cache = ResponseCache(
+            max_bytes=settings.AUCTION_CACHE_MAX_BYTES,
+            stale_ttl=settings.AUCTION_CACHE_STALE_TTL,
+            enabled=settings.AUCTION_CACHE_ENABLED,
+        )
 
     def _validate_region(self, region: str) -> None:
         """Проверить валидность региона"""
@@ -34,21 +66,35 @@ class AuctionService:
         sort: Literal[
             "time_created", "time_left", "current_price", "buyout_price"
         ] = "time_created",
+        cached: bool = True,
     ) -> AuctionLotsResponse:
-        """Получить активные лоты"""
+        """
+        Получить активные лоты
+
+        cached=False - мимо общего кэша: фоновые проходы не вытесняют
+        записи, нужные пользователям
+        """
         self._validate_region(region)
+        region = region.upper()
 
-        data = await self.client.get_auction_lots(
-            region=region.upper(),
-            item_id=item_id,
-            additional=additional,
-            limit=limit,
-            offset=offset,
-            order=order,
-            sort=sort,
-        )
+        async def fetch() -> AuctionLotsResponse:
+            data = await self.client.get_auction_lots(
+                region=region,
+                item_id=item_id,
+                additional=additional,
+                limit=limit,
+                offset=offset,
+                order=order,
+                sort=sort,
+            )
+            return AuctionLotsResponse(**data)
 
-        return AuctionLotsResponse(**data)
+        if not cached:
+            return await fetch()
+        key = ("lots", region, item_id, additional, limit, offset, order, sort)
+        return await self.cache.get_or_fetch(
+            key, settings.AUCTION_CACHE_LOTS_TTL, fetch, _response_size
+        )
 
     async def get_history(
         self,
@@ -57,19 +103,295 @@ class AuctionService:
         additional: bool = False,
         limit: int = 20,
         offset: int = 0,
+        cached: bool = True,
     ) -> AuctionHistoryResponse:
-        """Получить историю продаж"""
+        """Получить историю продаж (cached=False - мимо общего кэша)"""
+        self._validate_region(region)
+        region = region.upper()
+
+        async def fetch() -> AuctionHistoryResponse:
+            data = await self.client.get_auction_history(
+                region=region,
+                item_id=item_id,
+                additional=additional,
+                limit=limit,
+                offset=offset,
+            )
+            return AuctionHistoryResponse(**data)
+
+        if not cached:
+            return await fetch()
+        key = ("history", region, item_id, additional, limit, offset)
+        return await self.cache.get_or_fetch(
+            key, settings.AUCTION_CACHE_HISTORY_TTL, fetch, _response_size
+        )
+
+    @staticmethod
+    def _encode(data: dict[str, Any], adapter: TypeAdapter) -> bytes:
+        """
+        Ответ upstream -> готовый JSON
+
+        fast: валидация предкомпилированным TypeAdapter и сериализация в Rust
+        passthrough: без валидации, ответ upstream отдаётся как есть
+        """
+        if settings.AUCTION_RESPONSE_MODE == "passthrough":
+            return fastjson.dumps(data)
+        return adapter.dump_json(adapter.validate_python(data))
+
+    async def get_lots_json(
+        self,
+        region: str,
+        item_id: str,
+        additional: bool = False,
+        limit: int = 20,
+        offset: int = 0,
+        order: Literal["asc", "desc"] = "desc",
+        sort: Literal[
+            "time_created", "time_left", "current_price", "buyout_price"
+        ] = "time_created",
+    ) -> bytes:
+        """
+        Получить активные лоты сразу в виде JSON (fast path)
+
+        В кэше хранятся готовые байты, поэтому попадание в кэш не требует
+        ни валидации, ни сериализации
+        """
         self._validate_region(region)
+        region = region.upper()
+
+        async def fetch() -> bytes:
+            data = await self.client.get_auction_lots(
+                region=region,
+                item_id=item_id,
+                additional=additional,
+                limit=limit,
+                offset=offset,
+                order=order,
+                sort=sort,
+            )
+            return self._encode(data, _LOTS_ADAPTER)
+
+        key = ("lots-json", region, item_id, additional, limit, offset, order, sort)
+        return await self.cache.get_or_fetch(
+            key, settings.AUCTION_CACHE_LOTS_TTL, fetch, len
+        )
+
+    async def get_history_json(
+        self,
+        region: str,
+        item_id: str,
+        additional: bool = False,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> bytes:
+        """Получить историю продаж сразу в виде JSON (fast path)"""
+        self._validate_region(region)
+        region = region.upper()
+
+        async def fetch() -> bytes:
+            data = await self.client.get_auction_history(
+                region=region,
+                item_id=item_id,
+                additional=additional,
+                limit=limit,
+                offset=offset,
+            )
+            return self._encode(data, _HISTORY_ADAPTER)
+
+        key = ("history-json", region, item_id, additional, limit, offset)
+        return await self.cache.get_or_fetch(
+            key, settings.AUCTION_CACHE_HISTORY_TTL, fetch, len
+        )
+
+    def prime_lots(
+        self, region: str, item_id: str, data: dict[str, Any], ttl: float
+    ) -> AuctionLotsResponse:
+        """
+        Положить в кэш лоты, загруженные в фоне (параметры запроса по умолчанию)
+
+        Так обычный запрос /lots к предмету из watchlist не ждёт upstream
+        """
+        region = region.upper()
+        response = AuctionLotsResponse(**data)
+        params = (region, item_id, False, 20, 0, "desc", "time_created")
+
+        self.cache.set(("lots", *params), response, ttl, _response_size(response))
+        if settings.AUCTION_RESPONSE_MODE != "model":
+            body = self._encode(data, _LOTS_ADAPTER)
+            self.cache.set(("lots-json", *params), body, ttl, len(body))
+        return response
+
+    async def get_batch(
+        self,
+        region: str,
+        item_ids: list[str],
+        lots: bool = True,
+        history: bool = False,
+        additional: bool = False,
+        limit: int = 20,
+    ) -> AuctionBatchResponse:
+        """
+        Получить лоты и/или историю для нескольких предметов
+
+        Предметы загружаются параллельно (не больше AUCTION_BATCH_CONCURRENCY
+        одновременно) через кэш сервиса; ошибка одного предмета не влияет
+        на остальные и возвращается в его `errors`
+        """
+        self._validate_region(region)
+        semaphore = asyncio.Semaphore(settings.AUCTION_BATCH_CONCURRENCY)
+
+        async def fetch_item(item_id: str) -> AuctionBatchItem:
+            result = AuctionBatchItem(item_id=item_id)
+            async with semaphore:
+                if lots:
+                    try:
+                        result.lots = await self.get_lots(
+                            region, item_id, additional=additional, limit=limit
+                        )
+                    except StalcraftAPIError as e:
+                        result.errors["lots"] = str(e)
+                if history:
+                    try:
+                        result.history = await self.get_history(
+                            region, item_id, additional=additional, limit=limit
+                        )
+                    except StalcraftAPIError as e:
+                        result.errors["history"] = str(e)
+            return result
+
+        # Duplicates are fetched once, order is preserved
+        unique_ids = list(dict.fromkeys(item_ids))
+        items = await asyncio.gather(*[fetch_item(item_id) for item_id in unique_ids])
+
+        return AuctionBatchResponse(region=region.upper(), items=items)
+
+    async def _min_unit_buyout(
+        self, region: str, item_id: str, cached: bool
+    ) -> tuple[int, float | None, bool]:
+        """
+        (количество лотов, минимальная цена выкупа за единицу, приблизительно ли)
+
+        Upstream сортирует по цене всего лота, поэтому стак, дешёвый за
+        единицу, может оказаться за первой страницей. Интерактивный запрос
+        (cached=True) читает не больше COMPARE_MAX_LOT_PAGES страниц, а
+        результат кэшируется на AUCTION_CACHE_LOTS_TTL; фоновый
+        (cached=False) обходит всю книгу
+        """
+        region = region.upper()
+        page_size = 200
+
+        async def fetch() -> tuple[int, float | None, bool]:
+            first = await self.get_lots(
+                region,
+                item_id,
+                limit=page_size,
+                order="asc",
+                sort="buyout_price",
+                cached=cached,
+            )
+            # Continue from the page already in hand
+            offsets = list(range(len(first.lots), first.total, page_size))
+            approximate = False
+            if cached and len(offsets) >= settings.COMPARE_MAX_LOT_PAGES:
+                offsets = offsets[: settings.COMPARE_MAX_LOT_PAGES - 1]
+                approximate = True
+
+            semaphore = asyncio.Semaphore(settings.AUCTION_PAGE_PREFETCH)
+
+            async def fetch_page(offset: int) -> list[AuctionLot]:
+                async with semaphore:
+                    data = await self.client.get_auction_lots(
+                        region=region,
+                        item_id=item_id,
+                        limit=page_size,
+                        offset=offset,
+                        order="asc",
+                        sort="buyout_price",
+                    )
+                return AuctionLotsResponse(**data).lots
+
+            pages = await asyncio.gather(*[fetch_page(offset) for offset in offsets])
+            best = min(
+                (
+                    _unit_price(lot.buyoutPrice, lot.amount)
+                    for page in [first.lots, *pages]
+                    for lot in page
+                    if lot.buyoutPrice > 0
+                ),
+                default=None,
+            )
+            return first.total, best, approximate
+
+        if not cached:
+            return await fetch()
+        return await self.cache.get_or_fetch(
+            ("min-unit-buyout", region, item_id),
+            settings.AUCTION_CACHE_LOTS_TTL,
+            fetch,
+            lambda _: 64,
+        )
+
+    async def compare_regions(
+        self, item_id: str, history_limit: int = 100, cached: bool = True
+    ) -> RegionComparisonResponse:
+        """
+        Сравнить цены предмета во всех поддерживаемых регионах
+
+        Регионы опрашиваются параллельно через get_lots/get_history,
+        поэтому запросы проходят через кэш и объединение одинаковых запросов
+        (cached=False - только объединение, общий кэш не заполняется)
+        """
+
+        async def summarize(region: str) -> RegionPriceSummary:
+            summary = RegionPriceSummary(region=region)
+
+            async def load_lots() -> None:
+                try:
+                    (
+                        summary.lot_count,
+                        summary.min_buyout_price,
+                        summary.min_buyout_approximate,
+                    ) = await self._min_unit_buyout(region, item_id, cached)
+                except StalcraftAPIError as e:
+                    summary.errors["lots"] = str(e)
+
+            async def load_history() -> None:
+                try:
+                    history = await self.get_history(
+                        region, item_id, limit=history_limit, cached=cached
+                    )
+                except StalcraftAPIError as e:
+                    summary.errors["history"] = str(e)
+                    return
+                prices = [
+                    _unit_price(sale.price, sale.amount) for sale in history.prices
+                ]
+                summary.recent_sales = len(prices)
+                if prices:
+                    summary.median_sale_price = statistics.median(prices)
+
+            await asyncio.gather(load_lots(), load_history())
+            return summary
+
+        regions = await asyncio.gather(
+            *[summarize(region) for region in settings.SUPPORTED_REGIONS]
+        )
+
+        priced = [
+            (r.min_buyout_price, r.region)
+            for r in regions
+            if r.min_buyout_price is not None
+        ]
 
-        data = await self.client.get_auction_history(
-            region=region.upper(),
+        return RegionComparisonResponse(
             item_id=item_id,
-            additional=additional,
-            limit=limit,
-            offset=offset,
+            regions=regions,
+            cheapest_region=min(priced, key=lambda p: p[0])[1] if priced else None,
         )
 
-        return AuctionHistoryResponse(**data)
+    def cache_stats(self) -> dict[str, Any]:
+        """Статистика кэша (hit/miss/eviction)"""
+        return self.cache.stats()
 
 
 # Singleton
@@ -0,0 +1,604 @@
+"""
+History store - локальное хранилище истории продаж (SQLite)
+
+Для каждой серии (регион, предмет) хранится watermark - время последней
+загруженной продажи. Обновление читает историю upstream от новых продаж
+к старым и останавливается, как только дошло до уже сохранённых данных,
+поэтому каждая продажа загружается один раз.
+
+Свечи (OHLC, объём, VWAP) по интервалам 5m / 1h / 1d обновляются в той же
+транзакции, что и новые продажи, - графики читают готовые свечи, а не сырые
+продажи.
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from contextlib import aclosing
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from app.clients.stalcraft import stalcraft_client
+from app.config import settings
+from app.core.exceptions import InvalidRegionError
+from app.models.auction import (
+    AuctionPriceHistory,
+    Candle,
+    CandleInterval,
+    CandlesResponse,
+    StoredHistoryResponse,
+)
+from app.utils.singleflight import SingleFlight
+
+# (time_ms, price, amount) of a stored sale
+SaleRow = tuple[int, int, int]
+# Called after a refresh with the sales that were really new, oldest first
+SalesListener = Callable[[str, str, list[SaleRow]], None]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sales (
+    region TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    time_ms INTEGER NOT NULL,
+    price INTEGER NOT NULL,
+    amount INTEGER NOT NULL,
+    additional TEXT NOT NULL DEFAULT '{}',
+    PRIMARY KEY (region, item_id, time_ms, price, amount)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS candles (
+    region TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    bucket_ms INTEGER NOT NULL,
+    open REAL NOT NULL,
+    open_ms INTEGER NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    close REAL NOT NULL,
+    close_ms INTEGER NOT NULL,
+    volume INTEGER NOT NULL,
+    turnover INTEGER NOT NULL,
+    trades INTEGER NOT NULL,
+    PRIMARY KEY (region, item_id, interval, bucket_ms)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS series (
+    region TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    watermark_ms INTEGER NOT NULL,
+    refreshed_at REAL NOT NULL,
+    PRIMARY KEY (region, item_id)
+);
+"""
+
+# Merge a partial candle into the stored one (right-hand sides see old values)
+_CANDLE_UPSERT = """
+INSERT INTO candles (
+    region, item_id, interval, bucket_ms, open, open_ms, high, low,
+    close, close_ms, volume, turnover, trades
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (region, item_id, interval, bucket_ms) DO UPDATE SET
+    open = CASE WHEN excluded.open_ms < open_ms THEN excluded.open ELSE open END,
+    open_ms = min(open_ms, excluded.open_ms),
+    high = max(high, excluded.high),
+    low = min(low, excluded.low),
+    close = CASE WHEN excluded.close_ms >= close_ms
+        THEN excluded.close ELSE close END,
+    close_ms = max(close_ms, excluded.close_ms),
+    volume = volume + excluded.volume,
+    turnover = turnover + excluded.turnover,
+    trades = trades + excluded.trades
+"""
+
+# Candle size in milliseconds
+CANDLE_INTERVALS: dict[str, int] = {
+    "5m": 5 * 60 * 1000,
+    "1h": 60 * 60 * 1000,
+    "1d": 24 * 60 * 60 * 1000,
+}
+
+
+def to_ms(value: datetime) -> int:
+    """datetime -> epoch milliseconds (naive = UTC)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def from_ms(value: int) -> datetime:
+    return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+
+
+def aggregate_candles(sales: list[tuple[int, int, int]]) -> dict[tuple[str, int], list]:
+    """
+    Продажи (time_ms, price, amount) -> частичные свечи по всем интервалам
+
+    Returns:
+        {(interval, bucket_ms): [open, open_ms, high, low, close, close_ms,
+        volume, turnover, trades]}
+    """
+    candles: dict[tuple[str, int], list] = {}
+    for time_ms, price, amount in sales:
+        unit = price / amount if amount > 0 else float(price)
+        for interval, size in CANDLE_INTERVALS.items():
+            key = (interval, time_ms - time_ms % size)
+            candle = candles.get(key)
+            if candle is None:
+                candles[key] = [
+                    unit,
+                    time_ms,
+                    unit,
+                    unit,
+                    unit,
+                    time_ms,
+                    amount,
+                    price,
+                    1,
+                ]
+                continue
+            if time_ms < candle[1]:
+                candle[0], candle[1] = unit, time_ms
+            candle[2] = max(candle[2], unit)
+            candle[3] = min(candle[3], unit)
+            if time_ms >= candle[5]:
+                candle[4], candle[5] = unit, time_ms
+            candle[6] += amount
+            candle[7] += price
+            candle[8] += 1
+    return candles
+
+
+class HistoryStore:
+    """
+    SQLite хранилище истории продаж с инкрементальной загрузкой
+
+    Повтор продажи с тем же временем, ценой и количеством считается той же
+    записью (страницы upstream на границе watermark перекрываются)
+    """
+
+    def __init__(self, path: str | Path):
+        self.client = stalcraft_client
+        self.path = Path(path)
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._inflight = SingleFlight()
+        self._refreshed: dict[tuple[str, str], float] = {}
+        self._listeners: list[SalesListener] = []
+
+    # ==================== SQLite (sync, run in a thread) ====================
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            has_candles = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'candles'"
+            ).fetchone()
+            conn.executescript(_SCHEMA)
+            if not has_candles:
+                self._rebuild_candles(conn)
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _merge_candles(
+        conn: sqlite3.Connection,
+        region: str,
+        item_id: str,
+        sales: list[tuple[int, int, int]],
+    ) -> None:
+        conn.executemany(
+            _CANDLE_UPSERT,
+            [
+                (region, item_id, interval, bucket_ms, *candle)
+                for (interval, bucket_ms), candle in aggregate_candles(sales).items()
+            ],
+        )
+
+    def _rebuild_candles(self, conn: sqlite3.Connection) -> None:
+        """Построить свечи по уже сохранённым продажам"""
+        series = conn.execute("SELECT DISTINCT region, item_id FROM sales").fetchall()
+        with conn:
+            for region, item_id in series:
+                sales = conn.execute(
+                    "SELECT time_ms, price, amount FROM sales "
+                    "WHERE region = ? AND item_id = ?",
+                    (region, item_id),
+                ).fetchall()
+                self._merge_candles(conn, region, item_id, sales)
+
+    def _watermark(self, region: str, item_id: str) -> int | None:
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT watermark_ms FROM series WHERE region = ? AND item_id = ?",
+                    (region, item_id),
+                )
+                .fetchone()
+            )
+        return row[0] if row else None
+
+    def _append(
+        self, region: str, item_id: str, sales: list[AuctionPriceHistory]
+    ) -> list[SaleRow]:
+        """
+        Сохранить продажи и сдвинуть watermark (одна транзакция)
+
+        Returns:
+            Действительно новые продажи
+        """
+        rows = [
+            (
+                region,
+                item_id,
+                to_ms(sale.time),
+                sale.price,
+                sale.amount,
+                json.dumps(sale.additional, ensure_ascii=False),
+            )
+            for sale in sales
+        ]
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                # Only sales that are really new go into the candles
+                new_sales = []
+                for row in rows:
+                    cursor = conn.execute(
+                        "INSERT OR IGNORE INTO sales "
+                        "(region, item_id, time_ms, price, amount, additional) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        row,
+                    )
+                    if cursor.rowcount:
+                        new_sales.append(row[2:5])
+                self._merge_candles(conn, region, item_id, new_sales)
+                conn.execute(
+                    "INSERT INTO series (region, item_id, watermark_ms, refreshed_at) "
+                    "VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (region, item_id) DO UPDATE SET "
+                    "watermark_ms = max(watermark_ms, excluded.watermark_ms), "
+                    "refreshed_at = excluded.refreshed_at",
+                    (
+                        region,
+                        item_id,
+                        max((row[2] for row in rows), default=0),
+                        time.time(),
+                    ),
+                )
+        return new_sales
+
+    @staticmethod
+    def _period_filter(
+        region: str, item_id: str, since_ms: int | None, until_ms: int | None
+    ) -> tuple[str, list[Any]]:
+        """WHERE для продаж серии за период [since, until)"""
+        where = "region = ? AND item_id = ?"
+        params: list[Any] = [region, item_id]
+        if since_ms is not None:
+            where += " AND time_ms >= ?"
+            params.append(since_ms)
+        if until_ms is not None:
+            where += " AND time_ms < ?"
+            params.append(until_ms)
+        return where, params
+
+    def _query(
+        self,
+        region: str,
+        item_id: str,
+        since_ms: int | None,
+        until_ms: int | None,
+        limit: int | None,
+    ) -> tuple[list[AuctionPriceHistory], int]:
+        where, params = self._period_filter(region, item_id, since_ms, until_ms)
+
+        with self._lock:
+            conn = self._connect()
+            total = conn.execute(
+                f"SELECT count(*) FROM sales WHERE {where}", params
+            ).fetchone()[0]
+            rows = conn.execute(
+                "SELECT time_ms, price, amount, additional FROM sales "
+                f"WHERE {where} ORDER BY time_ms DESC LIMIT ?",
+                [*params, -1 if limit is None else limit],
+            ).fetchall()
+
+        sales = [
+            AuctionPriceHistory(
+                time=from_ms(time_ms),
+                price=price,
+                amount=amount,
+                additional=json.loads(additional),
+            )
+            for time_ms, price, amount, additional in rows
+        ]
+        return sales, total
+
+    def _sale_rows(
+        self, region: str, item_id: str, since_ms: int | None, until_ms: int | None
+    ) -> list[tuple[int, int, int]]:
+        where, params = self._period_filter(region, item_id, since_ms, until_ms)
+
+        with self._lock:
+            return (
+                self._connect()
+                .execute(
+                    f"SELECT time_ms, price, amount FROM sales WHERE {where}", params
+                )
+                .fetchall()
+            )
+
+    def _candles(
+        self,
+        region: str,
+        item_id: str,
+        interval: str,
+        since_ms: int | None,
+        until_ms: int | None,
+        limit: int,
+    ) -> list[Candle]:
+        where = "region = ? AND item_id = ? AND interval = ?"
+        params: list[Any] = [region, item_id, interval]
+        if since_ms is not None:
+            where += " AND bucket_ms >= ?"
+            params.append(since_ms - since_ms % CANDLE_INTERVALS[interval])
+        if until_ms is not None:
+            where += " AND bucket_ms < ?"
+            params.append(until_ms)
+
+        with self._lock:
+            rows = (
+                self._connect()
+                .execute(
+                    "SELECT bucket_ms, open, high, low, close, volume, turnover, "
+                    f"trades FROM candles WHERE {where} "
+                    "ORDER BY bucket_ms DESC LIMIT ?",
+                    [*params, limit],
+                )
+                .fetchall()
+            )
+
+        # Latest `limit` candles, oldest first
+        rows.reverse()
+        return [
+            Candle(
+                time=from_ms(bucket_ms),
+                open=open_,
+                high=high,
+                low=low,
+                close=close,
+                volume=volume,
+                vwap=turnover / volume if volume else close,
+                trades=trades,
+            )
+            for bucket_ms, open_, high, low, close, volume, turnover, trades in rows
+        ]
+
+    def _series_stats(self, region: str, item_id: str) -> dict[str, Any]:
+        with self._lock:
+            count, oldest = (
+                self._connect()
+                .execute(
+                    "SELECT count(*), min(time_ms) FROM sales "
+                    "WHERE region = ? AND item_id = ?",
+                    (region, item_id),
+                )
+                .fetchone()
+            )
+        return {"stored": count, "oldest": from_ms(oldest) if oldest else None}
+
+    def _recent_rows(self, limit: int) -> dict[tuple[str, str], list[SaleRow]]:
+        """Последние limit продаж каждой серии, от старых к новым"""
+        with self._lock:
+            conn = self._connect()
+            series = conn.execute("SELECT region, item_id FROM series").fetchall()
+            result = {}
+            for region, item_id in series:
+                rows = conn.execute(
+                    "SELECT time_ms, price, amount FROM sales "
+                    "WHERE region = ? AND item_id = ? "
+                    "ORDER BY time_ms DESC LIMIT ?",
+                    (region, item_id, limit),
+                ).fetchall()
+                result[(region, item_id)] = rows[::-1]
+        return result
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ==================== Incremental refresh ====================
+
+    def _validate_region(self, region: str) -> str:
+        region = region.upper()
+        if region not in settings.SUPPORTED_REGIONS:
+            raise InvalidRegionError(
+                f"Invalid region '{region}'. "
+                f"Supported: {', '.join(settings.SUPPORTED_REGIONS)}"
+            )
+        return region
+
+    async def refresh(self, region: str, item_id: str) -> int:
+        """
+        Догрузить продажи новее watermark
+
+        Первое обновление серии загружает не больше
+        HISTORY_BACKFILL_MAX_RECORDS последних продаж. Если upstream упал
+        посреди обновления, ничего не сохраняется (иначе в истории
+        появилась бы дыра под новым watermark).
+
+        Returns:
+            Количество новых записей
+        """
+        region = self._validate_region(region)
+
+        async def fetch() -> int:
+            watermark = await asyncio.to_thread(self._watermark, region, item_id)
+            sales: list[AuctionPriceHistory] = []
+
+            history = self.client.iter_auction_history(
+                region,
+                item_id,
+                additional=True,
+                # Incremental refresh usually ends on the first page
+                prefetch=1 if watermark is not None else None,
+            )
+            async with aclosing(history):
+                async for sale in history:
+                    if watermark is not None and to_ms(sale.time) < watermark:
+                        break
+                    sales.append(sale)
+                    if (
+                        watermark is None
+                        and len(sales) >= settings.HISTORY_BACKFILL_MAX_RECORDS
+                    ):
+                        break
+
+            new_sales: list[SaleRow] = []
+            if sales:
+                new_sales = await asyncio.to_thread(
+                    self._append, region, item_id, sales
+                )
+            self._refreshed[(region, item_id)] = time.monotonic()
+            if new_sales:
+                print(f"💾 History {region}:{item_id}: +{len(new_sales)} sales")
+                new_sales.sort()
+                for listener in list(self._listeners):
+                    listener(region, item_id, new_sales)
+            return len(new_sales)
+
+        return await self._inflight.do(("refresh", region, item_id), fetch)
+
+    def add_listener(self, listener: SalesListener) -> None:
+        """Подписаться на новые продажи (вызывается синхронно после обновления)"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: SalesListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _needs_refresh(self, region: str, item_id: str) -> bool:
+        refreshed = self._refreshed.get((region, item_id))
+        return (
+            refreshed is None
+            or time.monotonic() - refreshed >= settings.HISTORY_REFRESH_INTERVAL
+        )
+
+    async def recent_sale_rows(
+        self, limit: int
+    ) -> dict[tuple[str, str], list[SaleRow]]:
+        """Последние limit сохранённых продаж каждой серии (без обновления)"""
+        return await asyncio.to_thread(self._recent_rows, limit)
+
+    async def get_history(
+        self,
+        region: str,
+        item_id: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: int | None = None,
+        refresh: bool = True,
+    ) -> StoredHistoryResponse:
+        """
+        Сохранённая история продаж за период [since, until)
+
+        При refresh=True серия сначала догружается из upstream
+        (не чаще, чем раз в HISTORY_REFRESH_INTERVAL секунд)
+        """
+        region = self._validate_region(region)
+        if refresh and self._needs_refresh(region, item_id):
+            await self.refresh(region, item_id)
+
+        sales, total = await asyncio.to_thread(
+            self._query,
+            region,
+            item_id,
+            to_ms(since) if since else None,
+            to_ms(until) if until else None,
+            limit,
+        )
+        watermark = await asyncio.to_thread(self._watermark, region, item_id)
+        series = await asyncio.to_thread(self._series_stats, region, item_id)
+
+        return StoredHistoryResponse(
+            region=region,
+            item_id=item_id,
+            total=total,
+            stored=series["stored"],
+            watermark=from_ms(watermark) if watermark else None,
+            oldest=series["oldest"],
+            prices=sales,
+        )
+
+    async def sale_rows(
+        self,
+        region: str,
+        item_id: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        refresh: bool = True,
+    ) -> list[tuple[int, int, int]]:
+        """
+        Продажи за период [since, until) как строки (time_ms, price, amount)
+
+        Без сборки Pydantic-моделей - для векторных расчётов
+        """
+        region = self._validate_region(region)
+        if refresh and self._needs_refresh(region, item_id):
+            await self.refresh(region, item_id)
+
+        return await asyncio.to_thread(
+            self._sale_rows,
+            region,
+            item_id,
+            to_ms(since) if since else None,
+            to_ms(until) if until else None,
+        )
+
+    async def get_candles(
+        self,
+        region: str,
+        item_id: str,
+        interval: CandleInterval = "1h",
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: int = 500,
+        refresh: bool = True,
+    ) -> CandlesResponse:
+        """
+        Свечи продаж за период [since, until) - последние `limit` интервалов
+
+        Свечи поддерживаются инкрементально при сохранении продаж, поэтому
+        стоимость запроса не зависит от объёма накопленной истории
+        """
+        region = self._validate_region(region)
+        if refresh and self._needs_refresh(region, item_id):
+            await self.refresh(region, item_id)
+
+        candles = await asyncio.to_thread(
+            self._candles,
+            region,
+            item_id,
+            interval,
+            to_ms(since) if since else None,
+            to_ms(until) if until else None,
+            limit,
+        )
+        return CandlesResponse(
+            region=region, item_id=item_id, interval=interval, candles=candles
+        )
+
+
+# Singleton
+history_store = HistoryStore(settings.HISTORY_DB_PATH)
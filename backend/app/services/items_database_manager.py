@@ -4,13 +4,219 @@ Items Database Manager - manages local cache of stalcraft-database
 
 import asyncio
 import json
+import os
+import tarfile
+import time
+from collections.abc import Iterator
+from concurrent.futures import (
+    ALL_COMPLETED,
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any
 
-import httpx
-
+from app.clients.resilience import resilient_get
 from app.config import settings
+from app.utils.ngram_index import NgramIndex
+
+# Service directories that never contain indexable items
+_EXCLUDED_DIRS = {"_variants", "_deprecated"}
+
+# Item files per process-pool task (local source)
+_LOCAL_BATCH_SIZE = 256
+
+# Seconds between download progress reports
+_PROGRESS_INTERVAL = 5.0
+
+# (realm, category, item_id, file path or file bytes)
+LocalItemFile = tuple[str, str, str, str | bytes]
+
+
+def split_item_path(parts: list[str], categories: list[str]) -> tuple[str, str] | None:
+    """
+    (category, item_id) of an item file path split into parts, without ".json"
+
+    categories must be ordered longest first: a file belongs to the longest
+    matching category, its ID is the rest of the path ("subdir/id" at any
+    depth). Files under _variants/_deprecated and outside the categories
+    give None.
+    """
+    if _EXCLUDED_DIRS.intersection(parts):
+        return None
+    for category in categories:
+        depth = category.count("/") + 1
+        if len(parts) > depth and "/".join(parts[:depth]) == category:
+            return category, "/".join(parts[depth:])
+    return None
+
+
+def group_item_paths(paths: list[str], categories: list[str]) -> dict[str, list[str]]:
+    """Group item file paths (relative to {realm}/items) by category"""
+    # Longest first: "weapon/device" wins over a hypothetical "weapon"
+    ordered = sorted(categories, key=len, reverse=True)
+    grouped: dict[str, list[str]] = {category: [] for category in categories}
+
+    for path in paths:
+        if not path.endswith(".json"):
+            continue
+        found = split_item_path(path[: -len(".json")].split("/"), ordered)
+        if found is not None:
+            grouped[found[0]].append(found[1])
+
+    return grouped
+
+
+def build_item_entry(
+    data: dict[str, Any], realm: str, category: str, item_id: str, raw_base_url: str
+) -> dict[str, Any]:
+    """Searchable index entry from an item JSON"""
+    # Extract display name
+    name_obj = data.get("name", {})
+    # Use only the item ID part (without subdirectory) as fallback
+    display_name = item_id.split("/")[-1]
+    lines = {}  # Инициализация lines для использования ниже
+
+    if name_obj.get("type") == "translation":
+        lines = name_obj.get("lines", {})
+        display_name = lines.get("ru") or lines.get("en", display_name)
+    elif name_obj.get("type") == "text":
+        display_name = name_obj.get("text", display_name)
+
+    # Build searchable item
+    return {
+        "id": item_id,  # Сохраняем полный путь (с подпапкой если есть)
+        "name": display_name,
+        "category": category,
+        "icon_url": f"{raw_base_url}/{realm}/icons/{category}/{item_id}.png",
+        # Store name variants for search
+        "name_lower": display_name.lower(),
+        "name_ru": lines.get("ru", "").lower(),
+        "name_en": lines.get("en", "").lower(),
+    }
+
+
+def _parse_item_batch(
+    batch: list[LocalItemFile], raw_base_url: str
+) -> list[tuple[str, dict[str, Any]]]:
+    """Process-pool task: parse item files into (realm, entry)"""
+    entries = []
+    for realm, category, item_id, source in batch:
+        try:
+            raw = source if isinstance(source, bytes) else Path(source).read_bytes()
+            data = json.loads(raw)
+            entries.append(
+                (realm, build_item_entry(data, realm, category, item_id, raw_base_url))
+            )
+        except (OSError, ValueError, AttributeError):
+            continue  # Skip unreadable items
+    return entries
+
+
+def _iter_local_item_files(
+    root: Path, realms: list[str], categories: list[str]
+) -> Iterator[LocalItemFile]:
+    """
+    Stream item files of a checked-out tree or a tar archive
+
+    Directory: paths are yielded and read by the workers. Archive: read
+    sequentially (any compression), each member's bytes are yielded as soon
+    as it is reached; a top-level directory ("stalcraft-database-main/") is
+    allowed.
+    """
+    if root.is_dir():
+        for realm in realms:
+            base = root / realm / "items"
+            for dirpath, dirnames, filenames in os.walk(base):
+                dirnames[:] = [d for d in dirnames if d not in _EXCLUDED_DIRS]
+                rel = Path(dirpath).relative_to(base).parts
+                for filename in filenames:
+                    if not filename.endswith(".json"):
+                        continue
+                    parts = [*rel, filename[: -len(".json")]]
+                    found = split_item_path(parts, categories)
+                    if found is not None:
+                        yield realm, *found, os.path.join(dirpath, filename)
+        return
+
+    # Random-access mode, read front to back: a truncated archive raises
+    # instead of ending early like a stream ("r|*") would
+    with tarfile.open(root, "r:*") as archive:
+        for member in archive:
+            if not member.isfile() or not member.name.endswith(".json"):
+                continue
+            parts = member.name[: -len(".json")].split("/")
+            for i in range(len(parts) - 2):
+                if parts[i] in realms and parts[i + 1] == "items":
+                    found = split_item_path(parts[i + 2 :], categories)
+                    file = archive.extractfile(member)
+                    if found is not None and file is not None:
+                        yield parts[i], *found, file.read()
+                    break
+
+
+def build_local_index(
+    root: Path,
+    realms: list[str],
+    categories: list[str],
+    raw_base_url: str,
+    workers: int,
+) -> dict[str, list[dict[str, Any]]]:
+    """
+    Build the search index from a local tree or archive
+
+    Files are streamed in batches to a process pool; at most two batches per
+    worker are in flight, so the tree is never held in memory
+    """
+    ordered = sorted(categories, key=len, reverse=True)
+    index: dict[str, list[dict[str, Any]]] = {realm: [] for realm in realms}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: set[Future] = set()
+
+        def collect(return_when: str) -> set[Future]:
+            done, rest = wait(pending, return_when=return_when)
+            for future in done:
+                for realm, entry in future.result():
+                    index[realm].append(entry)
+            return rest
+
+        batch: list[LocalItemFile] = []
+        for item_file in _iter_local_item_files(root, realms, ordered):
+            batch.append(item_file)
+            if len(batch) < _LOCAL_BATCH_SIZE:
+                continue
+            pending.add(pool.submit(_parse_item_batch, batch, raw_base_url))
+            batch = []
+            if len(pending) >= workers * 2:
+                pending = collect(FIRST_COMPLETED)
+        if batch:
+            pending.add(pool.submit(_parse_item_batch, batch, raw_base_url))
+        collect(ALL_COMPLETED)
+
+    # Batches finish in any order: keep the category order of the GitHub source
+    position = {category: i for i, category in enumerate(categories)}
+    for items in index.values():
+        items.sort(key=lambda item: (position[item["category"]], item["id"]))
+    return index
+
+
+@dataclass
+class _RealmPlan:
+    """Incremental update of one realm: kept items and files to download"""
+
+    realm: str
+    tree: dict[str, str]  # {path: blob sha}
+    kept: list[dict[str, Any]] = field(default_factory=list)
+    missing: list[tuple[str, str]] = field(default_factory=list)  # (category, id)
+    added: int = 0
+    changed: int = 0
+    deleted: int = 0
 
 
 class ItemsDatabaseManager:
@@ -28,8 +234,15 @@ class ItemsDatabaseManager:
 
         # In-memory search index
         self.search_index = {}  # {realm: [{id, name, category, icon_url}, ...]}
+        self.ngram_index: dict[str, NgramIndex] = {}  # {realm: index over names}
         self.last_update = None
 
+        # Source revision of the index: commit, ETag of the branch ref and
+        # blob SHA of every indexed file {realm: {"category/id.json": sha}}
+        self.commit_sha: str | None = None
+        self.ref_etag: str | None = None
+        self.blobs: dict[str, dict[str, str]] = {}
+
         # GitHub configuration
         self.github_repo = settings.GITHUB_DB_REPO
         self.github_branch = settings.GITHUB_DB_BRANCH
@@ -37,6 +250,13 @@ class ItemsDatabaseManager:
             f"https://raw.githubusercontent.com/{self.github_repo}/{self.github_branch}"
         )
         self.api_base_url = f"https://api.github.com/repos/{self.github_repo}/contents"
+        self.trees_base_url = (
+            f"https://api.github.com/repos/{self.github_repo}/git/trees"
+        )
+        self.ref_url = (
+            f"https://api.github.com/repos/{self.github_repo}"
+            f"/git/ref/heads/{self.github_branch}"
+        )
 
         # Categories to index
         self.categories = [
@@ -108,6 +328,11 @@ class ItemsDatabaseManager:
             self.search_index = json.loads(self.index_file.read_text(encoding="utf-8"))
             metadata = json.loads(self.metadata_file.read_text(encoding="utf-8"))
             self.last_update = datetime.fromisoformat(metadata["last_update"])
+            self.commit_sha = metadata.get("commit_sha")
+            self.ref_etag = metadata.get("ref_etag")
+            self.blobs = metadata.get("blobs", {})
+            for realm in self.search_index:
+                self._build_ngram_index(realm)
         except Exception as e:
             print(f"⚠️  Failed to load cache:  {e}")
             self.search_index = {}
@@ -124,6 +349,9 @@ class ItemsDatabaseManager:
                 "last_update": datetime.now().isoformat(),
                 "total_items": sum(len(items) for items in self.search_index.values()),
                 "realms": list(self.search_index.keys()),
+                "commit_sha": self.commit_sha,
+                "ref_etag": self.ref_etag,
+                "blobs": self.blobs,
             }
             self.metadata_file.write_text(
                 json.dumps(metadata, ensure_ascii=False, indent=2),
@@ -134,7 +362,11 @@ class ItemsDatabaseManager:
 
     async def update_database(self, realms: list[str] | None = None):
         """
-        Download and index items database
+        Download and index items database (incrementally)
+
+        One conditional request checks the branch head: if the commit did not
+        change, nothing else is requested. Otherwise only files whose blob SHA
+        is new or changed are downloaded, deleted files are dropped.
 
         Args:
             realms:  List of realms to update (default: ["ru", "global"])
@@ -142,167 +374,295 @@ class ItemsDatabaseManager:
         if realms is None:
             realms = ["ru", "global"]
 
+        if settings.ITEMS_DB_SOURCE == "local":
+            await self._update_from_local(realms)
+            return
+
         print(f"📥 Updating database for realms: {', '.join(realms)}")
 
-        for realm in realms:
-            print(f"  → Indexing realm: {realm}")
-            realm_items = []
+        try:
+            head = await self._get_head_commit()
+        except Exception as e:
+            print(f"  ✗ Failed to check {self.github_branch} head: {e}")
+            return
 
-            for category in self.categories:
-                try:
-                    items = await self._index_category(realm, category)
-                    realm_items.extend(items)
-                    print(f"    ✓ {category}:  {len(items)} items")
-                except Exception as e:
-                    print(f"    ✗ {category}: {e}")
-                    continue
+        if head is not None:
+            head_sha, head_etag = head
+        else:
+            # 304 only answers If-None-Match, sent for a known commit
+            assert self.commit_sha is not None
+            head_sha, head_etag = self.commit_sha, self.ref_etag
+        if head is None or head_sha == self.commit_sha:
+            # Unchanged upstream: only realms that were never indexed
+            realms = [realm for realm in realms if realm not in self.blobs]
+            if not realms:
+                print(f"  ✅ Up to date ({(self.commit_sha or '')[:7]})")
+                self.last_update = datetime.now()
+                self._save_to_cache()
+                return
+
+        # One tree request per realm, all realms at once
+        trees = await asyncio.gather(
+            *[self._get_realm_tree(realm, head_sha) for realm in realms],
+            return_exceptions=True,
+        )
+        complete = True
+        plans: list[_RealmPlan] = []
+        for realm, tree in zip(realms, trees):
+            if isinstance(tree, BaseException):
+                complete = False
+                print(f"  ✗ {realm}: {tree}")
+            else:
+                plans.append(self._plan_realm(realm, tree))
+
+        # Added/changed files of every realm and category go to one queue
+        downloads = [
+            (plan.realm, category, item_id)
+            for plan in plans
+            for category, item_id in plan.missing
+        ]
+        downloaded = await self._download_items(downloads, head_sha)
+        for plan in plans:
+            complete &= self._apply_plan(plan, downloaded.get(plan.realm, []))
+
+        # Files that failed to download have no blob SHA recorded; keeping the
+        # old revision makes the next refresh retry exactly those files
+        if complete:
+            self.commit_sha, self.ref_etag = head_sha, head_etag
+        self.last_update = datetime.now()
+        self._save_to_cache()
+        print("💾 Database cached successfully!")
 
-            self.search_index[realm] = realm_items
-            print(f"  ✅ Realm {realm}: {len(realm_items)} items indexed")
+    async def _update_from_local(self, realms: list[str]):
+        """Build the index from ITEMS_DB_LOCAL_PATH (checked-out tree or archive)"""
+        root = Path(settings.ITEMS_DB_LOCAL_PATH)
+        if not root.exists():
+            print(f"  ✗ Local items database not found: {root}")
+            return
 
+        workers = settings.ITEMS_DB_WORKERS or os.cpu_count() or 1
+        print(f"📂 Indexing local items database {root} ({workers} workers)")
+        try:
+            index = await asyncio.to_thread(
+                build_local_index,
+                root,
+                realms,
+                self.categories,
+                self.raw_base_url,
+                workers,
+            )
+        except (tarfile.TarError, OSError, EOFError, BrokenProcessPool) as e:
+            # Not a checkout or a readable archive: keep the current index
+            print(f"  ✗ Failed to index local items database {root}: {e!r}")
+            return
+
+        for realm, items in index.items():
+            if not items:
+                print(f"  ✗ Realm {realm}: no items found")
+                continue
+            self.search_index[realm] = items
+            self._build_ngram_index(realm)
+            # Not a GitHub revision: a later GitHub refresh re-indexes the realm
+            self.blobs.pop(realm, None)
+            print(f"  ✅ Realm {realm}: {len(items)} items indexed")
+
+        self.commit_sha = None
+        self.ref_etag = None
         self.last_update = datetime.now()
         self._save_to_cache()
         print("💾 Database cached successfully!")
 
-    async def _index_category(self, realm: str, category: str) -> list[dict[str, Any]]:
-        """Index all items in a category"""
-        # Get list of item IDs in category (handles subdirectories recursively)
-        item_ids = await self._get_category_item_ids(realm, category)
-
-        items = []
-        # Batch download items (limit concurrent requests)
-        semaphore = asyncio.Semaphore(10)  # Max 10 concurrent requests
+    async def _get_head_commit(self) -> tuple[str, str | None] | None:
+        """
+        Commit SHA and ETag of the branch head
 
-        async def fetch_item(item_id: str):
-            async with semaphore:
-                try:
-                    item_data = await self._fetch_item_data(realm, category, item_id)
-                    if item_data:
-                        items.append(item_data)
-                except Exception:
-                    pass  # Skip failed items
+        Returns:
+            None if the head did not change since the last check (304)
+        """
+        headers = self._github_headers()
+        if self.ref_etag and self.commit_sha:
+            headers["If-None-Match"] = self.ref_etag
 
-        await asyncio.gather(*[fetch_item(item_id) for item_id in item_ids])
+        response = await resilient_get(self.ref_url, headers=headers, timeout=30.0)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        return response.json()["object"]["sha"], response.headers.get("ETag")
+
+    def _plan_realm(self, realm: str, tree: dict[str, str]) -> "_RealmPlan":
+        """Split a realm tree into items to keep and files to download"""
+        grouped = group_item_paths(list(tree), self.categories)
+        old_blobs = self.blobs.get(realm, {})
+        indexed = {
+            f"{item['category']}/{item['id']}.json": item
+            for item in self.search_index.get(realm, [])
+        }
+
+        plan = _RealmPlan(realm, tree)
+        for category in self.categories:
+            for item_id in grouped.get(category, []):
+                path = f"{category}/{item_id}.json"
+                if path in indexed and old_blobs.get(path) == tree[path]:
+                    plan.kept.append(indexed[path])
+                else:
+                    plan.missing.append((category, item_id))
+                    if path in old_blobs:
+                        plan.changed += 1
+                    else:
+                        plan.added += 1
+        plan.deleted = len(set(old_blobs) - set(tree))
+        return plan
+
+    def _apply_plan(self, plan: "_RealmPlan", items: list[dict[str, Any]]) -> bool:
+        """
+        Replace a realm with its kept and downloaded items
 
-        return items
+        Returns:
+            True if every added/changed file was downloaded
+        """
+        realm_items = plan.kept + items
+        position = {category: i for i, category in enumerate(self.categories)}
+        realm_items.sort(key=lambda item: (position[item["category"]], item["id"]))
+
+        self.search_index[plan.realm] = realm_items
+        self._build_ngram_index(plan.realm)
+        self.blobs[plan.realm] = {
+            path: plan.tree[path]
+            for path in (f"{i['category']}/{i['id']}.json" for i in realm_items)
+        }
+        print(
+            f"  ✅ Realm {plan.realm}: {len(realm_items)} items indexed "
+            f"(+{plan.added} ~{plan.changed} -{plan.deleted})"
+        )
+        return len(items) == len(plan.missing)
 
-    async def _get_category_item_ids(self, realm: str, category: str) -> list[str]:
+    async def _download_items(
+        self, downloads: list[tuple[str, str, str]], ref: str | None = None
+    ) -> dict[str, list[dict[str, Any]]]:
         """
-        Get list of item IDs in a category from GitHub API
-        Handles both direct files AND subdirectories recursively
-        Skips service directories like _variants, _deprecated
+        Download (realm, category, item_id) files with one concurrency limit
+
+        ITEMS_DB_CONCURRENCY workers share one iterator and keep their own
+        result lists, merged per realm at the end. Failed items are skipped.
         """
-        url = f"{self.api_base_url}/{realm}/items/{category}"
-        headers = {"Accept": "application/vnd.github+json"}
+        if not downloads:
+            return {}
+
+        pending = iter(downloads)
+        done = 0
+        started = time.monotonic()
+
+        def progress() -> str:
+            elapsed = time.monotonic() - started
+            rate = done / elapsed if elapsed > 0 else 0.0
+            return f"{done}/{len(downloads)} items, {rate:.0f} items/sec"
+
+        async def worker() -> list[tuple[str, dict[str, Any]]]:
+            nonlocal done
+            # Workers share one iterator: no task per item
+            results = []
+            for realm, category, item_id in pending:
+                item = await self._fetch_item_data(realm, category, item_id, ref)
+                if item:
+                    results.append((realm, item))
+                done += 1
+            return results
+
+        async def report() -> None:
+            while True:
+                await asyncio.sleep(_PROGRESS_INTERVAL)
+                print(f"    … {progress()}")
+
+        print(f"  ⬇️  Downloading {len(downloads)} items")
+        reporter = asyncio.create_task(report())
+        try:
+            results = await asyncio.gather(
+                *[worker() for _ in range(settings.ITEMS_DB_CONCURRENCY)]
+            )
+        finally:
+            reporter.cancel()
+
+        by_realm: dict[str, list[dict[str, Any]]] = {}
+        for worker_results in results:
+            for realm, item in worker_results:
+                by_realm.setdefault(realm, []).append(item)
+        print(f"  ✓ Downloaded {progress()}")
+        return by_realm
 
+    def _github_headers(self) -> dict[str, str]:
+        headers = {"Accept": "application/vnd.github+json"}
         # Use GitHub token if provided
         if settings.GITHUB_TOKEN:
             headers["Authorization"] = f"Bearer {settings.GITHUB_TOKEN}"
+        return headers
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers, timeout=30.0)
-            response.raise_for_status()
-            data = response.json()
+    async def _get_realm_tree(self, realm: str, ref: str) -> dict[str, str]:
+        """
+        List {realm}/items with one recursive git-trees request
 
-            item_ids = []
-            subdirs = []
-
-            # Process both files and directories
-            for item in data:
-                if item["type"] == "file" and item["name"].endswith(".json"):
-                    # Direct file in root - extract ID
-                    item_ids.append(item["name"].replace(".json", ""))
-                elif item["type"] == "dir":
-                    # Skip service directories
-                    if item["name"] in ["_variants", "_deprecated"]:
-                        # отладка
-                        print(
-                            f"    [DEBUG] {category}: Skipping service directory {item['name']}"
-                        )
-                        continue
-                    # Valid subdirectory - explore it
-                    subdirs.append(item["name"])
-
-            print(f"    [DEBUG] {category}: Found {len(item_ids)} direct files")
-            print(f"    [DEBUG] {category}: Found {len(subdirs)} subdirectories")
-
-            # If we found subdirectories, recursively fetch from them
-            if subdirs:
-                print(f"       → {category}:  Found {len(subdirs)} subdirectories")
-
-                for subdir in subdirs:
-                    subdir_url = (
-                        f"{self.api_base_url}/{realm}/items/{category}/{subdir}"
-                    )
-                    try:
-                        sub_response = await client.get(
-                            subdir_url, headers=headers, timeout=30.0
-                        )
-                        sub_response.raise_for_status()
-                        sub_data = sub_response.json()
-
-                        # Extract IDs from subdirectory
-                        subdir_files = 0
-                        for sub_item in sub_data:
-                            if sub_item["type"] == "file" and sub_item["name"].endswith(
-                                ".json"
-                            ):
-                                # Store with subdirectory:  "subdir/itemid"
-                                item_id = (
-                                    f"{subdir}/{sub_item['name'].replace('.json', '')}"
-                                )
-                                item_ids.append(item_id)
-                                subdir_files += 1
-
-                        # Print only if files found
-                        if subdir_files > 0:
-                            print(f"         └─ {subdir}: {subdir_files} items")
-                    except Exception as e:
-                        print(f"         └─ {subdir}:  ERROR - {e}")
-
-            # отладка
-            print(f"    [DEBUG] {category}: Total item IDs found: {len(item_ids)}")
-
-            return item_ids
+        A truncated listing falls back to one request per category; a
+        truncated category raises, so the realm keeps its entries and the
+        old revision instead of dropping the files it could not see.
+
+        Returns:
+            {path relative to {realm}/items: blob SHA} of every JSON file
+        """
+        tree, truncated = await self._list_tree(f"{realm}/items", ref)
+        if not truncated:
+            return tree
+
+        print(f"    ⚠️ {realm}: git tree truncated, listing categories one by one")
+        subtrees = await asyncio.gather(
+            *[
+                self._list_tree(f"{realm}/items/{category}", ref)
+                for category in self.categories
+            ]
+        )
+        tree = {}
+        for category, (subtree, truncated) in zip(self.categories, subtrees):
+            if truncated:
+                raise RuntimeError(f"git tree of {category} truncated")
+            tree.update({f"{category}/{path}": sha for path, sha in subtree.items()})
+        return tree
+
+    async def _list_tree(self, path: str, ref: str) -> tuple[dict[str, str], bool]:
+        """Recursive git tree of path: ({JSON file: blob SHA}, truncated)"""
+        url = f"{self.trees_base_url}/{ref}:{path}"
+        response = await resilient_get(
+            url,
+            headers=self._github_headers(),
+            params={"recursive": "1"},
+            timeout=60.0,
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        tree = {
+            entry["path"]: entry["sha"]
+            for entry in data["tree"]
+            if entry["type"] == "blob" and entry["path"].endswith(".json")
+        }
+        return tree, bool(data.get("truncated"))
 
     async def _fetch_item_data(
-        self, realm: str, category: str, item_id: str
+        self, realm: str, category: str, item_id: str, ref: str | None = None
     ) -> dict[str, Any] | None:
         """
         Fetch item data and extract searchable info
         Handles items in subdirectories (item_id can be "subdir/id")
+        ref pins the download to a commit (default: branch head)
         """
-        url = f"{self.raw_base_url}/{realm}/items/{category}/{item_id}.json"
+        base_url = self.raw_base_url
+        if ref:
+            base_url = f"https://raw.githubusercontent.com/{self.github_repo}/{ref}"
+        url = f"{base_url}/{realm}/items/{category}/{item_id}.json"
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, timeout=10.0)
-                response.raise_for_status()
-                data = response.json()
-
-                # Extract display name
-                name_obj = data.get("name", {})
-                # Use only the item ID part (without subdirectory) as fallback
-                display_name = item_id.split("/")[-1]
-                lines = {}  # Инициализация lines для использования ниже
-
-                if name_obj.get("type") == "translation":
-                    lines = name_obj.get("lines", {})
-                    display_name = lines.get("ru") or lines.get("en", display_name)
-                elif name_obj.get("type") == "text":
-                    display_name = name_obj.get("text", display_name)
-
-                # Build searchable item
-                return {
-                    "id": item_id,  # Сохраняем полный путь (с подпапкой если есть)
-                    "name": display_name,
-                    "category": category,
-                    "icon_url": f"{self.raw_base_url}/{realm}/icons/{category}/{item_id}.png",
-                    # Store name variants for search
-                    "name_lower": display_name.lower(),
-                    "name_ru": lines.get("ru", "").lower(),
-                    "name_en": lines.get("en", "").lower(),
-                }
+            response = await resilient_get(url, timeout=10.0)
+            response.raise_for_status()
+            data = response.json()
+
+            return build_item_entry(data, realm, category, item_id, self.raw_base_url)
         except Exception:
             return None
 
@@ -312,6 +672,9 @@ class ItemsDatabaseManager:
         """
         Fast local search in indexed items
 
+        Substring match on name, ID or translated names, in index order,
+        answered from the realm's n-gram index
+
         Args:
             query: Search query
             realm: Realm to search in
@@ -320,33 +683,50 @@ class ItemsDatabaseManager:
         Returns:
             List of matching items
         """
-        if realm not in self.search_index:
+        items = self.search_index.get(realm)
+        if items is None:
             return []
 
-        query_lower = query.lower()
-        results = []
+        index = self.ngram_index.get(realm)
+        if index is None or index.records is not items:
+            # search_index was replaced without a rebuild
+            index = self._build_ngram_index(realm)
+
+        return [
+            {
+                "id": item["id"],
+                "name": item["name"],
+                "category": item["category"],
+                "icon_url": item["icon_url"],
+            }
+            for item in index.search(query.lower(), limit)
+        ]
 
-        for item in self.search_index[realm]:
-            # Search in name, ID, or translated names
-            if (
-                query_lower in item["name_lower"]
-                or query_lower in item["id"].lower()
-                or (item["name_ru"] and query_lower in item["name_ru"])
-                or (item["name_en"] and query_lower in item["name_en"])
-            ):
-                results.append(
-                    {
-                        "id": item["id"],
-                        "name": item["name"],
-                        "category": item["category"],
-                        "icon_url": item["icon_url"],
-                    }
-                )
-
-                if len(results) >= limit:
-                    break
+    def _build_ngram_index(self, realm: str) -> NgramIndex:
+        """Substring index over name, ID and translated names of a realm"""
+        index = NgramIndex(
+            self.search_index[realm],
+            lambda item: [
+                item["name_lower"],
+                item["id"].lower(),
+                item["name_ru"],
+                item["name_en"],
+            ],
+        )
+        self.ngram_index[realm] = index
+        return index
+
+    def auction_item_ids(self, realm: str) -> list[str]:
+        """
+        Unique auction item IDs of a realm, in index order
 
-        return results
+        Index IDs keep the subdirectory ("subdir/id"); the auction API
+        expects only the last part
+        """
+        ids = (
+            item["id"].rsplit("/", 1)[-1] for item in self.search_index.get(realm, [])
+        )
+        return list(dict.fromkeys(ids))
 
     def get_item_by_id(self, item_id: str, realm: str = "ru") -> dict[str, Any] | None:
         """Get item by ID from index"""
@@ -365,5 +745,10 @@ class ItemsDatabaseManager:
         return None
 
 
+def realm_for_region(region: str) -> str:
+    """Realm of the items database for an auction region (RU -> ru, others -> global)"""
+    return "ru" if region.upper() == "RU" else "global"
+
+
 # Singleton
 items_db_manager = ItemsDatabaseManager()
@@ -0,0 +1,187 @@
+"""
+Live feed - push-обновления книги лотов подписчикам (SSE)
+
+Данные приходят из watchlist poller: подписка добавляет предмет в
+watchlist, и на все подключения к предмету приходится один фоновый цикл
+опроса. Каждое обновление сериализуется один раз и раскладывается по
+ограниченным буферам подписчиков (LIVE_SUBSCRIBER_BUFFER сообщений).
+Подписчик, который не успевает разбирать свой буфер, отключается, чтобы
+не держать память и не тормозить остальных.
+"""
+
+import asyncio
+import json
+from typing import Any
+
+from pydantic import TypeAdapter
+
+from app.config import settings
+from app.core.exceptions import SubscriberLimitError
+from app.models.auction import AuctionLotsResponse, LotEvent
+from app.services.watchlist_poller import WatchItem, WatchlistPoller, watchlist_poller
+from app.utils.sse import sse_event
+
+_events_adapter = TypeAdapter(list[LotEvent])
+
+# Watchlist owner tag of items polled for subscribers
+_OWNER = "live"
+
+
+class Subscriber:
+    """Одно подключение к потоку предмета"""
+
+    def __init__(self, key: tuple[str, str]):
+        self.key = key
+        # Pre-serialized SSE messages; None wakes up an evicted subscriber
+        self.queue: asyncio.Queue[str | None] = asyncio.Queue(
+            maxsize=settings.LIVE_SUBSCRIBER_BUFFER
+        )
+        self.evicted = False
+
+    def _evict(self) -> None:
+        self.evicted = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def next_message(self, timeout: float) -> str | None:
+        """Следующее сообщение (None - таймаут или подписчик отключён)"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class LiveFeed:
+    """Раздача обновлений watchlist poller подписчикам"""
+
+    def __init__(self, poller: WatchlistPoller = watchlist_poller):
+        self.poller = poller
+        self._subscribers: dict[tuple[str, str], set[Subscriber]] = {}
+        # Items whose first snapshot was already published
+        self._primed: set[tuple[str, str]] = set()
+        self._sequence: dict[tuple[str, str], int] = {}
+
+        # Counters
+        self.published = 0
+        self.delivered = 0
+        self.evictions = 0
+
+        poller.add_listener(self._on_poll)
+        poller.add_error_listener(self._on_poll_error)
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subs) for subs in self._subscribers.values())
+
+    def subscribe(self, region: str, item_id: str) -> Subscriber:
+        """Подписаться на предмет (при необходимости добавить его в watchlist)"""
+        if self.subscriber_count >= settings.LIVE_MAX_SUBSCRIBERS:
+            raise SubscriberLimitError(
+                f"Live feed subscriber limit reached ({settings.LIVE_MAX_SUBSCRIBERS})"
+            )
+
+        key = (region.upper(), item_id)
+        item = self.poller.add(*key, owner=_OWNER)
+
+        subscriber = Subscriber(key)
+        self._subscribers.setdefault(key, set()).add(subscriber)
+
+        # Late joiner: current book (or upstream error) right away,
+        # not after the next poll
+        if item.last_error is not None:
+            subscriber.queue.put_nowait(self._error_message(item.last_error))
+        elif item.latest is not None:
+            self._primed.add(key)
+            subscriber.queue.put_nowait(self._snapshot_message(item.latest))
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Отписаться; последний подписчик снимает свою заявку на опрос предмета"""
+        key = subscriber.key
+        subscribers = self._subscribers.get(key)
+        if subscribers is None:
+            return
+        subscribers.discard(subscriber)
+        if subscribers:
+            return
+
+        del self._subscribers[key]
+        self._primed.discard(key)
+        self._sequence.pop(key, None)
+        self.poller.release(*key, owner=_OWNER)
+
+    # ==================== Fan-out ====================
+
+    def _next_id(self, key: tuple[str, str]) -> str:
+        self._sequence[key] = self._sequence.get(key, 0) + 1
+        return str(self._sequence[key])
+
+    def _snapshot_message(
+        self, latest: AuctionLotsResponse, id: str | None = None
+    ) -> str:
+        return sse_event(latest.model_dump_json(), event="snapshot", id=id)
+
+    def _error_message(self, error: str, id: str | None = None) -> str:
+        return sse_event(json.dumps({"detail": error}), event="error", id=id)
+
+    def _on_poll(self, item: WatchItem, events: list[LotEvent]) -> None:
+        """Опрос завершён: сериализовать один раз и разослать подписчикам"""
+        key = (item.region, item.item_id)
+        if not self._subscribers.get(key) or item.latest is None:
+            return
+
+        messages = []
+        if events or key not in self._primed:
+            self._primed.add(key)
+            messages.append(self._snapshot_message(item.latest, self._next_id(key)))
+        if events:
+            messages.append(
+                sse_event(
+                    _events_adapter.dump_json(events).decode(),
+                    event="events",
+                    id=self._next_id(key),
+                )
+            )
+        self._publish(key, messages)
+
+    def _on_poll_error(self, item: WatchItem, error: str) -> None:
+        """Опрос не удался: сообщить подписчикам, после восстановления - снимок"""
+        key = (item.region, item.item_id)
+        if not self._subscribers.get(key):
+            return
+        self._primed.discard(key)
+        self._publish(key, [self._error_message(error, self._next_id(key))])
+
+    def _publish(self, key: tuple[str, str], messages: list[str]) -> None:
+        subscribers = self._subscribers.get(key)
+        if not subscribers or not messages:
+            return
+
+        self.published += len(messages)
+        for subscriber in list(subscribers):
+            try:
+                for message in messages:
+                    subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Slow consumer: drop it instead of buffering without bound
+                subscriber._evict()
+                subscribers.discard(subscriber)
+                self.evictions += 1
+                continue
+            self.delivered += len(messages)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "items": len(self._subscribers),
+            "subscribers": self.subscriber_count,
+            "max_subscribers": settings.LIVE_MAX_SUBSCRIBERS,
+            "buffer_size": settings.LIVE_SUBSCRIBER_BUFFER,
+            "published": self.published,
+            "delivered": self.delivered,
+            "evictions": self.evictions,
+        }
+
+
+# Singleton
+live_feed = LiveFeed()
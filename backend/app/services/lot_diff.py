@@ -0,0 +1,206 @@
+"""
+Lot-book diff - события изменения книги лотов между снимками
+
+Для каждого (регион, предмет) хранится предыдущий снимок лотов. Новый снимок
+сравнивается с ним за O(n) по ключу лота, а наружу уходят только компактные
+события: новый лот, лот исчез до endTime (вероятно, выкуплен), лот истёк,
+изменилась текущая цена.
+"""
+
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from app.config import settings
+from app.models.auction import (
+    AuctionLot,
+    AuctionLotsResponse,
+    LotEvent,
+    LotEventType,
+)
+
+LotKey = tuple
+LotEventListener = Callable[[list[LotEvent]], None]
+
+
+def lot_key(lot: AuctionLot) -> LotKey:
+    """
+    Ключ лота - неизменяемые поля
+
+    У лотов Stalcraft API нет id; currentPrice меняется при ставках,
+    поэтому в ключ не входит
+    """
+    return (
+        lot.itemId,
+        lot.startTime,
+        lot.endTime,
+        lot.amount,
+        lot.startPrice,
+        lot.buyoutPrice,
+    )
+
+
+def _price(lot: AuctionLot) -> int:
+    return lot.currentPrice if lot.currentPrice is not None else lot.startPrice
+
+
+@dataclass
+class LotBookSnapshot:
+    """
+    Снимок книги лотов
+
+    covered_from - самый старый startTime, который покрывает снимок, если
+    upstream вернул только часть книги (страница, отсортированная по
+    time_created desc); None - книга целиком
+    """
+
+    response: AuctionLotsResponse
+    lots: list[AuctionLot]
+    covered_from: datetime | None
+    taken_at: datetime
+
+
+def _covered_from(response: AuctionLotsResponse) -> datetime | None:
+    if response.lots and response.total > len(response.lots):
+        return min(lot.startTime for lot in response.lots)
+    return None
+
+
+def diff_lot_books(
+    region: str,
+    item_id: str,
+    previous: LotBookSnapshot,
+    current: AuctionLotsResponse,
+    now: datetime,
+) -> tuple[list[LotEvent], list[AuctionLot]]:
+    """
+    Сравнить снимки за O(n)
+
+    Лоты старше covered_from текущего снимка не видны и остаются в состоянии
+    как есть; лоты, которых не было в прошлом снимке, но которые старше его
+    covered_from, - не новые, а просто впервые попали в страницу.
+
+    Returns:
+        (события, лоты нового состояния)
+    """
+    # Multiset: identical lots are matched one to one
+    remaining: dict[LotKey, list[AuctionLot]] = {}
+    for lot in previous.lots:
+        remaining.setdefault(lot_key(lot), []).append(lot)
+
+    def event(
+        type_: LotEventType, lot: AuctionLot, previous_price: int | None = None
+    ) -> LotEvent:
+        return LotEvent(
+            type=type_,
+            region=region,
+            item_id=item_id,
+            detected_at=now,
+            amount=lot.amount,
+            buyout_price=lot.buyoutPrice,
+            price=_price(lot),
+            previous_price=previous_price,
+            start_time=lot.startTime,
+            end_time=lot.endTime,
+        )
+
+    events: list[LotEvent] = []
+    for lot in current.lots:
+        matches = remaining.get(lot_key(lot))
+        if matches:
+            old = matches.pop()
+            if _price(old) != _price(lot):
+                events.append(event("price_changed", lot, _price(old)))
+        elif previous.covered_from is None or lot.startTime >= previous.covered_from:
+            events.append(event("new", lot))
+
+    covered_from = _covered_from(current)
+    lots = list(current.lots)
+    for matches in remaining.values():
+        for lot in matches:
+            if covered_from is not None and lot.startTime < covered_from:
+                # Outside the current page: state unknown, keep it until endTime
+                if lot.endTime > now:
+                    lots.append(lot)
+            else:
+                events.append(event("sold" if lot.endTime > now else "expired", lot))
+
+    return events, lots
+
+
+class LotBookTracker:
+    """Предыдущие снимки книг лотов и последние события по предметам"""
+
+    def __init__(self):
+        self._snapshots: dict[tuple[str, str], LotBookSnapshot] = {}
+        self._events: dict[tuple[str, str], deque[LotEvent]] = {}
+        self._listeners: list[LotEventListener] = []
+
+    def update(
+        self,
+        region: str,
+        item_id: str,
+        response: AuctionLotsResponse,
+        now: datetime | None = None,
+    ) -> list[LotEvent]:
+        """
+        Принять новый снимок и вернуть события относительно предыдущего
+
+        Первый снимок предмета событий не даёт. Неполный снимок должен быть
+        отсортирован по time_created desc (сортировка API по умолчанию)
+        """
+        region = region.upper()
+        key = (region, item_id)
+        now = now or datetime.now(timezone.utc)
+
+        previous = self._snapshots.get(key)
+        if previous is None:
+            events: list[LotEvent] = []
+            lots = list(response.lots)
+        else:
+            events, lots = diff_lot_books(region, item_id, previous, response, now)
+
+        self._snapshots[key] = LotBookSnapshot(
+            response=response,
+            lots=lots,
+            covered_from=_covered_from(response),
+            taken_at=now,
+        )
+        if events:
+            history = self._events.setdefault(
+                key, deque(maxlen=settings.LOT_EVENTS_HISTORY)
+            )
+            history.extend(events)
+            for listener in list(self._listeners):
+                listener(events)
+        return events
+
+    def snapshot(self, region: str, item_id: str) -> LotBookSnapshot | None:
+        return self._snapshots.get((region.upper(), item_id))
+
+    def recent_events(
+        self, region: str, item_id: str, limit: int = 100
+    ) -> list[LotEvent]:
+        """Последние события предмета (новые первыми)"""
+        history = self._events.get((region.upper(), item_id))
+        if not history:
+            return []
+        return list(reversed(history))[:limit]
+
+    def forget(self, region: str, item_id: str) -> None:
+        key = (region.upper(), item_id)
+        self._snapshots.pop(key, None)
+        self._events.pop(key, None)
+
+    def add_listener(self, listener: LotEventListener) -> None:
+        """Подписаться на события (вызывается синхронно после каждого diff)"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: LotEventListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+
+# Singleton
+lot_tracker = LotBookTracker()
@@ -0,0 +1,302 @@
+"""
+Market sweep - фоновое обновление лотов всех предметов региона
+
+Проход берёт все ID из индекса предметов (realm региона), загружает
+страницу лотов каждого предмета и прогревает кэш /lots, как watchlist
+poller. Проход ограничен бюджетом запросов и временным окном: когда
+бюджет исчерпан или окно закончилось, новые предметы не начинаются.
+Бюджет расходуют upstream попытки, включая повторы и 429 (их считает
+клиент); уже начатые предметы могут превысить его на свои повторы.
+Для каждого предмета записываются время запроса (от отправки первой
+попытки, без ожидания в очереди rate limiter'а), число лотов и ошибка.
+
+Проходы запускаются через API (POST /sweeps/{region}) или по расписанию
+(SWEEP_INTERVAL для SWEEP_REGIONS) и идут фоновыми задачами с фоновым
+приоритетом запросов.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from app.clients.rate_limit import (
+    Priority,
+    observe_upstream_attempts,
+    request_priority,
+)
+from app.config import settings
+from app.core.exceptions import InvalidRegionError
+from app.models.sweep import SweepItemResult, SweepLatency, SweepState, SweepStatus
+from app.services.auction_service import auction_service
+from app.services.items_database_manager import items_db_manager, realm_for_region
+
+# Lots per item (max page size of the API, default sort) and the /lots default limit
+_SWEEP_PAGE_SIZE = 200
+_DEFAULT_LIMIT = 20
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    """Перцентиль по ближайшему рангу (q - 0..1)"""
+    index = min(int(q * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+@dataclass
+class SweepJob:
+    """Один проход по рынку региона"""
+
+    id: str
+    region: str
+    realm: str
+    item_ids: list[str]
+    request_budget: int
+    started_at: datetime
+    deadline: datetime
+    state: SweepState = "running"
+    finished_at: datetime | None = None
+    requests_used: int = 0
+    failed: int = 0
+    last_error: str | None = None
+    results: dict[str, SweepItemResult] = field(default_factory=dict, repr=False)
+    task: asyncio.Task | None = field(default=None, repr=False)
+
+    def latency(self) -> SweepLatency:
+        values = sorted(r.latency_ms for r in self.results.values())
+        if not values:
+            return SweepLatency()
+        return SweepLatency(
+            avg=round(sum(values) / len(values), 1),
+            p50=round(_percentile(values, 0.5), 1),
+            p95=round(_percentile(values, 0.95), 1),
+            max=round(values[-1], 1),
+        )
+
+    def status(self, include_items: bool = False) -> SweepStatus:
+        total = len(self.item_ids)
+        return SweepStatus(
+            id=self.id,
+            region=self.region,
+            realm=self.realm,
+            state=self.state,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            deadline=self.deadline,
+            request_budget=self.request_budget,
+            requests_used=self.requests_used,
+            total_items=total,
+            done_items=len(self.results),
+            failed_items=self.failed,
+            progress=round(len(self.results) / total, 4) if total else 1.0,
+            latency_ms=self.latency(),
+            last_error=self.last_error,
+            items=list(self.results.values()) if include_items else None,
+        )
+
+
+class MarketSweeper:
+    """Запуск, отслеживание и отмена проходов по рынку"""
+
+    def __init__(self):
+        self.service = auction_service
+        self.items = items_db_manager
+        # Recent sweeps, oldest first (SWEEP_HISTORY kept)
+        self.jobs: OrderedDict[str, SweepJob] = OrderedDict()
+        self._scheduler: asyncio.Task | None = None
+
+    # ==================== Jobs ====================
+
+    def running(self, region: str) -> SweepJob | None:
+        region = region.upper()
+        for job in self.jobs.values():
+            if job.region == region and job.state == "running":
+                return job
+        return None
+
+    def start_sweep(
+        self,
+        region: str,
+        request_budget: int | None = None,
+        time_window: float | None = None,
+    ) -> SweepJob:
+        """Запустить проход (если по региону уже идёт - вернуть его)"""
+        region = region.upper()
+        if region not in settings.SUPPORTED_REGIONS:
+            raise InvalidRegionError(
+                f"Invalid region '{region}'. "
+                f"Supported: {', '.join(settings.SUPPORTED_REGIONS)}"
+            )
+        running = self.running(region)
+        if running is not None:
+            return running
+
+        realm = realm_for_region(region)
+        now = datetime.now(timezone.utc)
+        window = settings.SWEEP_TIME_WINDOW if time_window is None else time_window
+        job = SweepJob(
+            id=uuid.uuid4().hex,
+            region=region,
+            realm=realm,
+            item_ids=self.items.auction_item_ids(realm),
+            request_budget=(
+                settings.SWEEP_REQUEST_BUDGET
+                if request_budget is None
+                else request_budget
+            ),
+            started_at=now,
+            deadline=now + timedelta(seconds=window),
+        )
+
+        self.jobs[job.id] = job
+        while len(self.jobs) > settings.SWEEP_HISTORY:
+            oldest = next(iter(self.jobs.values()))
+            if oldest.state == "running":
+                break
+            self.jobs.popitem(last=False)
+
+        job.task = asyncio.create_task(self._run(job, time.monotonic() + window))
+        print(
+            f"🧹 Market sweep {job.id[:8]} started: {region}, {len(job.item_ids)} items"
+        )
+        return job
+
+    def get(self, job_id: str) -> SweepJob | None:
+        return self.jobs.get(job_id)
+
+    async def cancel(self, job_id: str) -> SweepJob | None:
+        """Отменить проход (запросы в полёте прерываются)"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        if job.task is not None and not job.task.done():
+            job.task.cancel()
+            await asyncio.gather(job.task, return_exceptions=True)
+        if job.state == "running":
+            # Cancelled before the task got to run
+            job.state = "cancelled"
+            job.finished_at = datetime.now(timezone.utc)
+        return job
+
+    # ==================== Sweeping ====================
+
+    async def _sweep_item(self, job: SweepJob, item_id: str) -> None:
+        started = time.monotonic()
+        dispatched: float | None = None
+
+        def on_attempt() -> None:
+            # Retries and 429 re-attempts spend the budget too
+            nonlocal dispatched
+            job.requests_used += 1
+            if dispatched is None:
+                dispatched = time.monotonic()
+
+        def latency_ms() -> float:
+            # From the first request sent, not from the rate-limiter queue
+            return (time.monotonic() - (dispatched or started)) * 1000
+
+        try:
+            with observe_upstream_attempts(on_attempt):
+                data = await self.service.client.get_auction_lots(
+                    region=job.region, item_id=item_id, limit=_SWEEP_PAGE_SIZE
+                )
+        except Exception as e:
+            # One item failing (upstream error, open circuit) never stops the sweep
+            job.failed += 1
+            job.results[item_id] = SweepItemResult(
+                item_id=item_id, latency_ms=latency_ms(), error=str(e)
+            )
+            return
+
+        lots = data.get("lots") or []
+        buyouts = [
+            lot["buyoutPrice"] / max(lot.get("amount") or 1, 1)
+            for lot in lots
+            if lot.get("buyoutPrice")
+        ]
+        job.results[item_id] = SweepItemResult(
+            item_id=item_id,
+            latency_ms=latency_ms(),
+            lot_count=data.get("total", len(lots)),
+            min_buyout_price=min(buyouts, default=None),
+        )
+
+        # Default /lots query is the head of the loaded page
+        head = {**data, "lots": lots[:_DEFAULT_LIMIT]}
+        self.service.prime_lots(
+            job.region, item_id, head, settings.AUCTION_CACHE_LOTS_TTL
+        )
+
+    async def _run(self, job: SweepJob, deadline: float) -> None:
+        pending = iter(job.item_ids)
+        stop_reason: SweepState | None = None
+
+        async def worker() -> None:
+            nonlocal stop_reason
+            # Workers share one iterator: no task per item
+            while stop_reason is None:
+                if job.requests_used >= job.request_budget:
+                    stop_reason = "budget_exhausted"
+                    return
+                if time.monotonic() >= deadline:
+                    stop_reason = "deadline_reached"
+                    return
+                item_id = next(pending, None)
+                if item_id is None:
+                    return
+                await self._sweep_item(job, item_id)
+
+        try:
+            with request_priority(Priority.BACKGROUND):
+                await asyncio.gather(
+                    *[worker() for _ in range(settings.SWEEP_CONCURRENCY)]
+                )
+            job.state = stop_reason or "completed"
+        except asyncio.CancelledError:
+            job.state = "cancelled"
+            raise
+        except Exception as e:
+            job.state = "failed"
+            job.last_error = str(e)
+            print(f"❌ Market sweep {job.id[:8]} failed: {e}")
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            print(
+                f"🧹 Market sweep {job.id[:8]} {job.state}: "
+                f"{len(job.results)}/{len(job.item_ids)} items, {job.failed} failed"
+            )
+
+    # ==================== Schedule ====================
+
+    async def _schedule(self) -> None:
+        while True:
+            jobs = [self.start_sweep(region) for region in settings.SWEEP_REGIONS]
+            await asyncio.gather(
+                *[job.task for job in jobs if job.task], return_exceptions=True
+            )
+            await asyncio.sleep(settings.SWEEP_INTERVAL)
+
+    def start(self) -> None:
+        """Запустить проходы по расписанию (SWEEP_INTERVAL > 0)"""
+        if self._scheduler is not None or settings.SWEEP_INTERVAL <= 0:
+            return
+        if not settings.SWEEP_REGIONS:
+            return
+        self._scheduler = asyncio.create_task(self._schedule())
+        print(
+            f"🧹 Market sweeps scheduled every {settings.SWEEP_INTERVAL:.0f}s: "
+            f"{', '.join(settings.SWEEP_REGIONS)}"
+        )
+
+    async def stop(self) -> None:
+        tasks = [self._scheduler] if self._scheduler is not None else []
+        tasks += [job.task for job in self.jobs.values() if job.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._scheduler = None
+
+
+# Singleton
+market_sweeper = MarketSweeper()
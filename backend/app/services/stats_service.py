@@ -0,0 +1,161 @@
+"""
+Stats service - статистика цен предмета (NumPy)
+
+Продажи читаются из локального хранилища истории сразу колонками
+(time_ms, price, amount), без Pydantic-моделей, и все расчёты выполняются
+векторно - десятки тысяч продаж обрабатываются за миллисекунды.
+
+Распределение цен лотов строится по самым дешёвым лотам книги (до
+STATS_MAX_LOTS) и запоминается на AUCTION_CACHE_LOTS_TTL: повторные
+запросы статистики не обходят книгу лотов заново.
+"""
+
+from contextlib import aclosing
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.clients.stalcraft import stalcraft_client
+from app.config import settings
+from app.models.auction import PriceDistribution, PriceStatsResponse
+from app.services.history_store import history_store
+from app.utils.cache import ResponseCache
+from app.utils.singleflight import SingleFlight
+
+
+def unit_prices(prices: np.ndarray, amounts: np.ndarray) -> np.ndarray:
+    """Цена за единицу (amount <= 0 - цена лота целиком)"""
+    prices = prices.astype(np.float64)
+    return np.divide(prices, amounts, out=prices.copy(), where=amounts > 0)
+
+
+def trimmed_mean(values: np.ndarray, trim: float) -> float:
+    """Среднее без доли trim самых низких и самых высоких значений"""
+    cut = int(len(values) * trim)
+    if cut == 0:
+        return float(values.mean())
+    # Partition instead of a full sort: only the cut points must be in place
+    part = np.partition(values, (cut, len(values) - cut - 1))
+    return float(part[cut : len(values) - cut].mean())
+
+
+def distribution(
+    values: np.ndarray, percentiles: list[float], trim: float, bins: int
+) -> PriceDistribution:
+    """Сводка распределения цен"""
+    if values.size == 0:
+        return PriceDistribution()
+
+    quantiles = np.percentile(values, [50, *percentiles])
+    histogram, edges = np.histogram(values, bins=bins)
+
+    return PriceDistribution(
+        count=int(values.size),
+        mean=float(values.mean()),
+        stddev=float(values.std()),
+        min=float(values.min()),
+        max=float(values.max()),
+        median=float(quantiles[0]),
+        trimmed_mean=trimmed_mean(values, trim),
+        percentiles={f"p{p:g}": float(q) for p, q in zip(percentiles, quantiles[1:])},
+        histogram=histogram.tolist(),
+        bin_edges=edges.tolist(),
+    )
+
+
+class StatsService:
+    """Сервис статистики цен"""
+
+    def __init__(self):
+        self.client = stalcraft_client
+        self.history = history_store
+        # Unit lot prices per (region, item), one book walk per lots TTL
+        self._lot_cache = ResponseCache(
+            max_bytes=settings.STATS_LOTS_CACHE_MAX_BYTES,
+            enabled=settings.AUCTION_CACHE_ENABLED,
+        )
+        self._inflight = SingleFlight()
+
+    async def _read_lot_columns(self, region: str, item_id: str) -> np.ndarray:
+        """Цены выкупа самых дешёвых лотов за единицу, по возрастанию"""
+        buyouts: list[int] = []
+        amounts: list[int] = []
+
+        # Upstream sorts by the lot's total buyout: the cheap end of the book
+        # comes first, stacks are re-ordered by unit price below
+        lots = self.client.iter_auction_lots(
+            region, item_id, sort="buyout_price", order="asc"
+        )
+        async with aclosing(lots):
+            async for lot in lots:
+                if lot.buyoutPrice > 0:
+                    buyouts.append(lot.buyoutPrice)
+                    amounts.append(lot.amount)
+                if len(buyouts) >= settings.STATS_MAX_LOTS:
+                    break
+
+        return np.sort(
+            unit_prices(
+                np.array(buyouts, dtype=np.int64), np.array(amounts, dtype=np.int64)
+            )
+        )
+
+    async def _lot_columns(self, region: str, item_id: str) -> np.ndarray:
+        """Цены лотов за единицу (кэш на AUCTION_CACHE_LOTS_TTL)"""
+        key = (region, item_id)
+        return await self._lot_cache.get_or_fetch(
+            key,
+            settings.AUCTION_CACHE_LOTS_TTL,
+            lambda: self._inflight.do(
+                key, lambda: self._read_lot_columns(region, item_id)
+            ),
+            lambda values: values.nbytes,
+        )
+
+    async def get_stats(
+        self,
+        region: str,
+        item_id: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        percentiles: list[float] | None = None,
+        trim: float = 0.1,
+        bins: int = 20,
+    ) -> PriceStatsResponse:
+        """
+        Статистика цен продаж за период и цен активных лотов
+
+        Args:
+            since: Начало периода (по умолчанию STATS_DEFAULT_WINDOW_DAYS назад)
+            percentiles: Перцентили (0-100), по умолчанию 5, 25, 75, 95
+            trim: Доля отбрасываемых значений с каждой стороны для trimmed mean
+            bins: Количество корзин гистограммы
+        """
+        if since is None:
+            since = datetime.now(timezone.utc) - timedelta(
+                days=settings.STATS_DEFAULT_WINDOW_DAYS
+            )
+        percentiles = percentiles or [5, 25, 75, 95]
+
+        rows = await self.history.sale_rows(region, item_id, since, until)
+        columns = np.array(rows, dtype=np.int64).reshape(-1, 3)
+        prices, amounts = columns[:, 1], columns[:, 2]
+        volume = int(amounts.sum())
+
+        lots = await self._lot_columns(region.upper(), item_id)
+
+        return PriceStatsResponse(
+            region=region.upper(),
+            item_id=item_id,
+            since=since,
+            until=until,
+            trim=trim,
+            sales=distribution(unit_prices(prices, amounts), percentiles, trim, bins),
+            sales_volume=volume,
+            sales_vwap=float(prices.sum() / volume) if volume > 0 else None,
+            lots=distribution(lots, percentiles, trim, bins),
+        )
+
+
+# Singleton
+stats_service = StatsService()
@@ -0,0 +1,349 @@
+"""
+Watchlist poller - фоновый опрос лотов избранных предметов
+
+Каждый предмет опрашивается со своим интервалом: снимок книги лотов
+сравнивается с предыдущим (lot_diff), и если книга изменилась, интервал
+уменьшается (до WATCHLIST_MIN_INTERVAL), если нет - растёт
+(до WATCHLIST_MAX_INTERVAL). Все опросы делят один бюджет запросов
+(WATCHLIST_REQUEST_BUDGET в минуту), а upstream запросы идут с фоновым
+приоритетом и не задерживают пользовательские.
+"""
+
+import asyncio
+import math
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+from app.clients.rate_limit import Priority, TokenBucket, request_priority
+from app.config import settings
+from app.core.exceptions import (
+    CircuitOpenError,
+    InvalidRegionError,
+    StalcraftAPIError,
+)
+from app.models.auction import AuctionLotsResponse, LotEvent
+from app.services.alert_engine import alert_engine
+from app.services.auction_service import auction_service
+from app.services.history_store import history_store
+from app.services.lot_diff import lot_tracker
+
+# Lots per poll (max page size of the API) and the /lots default limit
+_POLL_PAGE_SIZE = 200
+_DEFAULT_LIMIT = 20
+
+# Called after every successful poll with the item and its diff events
+PollListener = Callable[["WatchItem", list[LotEvent]], None]
+# Called after every failed poll with the item and the error message
+PollErrorListener = Callable[["WatchItem", str], None]
+
+
+def parse_watchlist_entry(entry: str) -> tuple[str, str]:
+    """'EU:y1q9' -> ('EU', 'y1q9')"""
+    region, sep, item_id = entry.partition(":")
+    region = region.strip().upper()
+    item_id = item_id.strip()
+    if not sep or not item_id:
+        raise ValueError(f"Invalid watchlist entry '{entry}', expected REGION:item_id")
+    return region, item_id
+
+
+@dataclass
+class WatchItem:
+    """Предмет в watchlist и состояние его опроса"""
+
+    region: str
+    item_id: str
+    interval: float
+    next_poll: float = 0.0
+    next_history: float = 0.0
+    polls: int = 0
+    changes: int = 0
+    failures: int = 0
+    last_polled: datetime | None = None
+    last_changed: datetime | None = None
+    last_error: str | None = None
+    latest: AuctionLotsResponse | None = field(default=None, repr=False)
+    # Added explicitly (API, WATCHLIST setting): stays until remove()
+    pinned: bool = False
+    # Features that need the item polled (live feed, alerts)
+    owners: set[str] = field(default_factory=set)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "region": self.region,
+            "item_id": self.item_id,
+            "interval": round(self.interval, 2),
+            "polls": self.polls,
+            "changes": self.changes,
+            "failures": self.failures,
+            "last_polled": self.last_polled.isoformat() if self.last_polled else None,
+            "last_changed": (
+                self.last_changed.isoformat() if self.last_changed else None
+            ),
+            "last_error": self.last_error,
+        }
+
+
+class WatchlistPoller:
+    """Фоновый планировщик опроса watchlist с адаптивными интервалами"""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.service = auction_service
+        self.tracker = lot_tracker
+        self.alerts = alert_engine
+        self.history = history_store
+        self.items: dict[tuple[str, str], WatchItem] = {}
+        self.budget = TokenBucket(
+            rate=settings.WATCHLIST_REQUEST_BUDGET / 60, burst=1, clock=clock
+        )
+        self._clock = clock
+        self._task: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._polling: set[asyncio.Task] = set()
+        self._listeners: list[PollListener] = []
+        self._error_listeners: list[PollErrorListener] = []
+
+    # ==================== Watchlist ====================
+
+    def add(self, region: str, item_id: str, owner: str | None = None) -> WatchItem:
+        """
+        Добавить предмет (первый опрос - сразу)
+
+        owner - функция, которой нужен опрос предмета (снимается release);
+        без owner предмет закреплён и убирается только remove
+        """
+        region = region.upper()
+        if region not in settings.SUPPORTED_REGIONS:
+            raise InvalidRegionError(
+                f"Invalid region '{region}'. "
+                f"Supported: {', '.join(settings.SUPPORTED_REGIONS)}"
+            )
+
+        key = (region, item_id)
+        item = self.items.get(key)
+        if item is None:
+            item = WatchItem(
+                region=region,
+                item_id=item_id,
+                interval=settings.WATCHLIST_MIN_INTERVAL,
+                next_poll=self._clock(),
+            )
+            self.items[key] = item
+            self._notify()
+        if owner is None:
+            item.pinned = True
+        else:
+            item.owners.add(owner)
+        return item
+
+    def release(self, region: str, item_id: str, owner: str) -> bool:
+        """Снять owner; предмет без владельцев и не закреплённый убирается"""
+        item = self.items.get((region.upper(), item_id))
+        if item is None:
+            return False
+        item.owners.discard(owner)
+        if item.owners or item.pinned:
+            return False
+        return self.remove(region, item_id)
+
+    def remove(self, region: str, item_id: str) -> bool:
+        removed = self.items.pop((region.upper(), item_id), None) is not None
+        if removed:
+            self.tracker.forget(region, item_id)
+            self._notify()
+        return removed
+
+    def latest(self, region: str, item_id: str) -> AuctionLotsResponse | None:
+        """Последний загруженный снимок лотов предмета"""
+        item = self.items.get((region.upper(), item_id))
+        return item.latest if item else None
+
+    def add_listener(self, listener: PollListener) -> None:
+        """Подписаться на успешные опросы (вызывается синхронно)"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: PollListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def add_error_listener(self, listener: PollErrorListener) -> None:
+        """Подписаться на неудачные опросы (вызывается синхронно)"""
+        self._error_listeners.append(listener)
+
+    def remove_error_listener(self, listener: PollErrorListener) -> None:
+        if listener in self._error_listeners:
+            self._error_listeners.remove(listener)
+
+    def _notify(self) -> None:
+        """Разбудить планировщик (состав watchlist изменился)"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    # ==================== Polling ====================
+
+    def _adapt_interval(self, item: WatchItem, changed: bool) -> None:
+        """Горячие предметы - чаще, неизменные - реже"""
+        if changed:
+            interval = item.interval / 2
+        else:
+            interval = item.interval * settings.WATCHLIST_BACKOFF_FACTOR
+        item.interval = min(
+            max(interval, settings.WATCHLIST_MIN_INTERVAL),
+            settings.WATCHLIST_MAX_INTERVAL,
+        )
+
+    async def poll(self, item: WatchItem) -> None:
+        """Опросить один предмет, сравнить с прошлым снимком и обновить кэш"""
+        now = datetime.now(timezone.utc)
+        # Upstream returns additional={} unless asked: load it for rules on it
+        additional = self.alerts.needs_additional(item.region, item.item_id)
+        try:
+            # Largest page, default sort (time_created desc): diff-friendly
+            data = await self.service.client.get_auction_lots(
+                region=item.region,
+                item_id=item.item_id,
+                additional=additional,
+                limit=_POLL_PAGE_SIZE,
+            )
+        except StalcraftAPIError as e:
+            item.failures += 1
+            item.last_error = str(e)
+            # Upstream is failing: back off as if nothing changed
+            self._adapt_interval(item, changed=False)
+            print(f"⚠️ Watchlist poll failed {item.region}:{item.item_id}: {e}")
+
+            for error_listener in list(self._error_listeners):
+                error_listener(item, item.last_error)
+        else:
+            item.latest = AuctionLotsResponse(**data)
+            events = self.tracker.update(item.region, item.item_id, item.latest, now)
+            self.alerts.evaluate(item.region, item.item_id, item.latest.lots, now)
+            if events:
+                item.changes += 1
+                item.last_changed = now
+            item.last_error = None
+            self._adapt_interval(item, changed=bool(events))
+
+            # Default /lots query is the head of the polled page;
+            # it stays fresh until the next poll
+            ttl = max(settings.AUCTION_CACHE_LOTS_TTL, item.interval)
+            head_lots = (data.get("lots") or [])[:_DEFAULT_LIMIT]
+            if additional:
+                head_lots = [{**lot, "additional": {}} for lot in head_lots]
+            head = {**data, "lots": head_lots}
+            self.service.prime_lots(item.region, item.item_id, head, ttl)
+
+            for listener in list(self._listeners):
+                listener(item, events)
+
+            await self._refresh_history(item)
+        finally:
+            item.polls += 1
+            item.last_polled = now
+            item.next_poll = self._clock() + item.interval
+            # The scheduler may be asleep with every item in flight
+            self._notify()
+
+    async def _refresh_history(self, item: WatchItem) -> None:
+        """
+        Догрузить историю продаж предмета (раз в WATCHLIST_HISTORY_INTERVAL)
+
+        Новые продажи обновляют baseline детектора аномалий, даже если
+        историю предмета никто не открывает. Обновление берёт токен из
+        общего бюджета опроса; инкрементальное обновление - обычно одна
+        страница
+        """
+        interval = settings.WATCHLIST_HISTORY_INTERVAL
+        if interval <= 0 or self._clock() < item.next_history:
+            return
+        item.next_history = self._clock() + interval
+
+        await self.budget.acquire()
+        try:
+            await self.history.refresh(item.region, item.item_id)
+        except (StalcraftAPIError, CircuitOpenError) as e:
+            print(
+                f"⚠️ Watchlist history refresh failed {item.region}:{item.item_id}: {e}"
+            )
+
+    def _next_due(self) -> WatchItem | None:
+        if not self.items:
+            return None
+        return min(self.items.values(), key=lambda item: item.next_poll)
+
+    async def _run(self) -> None:
+        semaphore = asyncio.Semaphore(settings.WATCHLIST_CONCURRENCY)
+
+        async def poll_one(item: WatchItem) -> None:
+            try:
+                await self.poll(item)
+            except Exception as e:
+                print(f"❌ Watchlist poll error {item.region}:{item.item_id}: {e}")
+            finally:
+                semaphore.release()
+
+        wakeup = self._wakeup
+        assert wakeup is not None, "start() creates the wakeup event"
+
+        with request_priority(Priority.BACKGROUND):
+            while True:
+                item = self._next_due()
+                delay = item.next_poll - self._clock() if item else math.inf
+                if item is None or delay > 0:
+                    wakeup.clear()
+                    try:
+                        await asyncio.wait_for(
+                            wakeup.wait(),
+                            None if delay == math.inf else delay,
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                # Not due again until this poll finishes
+                item.next_poll = math.inf
+                await self.budget.acquire()
+                await semaphore.acquire()
+                task = asyncio.create_task(poll_one(item))
+                self._polling.add(task)
+                task.add_done_callback(self._polling.discard)
+
+    def start(self) -> None:
+        """Запустить планировщик (watchlist из настроек)"""
+        if self._task is not None:
+            return
+
+        for entry in settings.WATCHLIST:
+            try:
+                self.add(*parse_watchlist_entry(entry))
+            except (ValueError, InvalidRegionError) as e:
+                print(f"⚠️ Watchlist entry skipped: {e}")
+
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        print(f"👀 Watchlist poller started ({len(self.items)} items)")
+
+    async def stop(self) -> None:
+        tasks = [task for task in (self._task, *self._polling) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.budget.close()
+        self._task = None
+        self._wakeup = None
+        self._polling.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "request_budget_per_minute": settings.WATCHLIST_REQUEST_BUDGET,
+            "budget": self.budget.stats(),
+            "items": [item.stats() for item in self.items.values()],
+        }
+
+
+# Singleton
+watchlist_poller = WatchlistPoller()
@@ -0,0 +1,185 @@
+"""
+In-memory TTL + LRU cache with stale-while-revalidate
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class CacheEntry:
+    """Запись кэша"""
+
+    value: Any
+    size: int
+    created_at: float
+    ttl: float
+
+    def age(self, now: float) -> float:
+        return now - self.created_at
+
+
+class ResponseCache:
+    """
+    TTL + LRU кэш ответов с ограничением по памяти
+
+    - Запись свежая, пока age < ttl
+    - В окне ttl..ttl+stale_ttl отдаётся устаревшее значение,
+      а обновление запускается в фоне (stale-while-revalidate)
+    - При превышении max_bytes вытесняются давно не использованные записи
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        stale_ttl: float = 0.0,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_bytes = max_bytes
+        self.stale_ttl = stale_ttl
+        self.enabled = enabled
+        self._clock = clock
+
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self._bytes = 0
+        self._refreshing: dict[Hashable, asyncio.Task] = {}
+
+        # Counters
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.refresh_errors = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> tuple[Any, bool] | None:
+        """
+        Получить значение без загрузки
+
+        Returns:
+            (value, is_fresh) или None, если записи нет или она полностью устарела
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        age = entry.age(self._clock())
+        if age >= entry.ttl + self.stale_ttl:
+            self._remove(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return entry.value, age < entry.ttl
+
+    def set(self, key: Hashable, value: Any, ttl: float, size: int) -> None:
+        """Сохранить значение (size - оценка размера в байтах)"""
+        if not self.enabled or size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = CacheEntry(
+            value=value, size=size, created_at=self._clock(), ttl=ttl
+        )
+        self._bytes += size
+
+        while self._bytes > self.max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    async def get_or_fetch(
+        self,
+        key: Hashable,
+        ttl: float,
+        fetch: Callable[[], Awaitable[Any]],
+        size_of: Callable[[Any], int],
+    ) -> Any:
+        """
+        Получить значение из кэша или загрузить через fetch()
+
+        Args:
+            key: Ключ кэша
+            ttl: Время жизни свежей записи (секунды)
+            fetch: Корутина загрузки значения
+            size_of: Оценка размера значения в байтах
+        """
+        if not self.enabled:
+            return await fetch()
+
+        cached = self.get(key)
+        if cached is not None:
+            value, is_fresh = cached
+            if is_fresh:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                self._schedule_refresh(key, ttl, fetch, size_of)
+            return value
+
+        self.misses += 1
+        value = await fetch()
+        self.set(key, value, ttl, size_of(value))
+        return value
+
+    def _schedule_refresh(
+        self,
+        key: Hashable,
+        ttl: float,
+        fetch: Callable[[], Awaitable[Any]],
+        size_of: Callable[[Any], int],
+    ) -> None:
+        """Фоновое обновление устаревшей записи (не больше одного на ключ)"""
+        if key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                value = await fetch()
+                self.set(key, value, ttl, size_of(value))
+            except Exception:
+                # Stale value stays until it falls out of the stale window
+                self.refresh_errors += 1
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(refresh())
+
+    def stats(self) -> dict[str, Any]:
+        """Счётчики для настройки TTL"""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "refresh_errors": self.refresh_errors,
+            "refreshing": len(self._refreshing),
+            "hit_ratio": (
+                round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0
+            ),
+        }
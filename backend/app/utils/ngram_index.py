@@ -0,0 +1,70 @@
+"""
+N-gram inverted index for substring search over short strings
+
+Для каждого 1-, 2- и 3-грамма хранится список позиций записей (по
+возрастанию), в полях которых он встречается. Запрос до 3 символов -
+это сам список позиций; для более длинного запроса перебирается самый
+короткий список среди его триграмм, кандидаты проверяются подстрокой.
+Результат совпадает с линейным `query in field` по всем полям, в
+порядке записей.
+"""
+
+from collections.abc import Callable, Sequence
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+_N = 3
+
+
+def _grams(text: str, n: int) -> set[str]:
+    return {text[i : i + n] for i in range(len(text) - n + 1)}
+
+
+class NgramIndex(Generic[T]):
+    """Индекс подстрок по нормализованным (lowercase) полям записей"""
+
+    def __init__(self, records: Sequence[T], fields: Callable[[T], list[str]]):
+        self.records = records
+        self._texts: list[tuple[str, ...]] = []
+        self._postings: dict[str, list[int]] = {}
+
+        for position, record in enumerate(records):
+            texts = tuple(dict.fromkeys(text for text in fields(record) if text))
+            self._texts.append(texts)
+            grams = {
+                text[i : i + n]
+                for text in texts
+                for n in range(1, _N + 1)
+                for i in range(len(text) - n + 1)
+            }
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(position)
+
+    def search(self, query: str, limit: int) -> list[T]:
+        """Первые limit записей, в поле которых есть подстрока query"""
+        if not query:
+            return list(self.records[:limit])
+
+        if len(query) <= _N:
+            # Exact answer: the n-gram itself is the query
+            positions = self._postings.get(query, [])
+            return [self.records[i] for i in positions[:limit]]
+
+        candidates: list[int] | None = None
+        for gram in _grams(query, _N):
+            posting = self._postings.get(gram)
+            if posting is None:
+                return []
+            if candidates is None or len(posting) < len(candidates):
+                candidates = posting
+        # A query longer than _N has at least one trigram
+        assert candidates is not None
+
+        results = []
+        for position in candidates:
+            if any(query in text for text in self._texts[position]):
+                results.append(self.records[position])
+                if len(results) >= limit:
+                    break
+        return results
@@ -0,0 +1,68 @@
+"""
+Single-flight: coalescing of identical concurrent async calls
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+from app.clients.rate_limit import SharedPriority, current_priority, shared_priority
+
+
+class _Call:
+    """Выполняющийся вызов, его приоритет и количество ожидающих его"""
+
+    def __init__(self, task: asyncio.Future, priority: SharedPriority):
+        self.task = task
+        self.priority = priority
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Объединяет одновременные вызовы с одинаковым ключом в один
+
+    - Все ожидающие получают один и тот же результат или исключение
+    - Отмена одного ожидающего не отменяет вызов для остальных
+    - Вызов отменяется, только когда отменены все ожидающие
+    - Upstream приоритет вызова - самый срочный среди ожидающих
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, _Call] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Выполнить fn() или присоединиться к уже выполняющемуся вызову"""
+        call = self._calls.get(key)
+        if call is None:
+            # The task copies the context: run it at a priority joiners can raise
+            with shared_priority() as priority:
+                task = asyncio.ensure_future(fn())
+            call = _Call(task, priority)
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.started += 1
+        else:
+            call.priority.raise_to(current_priority())
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if not call.task.done() and call.waiters == 1:
+                # Last waiter is gone - nobody needs the result anymore
+                self._forget(key, call)
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
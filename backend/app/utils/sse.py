@@ -0,0 +1,17 @@
+"""
+Server-Sent Events formatting
+"""
+
+# Comment line: keeps proxies from closing an idle stream
+KEEPALIVE = ": keep-alive\n\n"
+
+
+def sse_event(data: str, event: str | None = None, id: str | None = None) -> str:
+    """Одно SSE-сообщение (data - одна строка, например JSON)"""
+    lines = []
+    if id is not None:
+        lines.append(f"id: {id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {data}")
+    return "\n".join(lines) + "\n\n"
@@ -2,9 +2,16 @@
 Pytest configuration and fixtures
 """
 
+import asyncio
 import pytest
+from unittest.mock import patch
 from fastapi.testclient import TestClient
 from app.main import app
+from app.clients.rate_limit import notify_upstream_attempt
+from app.core.exceptions import StalcraftAPIError
+from app.models.auction import AuctionLot, AuctionPriceHistory
+from app.services.auction_service import auction_service
+from app.services.history_store import history_store
 
 
 @pytest.fixture
@@ -13,6 +20,17 @@ def client():
     return TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def shared_history_store(tmp_path):
+    """Keep the shared sale-history store (poller refreshes) in a per-test database"""
+    history_store.close()
+    with patch.object(
+        history_store, "path", tmp_path / "history.sqlite3"
+    ), patch.object(history_store, "_refreshed", {}):
+        yield history_store
+        history_store.close()
+
+
 @pytest.fixture
 def test_region():
     """Test region"""
@@ -23,3 +41,97 @@ def test_region():
 def test_item_id():
     """Test item ID"""
     return "test_item"
+
+
+def make_lot(item_id: str = "y1q9", buyout: int = 200, amount: int = 1, **fields):
+    """Lot in Stalcraft API format"""
+    lot = {
+        "itemId": item_id,
+        "amount": amount,
+        "startPrice": 100,
+        "buyoutPrice": buyout,
+        "startTime": "2026-01-12T10:00:00Z",
+        "endTime": "2026-01-13T10:00:00Z",
+        "additional": {},
+    }
+    lot.update(fields)
+    return lot
+
+
+def make_sale(price: int, amount: int = 1, time: str = "2026-01-12T10:00:00Z"):
+    """Sale in Stalcraft API format"""
+    return {"amount": amount, "price": price, "time": time, "additional": {}}
+
+
+class FakeStalcraftClient:
+    """
+    Upstream stub for AuctionService
+
+    Data is keyed by (REGION, item_id); keys in `failing` raise StalcraftAPIError
+    """
+
+    def __init__(self):
+        self.lots: dict[tuple[str, str], list[dict]] = {}
+        self.history: dict[tuple[str, str], list[dict]] = {}
+        self.failing: set[tuple[str, str]] = set()
+        self.calls: list[tuple[str, str, str]] = []
+        self.consumed = 0
+        # Upstream attempts per call (retries), seconds queued before the first
+        self.attempts: dict[tuple[str, str], int] = {}
+        self.queue_delay = 0.0
+
+    def _check(self, endpoint: str, region: str, item_id: str) -> None:
+        self.calls.append((endpoint, region, item_id))
+        for _ in range(self.attempts.get((region, item_id), 1)):
+            notify_upstream_attempt()
+        if (region, item_id) in self.failing:
+            raise StalcraftAPIError("API error 404: not found")
+
+    async def get_auction_lots(self, region: str, item_id: str, **kwargs) -> dict:
+        if self.queue_delay:
+            await asyncio.sleep(self.queue_delay)
+        self._check("lots", region, item_id)
+        lots = self.lots.get((region, item_id), [])
+        offset = kwargs.get("offset", 0)
+        page = lots[offset : offset + kwargs.get("limit", len(lots))]
+        if not kwargs.get("additional"):
+            # Like the API: additional is only filled in on request
+            page = [{**lot, "additional": {}} for lot in page]
+        return {"total": len(lots), "lots": page}
+
+    async def get_auction_history(self, region: str, item_id: str, **kwargs) -> dict:
+        self._check("history", region, item_id)
+        prices = self.history.get((region, item_id), [])
+        return {"total": len(prices), "prices": prices}
+
+    async def iter_auction_lots(self, region: str, item_id: str, **kwargs):
+        self._check("lots", region, item_id)
+        lots = self.lots.get((region, item_id), [])
+        if kwargs.get("sort") == "buyout_price":
+            lots = sorted(
+                lots,
+                key=lambda lot: lot["buyoutPrice"],
+                reverse=kwargs.get("order", "desc") == "desc",
+            )
+        for lot in lots:
+            yield AuctionLot.model_validate(lot)
+
+    async def iter_auction_history(self, region: str, item_id: str, **kwargs):
+        """Newest sales first; `consumed` counts records read by the caller"""
+        self._check("history", region, item_id)
+        prices = self.history.get((region, item_id), [])
+        for sale in sorted(prices, key=lambda s: s["time"], reverse=True):
+            self.consumed += 1
+            yield AuctionPriceHistory.model_validate(sale)
+
+
+@pytest.fixture
+def fake_stalcraft():
+    """Replace the Stalcraft client behind auction_service and history_store"""
+    fake = FakeStalcraftClient()
+    auction_service.cache.clear()
+    with patch.object(auction_service, "client", fake), patch.object(
+        history_store, "client", fake
+    ):
+        yield fake
+    auction_service.cache.clear()
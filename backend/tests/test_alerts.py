@@ -0,0 +1,210 @@
+"""
+Tests for the indexed price-alert rule engine
+"""
+
+import asyncio
+import httpx
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import patch
+from app.clients.http import http_pool
+from app.models.alerts import AlertCondition
+from app.models.auction import AuctionLot
+from app.services.alert_engine import AlertEngine
+from app.services.auction_service import auction_service
+from app.services.lot_diff import LotBookTracker
+from app.services.watchlist_poller import WatchlistPoller
+from tests.conftest import make_lot
+
+
+def _lots(*lots: dict) -> list[AuctionLot]:
+    return [AuctionLot.model_validate(lot) for lot in lots]
+
+
+def _cond(field: str, op: str, value: float) -> AlertCondition:
+    return AlertCondition(field=field, op=op, value=value)
+
+
+def test_rule_fires_once_per_lot_until_it_ends():
+    engine = AlertEngine()
+    rule = engine.add_rule("eu", "y1q9", [_cond("unit_buyout_price", "<", 100)])
+    now = datetime(2026, 1, 12, 12, tzinfo=timezone.utc)
+
+    cheap = make_lot(buyout=150, amount=2, startTime="2026-01-12T10:00:00Z")
+    book = _lots(cheap, make_lot(buyout=500))
+
+    matches = engine.evaluate("EU", "y1q9", book, now)
+    assert [m.unit_buyout_price for m in matches] == [75]
+    assert engine.evaluate("EU", "y1q9", book, now) == []
+
+    # Lot dropped off the polled page and came back: same lot, no new alert
+    engine.evaluate("EU", "y1q9", [], now)
+    assert engine.evaluate("EU", "y1q9", book, now) == []
+    assert engine.get_rule(rule.id).matches == 1
+
+    # Fired lots are forgotten after their endTime
+    later = datetime(2026, 1, 14, tzinfo=timezone.utc)
+    assert engine.evaluate("EU", "y1q9", [], later) == []
+    assert engine._rules[rule.id].fired == {}
+
+
+def test_conditions_on_additional_fields_and_new_lots():
+    engine = AlertEngine()
+    engine.add_rule("EU", "y1q9", [_cond("additional.qlt", ">=", 4)], only_new=True)
+
+    old = make_lot(additional={"qlt": 5}, startTime="2020-01-01T00:00:00Z")
+    new_low = make_lot(additional={"qlt": 1}, startTime="2099-01-01T00:00:00Z")
+    new_high = make_lot(additional={"qlt": 4}, startTime="2099-01-01T00:00:00Z")
+    no_field = make_lot(startTime="2099-01-01T00:00:00Z")
+
+    matches = engine.evaluate("EU", "y1q9", _lots(old, new_low, new_high, no_field))
+
+    assert [m.lot.additional for m in matches] == [{"qlt": 4}]
+
+
+@pytest.mark.asyncio
+async def test_polled_lots_fire_quality_rule(fake_stalcraft):
+    engine = AlertEngine()
+    poller = WatchlistPoller()
+    poller.alerts = engine
+    poller.tracker = LotBookTracker()
+    engine.add_rule("EU", "y1q9", [_cond("additional.qlt", ">=", 4)])
+    item = poller.add("EU", "y1q9", owner="alerts")
+    fake_stalcraft.lots[("EU", "y1q9")] = [
+        make_lot(buyout=300, additional={"qlt": 5}),
+        make_lot(buyout=100, additional={"qlt": 1}),
+    ]
+
+    await poller.poll(item)
+
+    matches = [engine.queue.get_nowait() for _ in range(engine.queue.qsize())]
+    assert [m.lot.additional for m in matches] == [{"qlt": 5}]
+    # The primed default /lots response stays additional=false
+    cached = await auction_service.get_lots("EU", "y1q9")
+    assert [lot.additional for lot in cached.lots] == [{}, {}]
+
+
+def test_evaluation_only_touches_rules_of_the_item():
+    engine = AlertEngine()
+    for i in range(1000):
+        engine.add_rule("EU", f"item{i}", [_cond("amount", ">", 0)])
+    engine.add_rule("RU", "y1q9", [_cond("amount", ">", 0)])
+
+    engine.evaluate("RU", "y1q9", _lots(make_lot(), make_lot(amount=2)))
+
+    assert engine.evaluated_lots == 2
+    assert len(engine.list_rules(region="eu")) == 1000
+    assert len(engine.list_rules(item_id="y1q9")) == 1
+
+
+def test_remove_rule_updates_index():
+    engine = AlertEngine()
+    rule = engine.add_rule("EU", "y1q9", [_cond("amount", ">", 0)])
+
+    assert engine.remove_rule(rule.id)
+    assert not engine.has_rules("EU", "y1q9")
+    assert not engine.remove_rule(rule.id)
+
+
+def test_full_queue_drops_oldest_match():
+    engine = AlertEngine()
+    engine.queue = asyncio.Queue(maxsize=2)
+    engine.add_rule("EU", "y1q9", [_cond("buyout_price", ">", 0)])
+
+    engine.evaluate("EU", "y1q9", _lots(*[make_lot(buyout=b) for b in (1, 2, 3)]))
+
+    assert engine.dropped == 1
+    assert engine.queue.get_nowait().lot.buyoutPrice == 2
+
+
+@pytest.mark.asyncio
+async def test_webhook_consumer_posts_matches():
+    received = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        received.append(request.read())
+        return httpx.Response(204)
+
+    engine = AlertEngine()
+    engine.add_rule("EU", "y1q9", [_cond("buyout_price", ">", 0)])
+    engine.evaluate("EU", "y1q9", _lots(make_lot()))
+
+    mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with patch.object(http_pool, "get", return_value=mock_client):
+        task = asyncio.create_task(engine._run_webhook("http://hook.local/alerts"))
+        while not received:
+            await asyncio.sleep(0.01)
+        task.cancel()
+    await mock_client.aclose()
+
+    assert b'"item_id":"y1q9"' in received[0]
+    assert engine.webhook_sent == 1
+
+
+@pytest.fixture
+def api_engine():
+    engine = AlertEngine()
+    poller = WatchlistPoller()
+    with patch("app.api.v1.alerts.alert_engine", engine), patch(
+        "app.api.v1.alerts.watchlist_poller", poller
+    ):
+        yield engine, poller
+
+
+def test_alert_rule_endpoints(client, api_engine):
+    engine, poller = api_engine
+    body = {
+        "region": "eu",
+        "item_id": "y1q9",
+        "conditions": [{"field": "unit_buyout_price", "op": "<", "value": 100}],
+    }
+
+    created = client.post("/api/v1/alerts", json=body)
+    assert created.status_code == 201
+    rule_id = created.json()["id"]
+    assert ("EU", "y1q9") in poller.items
+
+    assert [r["id"] for r in client.get("/api/v1/alerts?region=EU").json()] == [rule_id]
+    assert client.get(f"/api/v1/alerts/{rule_id}").json()["region"] == "EU"
+    assert client.delete(f"/api/v1/alerts/{rule_id}").status_code == 200
+    assert client.get(f"/api/v1/alerts/{rule_id}").status_code == 404
+    # Last rule of the item is gone: nothing needs it polled anymore
+    assert poller.items == {}
+
+    body["conditions"][0]["field"] = "durability"
+    assert client.post("/api/v1/alerts", json=body).status_code == 422
+
+
+def test_deleting_rule_keeps_items_watched_for_others(client, api_engine):
+    engine, poller = api_engine
+    body = {
+        "region": "EU",
+        "item_id": "y1q9",
+        "conditions": [{"field": "amount", "op": ">", "value": 0}],
+    }
+    first = client.post("/api/v1/alerts", json=body).json()["id"]
+    second = client.post("/api/v1/alerts", json=body).json()["id"]
+    client.post("/api/v1/alerts", json={**body, "item_id": "pinned"})
+    poller.add("EU", "pinned")
+
+    client.delete(f"/api/v1/alerts/{first}")
+    assert ("EU", "y1q9") in poller.items
+
+    client.delete(f"/api/v1/alerts/{second}")
+    for rule in engine.list_rules(item_id="pinned"):
+        client.delete(f"/api/v1/alerts/{rule.id}")
+
+    # Added to the watchlist explicitly: stays after its rules are deleted
+    assert list(poller.items) == [("EU", "pinned")]
+
+
+def test_alert_stream_endpoint(client, api_engine):
+    engine, _ = api_engine
+    engine.add_rule("EU", "y1q9", [_cond("buyout_price", ">", 0)])
+    engine.evaluate("EU", "y1q9", _lots(make_lot(buyout=777)))
+
+    response = client.get("/api/v1/alerts/stream?limit=1")
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.startswith("event: alert\ndata: ")
+    assert '"buyoutPrice":777' in response.text
@@ -0,0 +1,176 @@
+"""
+Tests for the streaming underpriced-lot detector
+"""
+
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import patch
+from app.models.auction import LotEvent
+from app.services.anomaly_detector import AnomalyDetector
+from app.services.history_store import HistoryStore, history_store
+from app.services.lot_diff import LotBookTracker
+from app.services.watchlist_poller import WatchlistPoller
+from tests.conftest import FakeStalcraftClient, make_lot, make_sale
+
+NOW = datetime(2026, 1, 12, 12, 0, tzinfo=timezone.utc)
+
+
+def _event(type: str, buyout: int, amount: int = 1) -> LotEvent:
+    return LotEvent(
+        type=type,
+        region="EU",
+        item_id="y1q9",
+        detected_at=NOW,
+        amount=amount,
+        buyout_price=buyout,
+        price=buyout,
+        start_time=NOW,
+        end_time=NOW,
+    )
+
+
+def _trained(prices: list[float]) -> AnomalyDetector:
+    detector = AnomalyDetector()
+    for price in prices:
+        detector.observe("eu", "y1q9", price, NOW)
+    return detector
+
+
+def test_baseline_tracks_price_and_ignores_outliers():
+    detector = _trained([1000, 1040, 960] * 10)
+
+    before = detector.baseline("EU", "y1q9")
+    detector.observe("EU", "y1q9", 1, NOW)
+    after = detector.baseline("EU", "y1q9")
+
+    assert before.ready and before.samples == 30
+    assert 980 < before.price < 1020
+    # A single dump sale is clipped to a few deviations
+    assert after.price > 0.8 * before.price
+
+
+def test_flags_only_lots_far_below_normal():
+    detector = _trained([1000] * 25)
+
+    assert detector.check(_event("new", buyout=960)) is None
+    anomaly = detector.check(_event("new", buyout=1000, amount=2))
+
+    assert anomaly.unit_buyout_price == 500
+    assert anomaly.baseline_price == 1000
+    assert anomaly.deviations > 10
+    assert detector.recent(region="eu") == [anomaly]
+
+
+def test_no_flags_before_enough_samples():
+    detector = _trained([1000] * 5)
+    assert detector.check(_event("new", buyout=1)) is None
+
+
+def test_lot_events_only_check_new_lots():
+    detector = _trained([1000] * 20)
+
+    detector.on_lot_events([_event("new", buyout=100), _event("expired", buyout=1)])
+
+    assert detector.baseline("EU", "y1q9").samples == 20
+    assert [a.unit_buyout_price for a in detector.recent()] == [100]
+
+
+@pytest.mark.asyncio
+async def test_history_refresh_feeds_new_sales(tmp_path):
+    store = HistoryStore(tmp_path / "history.sqlite3")
+    store.client = FakeStalcraftClient()
+    store.client.history[("EU", "y1q9")] = [
+        make_sale(300, amount=3, time="2026-01-12T10:00:00Z"),
+        make_sale(200, time="2026-01-12T11:00:00Z"),
+    ]
+    detector = AnomalyDetector()
+    store.add_listener(detector.on_sales)
+
+    await store.refresh("EU", "y1q9")
+    await store.refresh("EU", "y1q9")
+    store.close()
+
+    baseline = detector.baseline("EU", "y1q9")
+    assert baseline.samples == 2
+    assert 100 < baseline.price < 200
+
+
+@pytest.mark.asyncio
+async def test_sale_seen_as_lot_event_and_history_counts_once(tmp_path):
+    store = HistoryStore(tmp_path / "history.sqlite3")
+    store.client = FakeStalcraftClient()
+    store.client.history[("EU", "y1q9")] = [make_sale(2000, amount=2)]
+    detector = AnomalyDetector()
+    store.add_listener(detector.on_sales)
+
+    # The lot disappears from the book, then the sale shows up in history
+    detector.on_lot_events([_event("sold", buyout=2000, amount=2)])
+    await store.refresh("EU", "y1q9")
+    store.close()
+
+    assert detector.baseline("EU", "y1q9").samples == 1
+    assert detector.stats()["observed_sales"] == 1
+
+
+@pytest.mark.asyncio
+async def test_watched_item_gets_baseline_and_anomaly_from_polls(fake_stalcraft):
+    detector = AnomalyDetector()
+    tracker = LotBookTracker()
+    tracker.add_listener(detector.on_lot_events)
+    history_store.add_listener(detector.on_sales)
+    poller = WatchlistPoller()
+    poller.tracker = tracker
+
+    fake_stalcraft.history[("EU", "y1q9")] = [
+        make_sale(1000, time=f"2026-01-12T10:{minute:02d}:00Z") for minute in range(25)
+    ]
+    fake_stalcraft.lots[("EU", "y1q9")] = [make_lot(buyout=1000)]
+    item = poller.add("EU", "y1q9")
+    try:
+        # First poll refreshes the sale history in the background
+        await poller.poll(item)
+        assert detector.baseline("EU", "y1q9").ready
+
+        fake_stalcraft.lots[("EU", "y1q9")].append(
+            make_lot(buyout=100, startTime="2026-01-12T11:00:00Z")
+        )
+        await poller.poll(item)
+    finally:
+        history_store.remove_listener(detector.on_sales)
+
+    assert [a.unit_buyout_price for a in detector.recent()] == [100]
+
+
+@pytest.mark.asyncio
+async def test_seed_restores_baselines_from_stored_history(tmp_path):
+    store = HistoryStore(tmp_path / "history.sqlite3")
+    store.client = FakeStalcraftClient()
+    store.client.history[("EU", "y1q9")] = [
+        make_sale(500, amount=2, time=f"2026-01-12T10:{minute:02d}:00Z")
+        for minute in range(30)
+    ]
+    await store.refresh("EU", "y1q9")
+
+    # Fresh process: nothing observed yet, the sales are only in SQLite
+    detector = AnomalyDetector()
+    assert await detector.seed(store) == 1
+    store.close()
+
+    baseline = detector.baseline("EU", "y1q9")
+    assert baseline.samples == 30 and baseline.ready
+    assert baseline.price == 250
+    assert baseline.updated_at == datetime(2026, 1, 12, 10, 29, tzinfo=timezone.utc)
+
+
+def test_anomaly_endpoints(client):
+    detector = _trained([1000] * 25)
+    detector.check(_event("new", buyout=100))
+
+    with patch("app.api.v1.auction.anomaly_detector", detector):
+        anomalies = client.get("/api/v1/auction/anomalies?region=eu").json()
+        baseline = client.get("/api/v1/auction/eu/y1q9/baseline").json()
+        missing = client.get("/api/v1/auction/eu/none/baseline")
+
+    assert [a["lot"]["buyout_price"] for a in anomalies] == [100]
+    assert baseline["price"] == 1000
+    assert missing.status_code == 404
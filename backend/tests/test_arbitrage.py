@@ -0,0 +1,116 @@
+"""
+Tests for the cross-region arbitrage scanner
+"""
+
+import json
+import pytest
+from unittest.mock import patch
+from app.models.auction import RegionComparisonResponse, RegionPriceSummary
+from app.services.auction_service import auction_service
+from app.services.arbitrage_scanner import ArbitrageScanner, best_spread
+from app.services.items_database_manager import items_db_manager
+from tests.conftest import make_lot, make_sale
+
+INDEX = {
+    "global": [
+        {"id": "weapon/y1q9", "name": "Rifle"},
+        {"id": "4q7pl", "name": "Armor"},
+    ],
+    "ru": [{"id": "y1q9", "name": "Винтовка"}],
+}
+
+
+@pytest.fixture(autouse=True)
+def search_index():
+    with patch.object(items_db_manager, "search_index", INDEX):
+        yield
+
+
+def _market(fake, item_id: str, buyouts: dict[str, int], medians: dict[str, int]):
+    for region, buyout in buyouts.items():
+        fake.lots[(region, item_id)] = [make_lot(item_id, buyout=buyout)]
+    for region, price in medians.items():
+        fake.history[(region, item_id)] = [make_sale(price)] * 5
+
+
+def test_best_spread_picks_widest_pair():
+    comparison = RegionComparisonResponse(
+        item_id="y1q9",
+        regions=[
+            RegionPriceSummary(region="EU", min_buyout_price=100),
+            RegionPriceSummary(region="RU", median_sale_price=160, recent_sales=9),
+            RegionPriceSummary(region="NA", min_buyout_price=80, median_sale_price=90),
+            RegionPriceSummary(region="SEA", median_sale_price=500, recent_sales=1),
+        ],
+    )
+
+    best = best_spread(comparison, min_sales=5)
+
+    assert (best.buy_region, best.sell_region, best.spread) == ("NA", "RU", 80)
+    assert best.spread_pct == 100.0
+
+
+def test_auction_item_ids_strip_subdirectories():
+    assert items_db_manager.auction_item_ids("global") == ["y1q9", "4q7pl"]
+
+
+@pytest.mark.asyncio
+async def test_scan_ranks_items_and_caches_results(fake_stalcraft, tmp_path):
+    _market(fake_stalcraft, "y1q9", {"EU": 100}, {"RU": 150})
+    _market(fake_stalcraft, "4q7pl", {"NA": 1000}, {"EU": 1200})
+    scanner = ArbitrageScanner(tmp_path / "arbitrage.json")
+
+    scanner._begin_run()
+    await scanner._scan()
+
+    result = scanner.get_opportunities()
+    assert [o.item_id for o in result.opportunities] == ["4q7pl", "y1q9"]
+    assert result.opportunities[1].name == "Rifle"
+    assert not result.partial
+    assert scanner.status().state == "completed"
+
+    # The pass does not fill the interactive response cache
+    assert len(auction_service.cache) == 0
+
+    # Results survive a restart
+    restored = ArbitrageScanner(tmp_path / "arbitrage.json")
+    by_pct = restored.get_opportunities(sort="spread_pct")
+    assert [o.item_id for o in by_pct.opportunities] == ["y1q9", "4q7pl"]
+
+
+@pytest.mark.asyncio
+async def test_interrupted_scan_resumes(fake_stalcraft, tmp_path):
+    _market(fake_stalcraft, "4q7pl", {"NA": 1000}, {"EU": 1200})
+    state = tmp_path / "arbitrage.json"
+    state.write_text(
+        json.dumps(
+            {
+                "run": {
+                    "started_at": "2026-01-12T10:00:00+00:00",
+                    "item_ids": ["y1q9", "4q7pl"],
+                    "results": {"y1q9": None},
+                    "failed": [],
+                },
+                "last": None,
+            }
+        )
+    )
+    scanner = ArbitrageScanner(state)
+    scanner._load()
+
+    assert scanner.status().scanned_items == 1
+    await scanner._scan()
+
+    assert {item_id for _, _, item_id in fake_stalcraft.calls} == {"4q7pl"}
+    assert [o.item_id for o in scanner.get_opportunities().opportunities] == ["4q7pl"]
+
+
+def test_arbitrage_endpoints(client, tmp_path):
+    scanner = ArbitrageScanner(tmp_path / "arbitrage.json")
+
+    with patch("app.api.v1.arbitrage.arbitrage_scanner", scanner):
+        status = client.get("/api/v1/arbitrage/status")
+        response = client.get("/api/v1/arbitrage?sort=spread_pct")
+
+    assert status.json()["state"] == "idle"
+    assert response.json()["total"] == 0
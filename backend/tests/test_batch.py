@@ -0,0 +1,38 @@
+"""
+Tests for the batch multi-item auction endpoint
+"""
+
+from tests.conftest import make_lot
+
+
+def test_batch_returns_per_item_results_and_errors(client, fake_stalcraft):
+    fake_stalcraft.lots[("EU", "a")] = [make_lot("a")]
+    fake_stalcraft.lots[("EU", "b")] = [make_lot("b")]
+    fake_stalcraft.failing.add(("EU", "broken"))
+
+    response = client.post(
+        "/api/v1/auction/eu/batch",
+        json={"item_ids": ["a", "broken", "b", "a"], "history": True},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["region"] == "EU"
+    assert [item["item_id"] for item in data["items"]] == ["a", "broken", "b"]
+
+    ok, broken, _ = data["items"]
+    assert ok["lots"]["total"] == 1
+    assert ok["history"]["total"] == 0
+    assert ok["errors"] == {}
+    assert broken["lots"] is None
+    assert set(broken["errors"]) == {"lots", "history"}
+
+    lots_calls = [
+        item for endpoint, _, item in fake_stalcraft.calls if endpoint == "lots"
+    ]
+    assert sorted(lots_calls) == ["a", "b", "broken"]
+
+
+def test_batch_rejects_empty_request(client):
+    response = client.post("/api/v1/auction/eu/batch", json={"item_ids": []})
+    assert response.status_code == 422
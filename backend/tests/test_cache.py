@@ -0,0 +1,106 @@
+"""
+Tests for the TTL + LRU response cache
+"""
+
+import asyncio
+import pytest
+from app.utils.cache import ResponseCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_fetch(values: list):
+    calls = {"count": 0}
+
+    async def fetch():
+        calls["count"] += 1
+        return values[calls["count"] - 1]
+
+    return fetch, calls
+
+
+@pytest.mark.asyncio
+async def test_fresh_hit_and_miss():
+    """Second lookup within TTL is served from cache"""
+    clock = FakeClock()
+    cache = ResponseCache(max_bytes=1000, clock=clock)
+    fetch, calls = make_fetch(["a", "b"])
+
+    assert await cache.get_or_fetch("k", 10, fetch, len) == "a"
+    clock.now = 5
+    assert await cache.get_or_fetch("k", 10, fetch, len) == "a"
+
+    assert calls["count"] == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate():
+    """Stale entry is returned immediately and refreshed in the background"""
+    clock = FakeClock()
+    cache = ResponseCache(max_bytes=1000, stale_ttl=10, clock=clock)
+    fetch, calls = make_fetch(["old", "new"])
+
+    await cache.get_or_fetch("k", 10, fetch, len)
+    clock.now = 15  # past TTL, inside stale window
+
+    assert await cache.get_or_fetch("k", 10, fetch, len) == "old"
+    await asyncio.sleep(0)  # let the refresh task run
+
+    assert calls["count"] == 2
+    assert cache.stats()["stale_hits"] == 1
+    assert await cache.get_or_fetch("k", 10, fetch, len) == "new"
+
+
+@pytest.mark.asyncio
+async def test_expired_past_stale_window_is_a_miss():
+    clock = FakeClock()
+    cache = ResponseCache(max_bytes=1000, stale_ttl=5, clock=clock)
+    fetch, calls = make_fetch(["old", "new"])
+
+    await cache.get_or_fetch("k", 10, fetch, len)
+    clock.now = 20
+
+    assert await cache.get_or_fetch("k", 10, fetch, len) == "new"
+    assert cache.stats()["misses"] == 2
+
+
+def test_lru_eviction_by_bytes():
+    """Least recently used entries are evicted once the byte budget is exceeded"""
+    cache = ResponseCache(max_bytes=10)
+    cache.set("a", "aaaa", ttl=60, size=4)
+    cache.set("b", "bbbb", ttl=60, size=4)
+    cache.get("a")  # "a" becomes most recently used
+    cache.set("c", "cccc", ttl=60, size=4)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == ("aaaa", True)
+    assert cache.get("c") == ("cccc", True)
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 8
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_always_fetches():
+    cache = ResponseCache(max_bytes=1000, enabled=False)
+    fetch, calls = make_fetch(["a", "b"])
+
+    assert await cache.get_or_fetch("k", 10, fetch, len) == "a"
+    assert await cache.get_or_fetch("k", 10, fetch, len) == "b"
+    assert len(cache) == 0
+
+
+def test_cache_stats_endpoint(client):
+    response = client.get("/api/v1/auction/cache/stats")
+    assert response.status_code == 200
+
+    data = response.json()
+    for counter in ("hits", "misses", "stale_hits", "evictions"):
+        assert counter in data
@@ -0,0 +1,103 @@
+"""
+Tests for incrementally maintained OHLC candles
+"""
+
+import sqlite3
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import patch
+from app.services.history_store import HistoryStore, aggregate_candles
+from tests.conftest import FakeStalcraftClient, make_sale
+
+
+def _sale(price: int, minute: int, amount: int = 1, hour: int = 10) -> dict:
+    return make_sale(price, amount, time=f"2026-01-12T{hour:02d}:{minute:02d}:00Z")
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(tmp_path / "history.sqlite3")
+    store.client = FakeStalcraftClient()
+    yield store
+    store.close()
+
+
+def test_aggregate_candles_ohlc_and_vwap():
+    # (time_ms, price, amount) out of order, as upstream pages return them
+    candles = aggregate_candles([(240_000, 300, 1), (0, 100, 1), (60_000, 400, 2)])
+    open_, _, high, low, close, _, volume, turnover, trades = candles[("5m", 0)]
+
+    assert (open_, high, low, close) == (100, 300, 100, 300)
+    assert (volume, turnover, trades) == (4, 800, 3)
+
+
+@pytest.mark.asyncio
+async def test_candles_are_updated_incrementally(store):
+    upstream = store.client.history[("EU", "y1q9")] = [
+        _sale(100, 0),
+        _sale(300, 2),
+        _sale(200, 7),
+    ]
+    await store.refresh("EU", "y1q9")
+
+    # New sales merge into the existing 5m bucket and open a new one
+    upstream += [_sale(50, 8), _sale(800, 9, amount=2), _sale(120, 12)]
+    await store.refresh("EU", "y1q9")
+
+    five = (await store.get_candles("EU", "y1q9", "5m", refresh=False)).candles
+    assert [c.time.minute for c in five] == [0, 5, 10]
+    merged = five[1]
+    assert (merged.open, merged.high, merged.low, merged.close) == (200, 400, 50, 400)
+    assert merged.volume == 4 and merged.trades == 3
+    assert merged.vwap == pytest.approx((200 + 50 + 800) / 4)
+
+    hour = (await store.get_candles("EU", "y1q9", "1h", refresh=False)).candles
+    assert len(hour) == 1
+    assert (hour[0].open, hour[0].close, hour[0].trades) == (100, 120, 6)
+
+
+@pytest.mark.asyncio
+async def test_candles_limit_and_period(store):
+    store.client.history[("EU", "y1q9")] = [_sale(100 + h, 0, hour=h) for h in range(6)]
+
+    response = await store.get_candles(
+        "EU",
+        "y1q9",
+        "1h",
+        since=datetime(2026, 1, 12, 1, 30, tzinfo=timezone.utc),
+        limit=2,
+    )
+
+    assert [c.close for c in response.candles] == [104, 105]
+
+
+def test_candles_rebuilt_for_existing_database(tmp_path):
+    path = tmp_path / "history.sqlite3"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE sales (region TEXT, item_id TEXT, time_ms INTEGER, "
+        "price INTEGER, amount INTEGER, additional TEXT, "
+        "PRIMARY KEY (region, item_id, time_ms, price, amount))"
+    )
+    conn.execute("INSERT INTO sales VALUES ('EU', 'y1q9', 0, 100, 2, '{}')")
+    conn.commit()
+    conn.close()
+
+    store = HistoryStore(path)
+    candles = store._candles("EU", "y1q9", "1d", None, None, 10)
+    store.close()
+
+    assert len(candles) == 1
+    assert candles[0].vwap == 50
+
+
+def test_candles_endpoint(client, store):
+    store.client.history[("EU", "y1q9")] = [_sale(100, 1)]
+
+    with patch("app.api.v1.auction.history_store", store):
+        response = client.get("/api/v1/auction/eu/y1q9/candles?interval=5m")
+        invalid = client.get("/api/v1/auction/eu/y1q9/candles?interval=2m")
+
+    assert response.status_code == 200
+    assert response.json()["candles"][0]["close"] == 100
+    assert invalid.status_code == 422
@@ -0,0 +1,86 @@
+"""
+Tests for the cross-region price comparison endpoint
+"""
+
+import pytest
+from unittest.mock import patch
+from app.config import settings
+from app.services.auction_service import auction_service
+from tests.conftest import make_lot, make_sale
+
+
+def test_compare_regions(client, fake_stalcraft):
+    fake_stalcraft.lots[("EU", "y1q9")] = [
+        make_lot(buyout=0),  # no buyout
+        make_lot(buyout=1000, amount=4),
+        make_lot(buyout=600),
+    ]
+    fake_stalcraft.history[("EU", "y1q9")] = [
+        make_sale(300),
+        make_sale(900, amount=3),
+        make_sale(500),
+    ]
+    fake_stalcraft.lots[("RU", "y1q9")] = [make_lot(buyout=100)]
+    fake_stalcraft.failing.add(("NA", "y1q9"))
+
+    response = client.get("/api/v1/auction/compare/y1q9")
+
+    assert response.status_code == 200
+    data = response.json()
+    regions = {summary["region"]: summary for summary in data["regions"]}
+    assert set(regions) == {"EU", "RU", "NA", "SEA"}
+
+    assert regions["EU"]["lot_count"] == 3
+    assert regions["EU"]["min_buyout_price"] == 250
+    assert regions["EU"]["median_sale_price"] == 300
+    assert regions["EU"]["recent_sales"] == 3
+
+    assert regions["RU"]["median_sale_price"] is None
+    assert set(regions["NA"]["errors"]) == {"lots", "history"}
+    assert regions["SEA"]["lot_count"] == 0
+    assert data["cheapest_region"] == "RU"
+
+
+def test_compare_regions_reuses_cache(client, fake_stalcraft):
+    client.get("/api/v1/auction/compare/y1q9")
+    calls = len(fake_stalcraft.calls)
+    client.get("/api/v1/auction/compare/y1q9")
+
+    assert calls == 8  # lots + history for 4 regions
+    assert len(fake_stalcraft.calls) == calls
+
+
+def test_compare_finds_cheap_stack_past_the_first_page(client, fake_stalcraft):
+    # Sorted by total buyout, the stack (50 per unit) is lot 201
+    fake_stalcraft.lots[("EU", "y1q9")] = [make_lot(buyout=100)] * 200 + [
+        make_lot(buyout=500, amount=10)
+    ]
+
+    data = client.get("/api/v1/auction/compare/y1q9").json()
+    eu = next(r for r in data["regions"] if r["region"] == "EU")
+
+    assert eu["lot_count"] == 201
+    assert eu["min_buyout_price"] == 50
+    assert eu["min_buyout_approximate"] is False
+    # The first page is not fetched twice, and the walk is memoized
+    assert fake_stalcraft.calls.count(("lots", "EU", "y1q9")) == 2
+    client.get("/api/v1/auction/compare/y1q9")
+    assert fake_stalcraft.calls.count(("lots", "EU", "y1q9")) == 2
+
+
+@pytest.mark.asyncio
+async def test_compare_caps_interactive_book_walk(fake_stalcraft):
+    fake_stalcraft.lots[("EU", "y1q9")] = [make_lot(buyout=100)] * 200 + [
+        make_lot(buyout=500, amount=10)
+    ]
+
+    with patch.object(settings, "COMPARE_MAX_LOT_PAGES", 1):
+        capped = await auction_service.compare_regions("y1q9")
+        full = await auction_service.compare_regions("y1q9", cached=False)
+
+    eu = next(r for r in capped.regions if r.region == "EU")
+    assert (eu.min_buyout_price, eu.min_buyout_approximate) == (100, True)
+
+    # Background scans walk the whole book
+    eu = next(r for r in full.regions if r.region == "EU")
+    assert (eu.min_buyout_price, eu.min_buyout_approximate) == (50, False)
@@ -0,0 +1,52 @@
+"""
+Tests for the fast-path (pre-serialized) lots/history responses
+"""
+
+from unittest.mock import patch
+from app.config import settings
+from app.utils import fastjson
+from tests.conftest import make_lot, make_sale
+
+
+def test_fast_path_matches_model_response(client, fake_stalcraft):
+    fake_stalcraft.lots[("EU", "y1q9")] = [make_lot(buyout=300), make_lot(buyout=100)]
+    fake_stalcraft.history[("EU", "y1q9")] = [make_sale(250)]
+
+    lots_url = "/api/v1/auction/eu/y1q9/lots"
+    history_url = "/api/v1/auction/eu/y1q9/history"
+    expected_lots = client.get(lots_url).json()
+    expected_history = client.get(history_url).json()
+
+    with patch.object(settings, "AUCTION_RESPONSE_MODE", "fast"):
+        lots = client.get(lots_url)
+        history = client.get(history_url)
+
+    assert lots.status_code == 200
+    assert lots.headers["content-type"] == "application/json"
+    assert lots.json() == expected_lots
+    assert history.json() == expected_history
+
+
+def test_passthrough_returns_upstream_payload(client, fake_stalcraft):
+    upstream = [make_lot(buyout=300)]
+    fake_stalcraft.lots[("EU", "y1q9")] = upstream
+
+    with patch.object(settings, "AUCTION_RESPONSE_MODE", "passthrough"):
+        response = client.get("/api/v1/auction/eu/y1q9/lots")
+
+    # Без валидации: поля, которых нет у upstream, не добавляются
+    assert response.json() == {"total": 1, "lots": upstream}
+
+
+def test_fast_path_serves_cached_bytes(client, fake_stalcraft):
+    with patch.object(settings, "AUCTION_RESPONSE_MODE", "fast"):
+        first = client.get("/api/v1/auction/eu/y1q9/lots")
+        second = client.get("/api/v1/auction/eu/y1q9/lots")
+
+    assert first.content == second.content
+    assert len(fake_stalcraft.calls) == 1
+
+
+def test_fastjson_roundtrip():
+    data = {"name": "АК-203", "total": 1, "lots": [{"price": 1.5}]}
+    assert fastjson.loads(fastjson.dumps(data)) == data
@@ -0,0 +1,93 @@
+"""
+Tests for the local sale-history store
+"""
+
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import patch
+from app.config import settings
+from app.core.exceptions import StalcraftAPIError
+from app.services.history_store import HistoryStore
+from tests.conftest import FakeStalcraftClient, make_sale
+
+
+def _sale(price: int, minute: int) -> dict:
+    return make_sale(price, time=f"2026-01-12T10:{minute:02d}:00Z")
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(tmp_path / "history.sqlite3")
+    store.client = FakeStalcraftClient()
+    yield store
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_refresh_fetches_only_new_sales(store):
+    upstream = store.client
+    upstream.history[("EU", "y1q9")] = [_sale(100 + m, m) for m in range(10)]
+
+    assert await store.refresh("eu", "y1q9") == 10
+    assert upstream.consumed == 10
+
+    # Two new sales: paging stops at the first already stored sale
+    upstream.consumed = 0
+    upstream.history[("EU", "y1q9")] += [_sale(200, 20), _sale(201, 21)]
+    assert await store.refresh("EU", "y1q9") == 2
+    assert upstream.consumed == 4  # 2 new + watermark sale + first older one
+
+    history = await store.get_history("EU", "y1q9", refresh=False)
+    assert history.stored == 12
+    assert history.watermark == datetime(2026, 1, 12, 10, 21, tzinfo=timezone.utc)
+    assert [sale.price for sale in history.prices[:3]] == [201, 200, 109]
+
+
+@pytest.mark.asyncio
+async def test_first_refresh_is_capped(store):
+    store.client.history[("EU", "y1q9")] = [_sale(100, m) for m in range(30)]
+
+    with patch.object(settings, "HISTORY_BACKFILL_MAX_RECORDS", 5):
+        assert await store.refresh("EU", "y1q9") == 5
+
+    history = await store.get_history("EU", "y1q9", refresh=False)
+    assert history.oldest == datetime(2026, 1, 12, 10, 25, tzinfo=timezone.utc)
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_watermark(store):
+    store.client.failing.add(("EU", "y1q9"))
+
+    with pytest.raises(StalcraftAPIError):
+        await store.refresh("EU", "y1q9")
+
+    history = await store.get_history("EU", "y1q9", refresh=False)
+    assert history.stored == 0
+    assert history.watermark is None
+
+
+@pytest.mark.asyncio
+async def test_query_by_period(store):
+    store.client.history[("EU", "y1q9")] = [_sale(100 + m, m) for m in range(10)]
+
+    history = await store.get_history(
+        "EU",
+        "y1q9",
+        since=datetime(2026, 1, 12, 10, 2, tzinfo=timezone.utc),
+        until=datetime(2026, 1, 12, 10, 5, tzinfo=timezone.utc),
+        limit=2,
+    )
+
+    assert history.total == 3
+    assert [sale.price for sale in history.prices] == [104, 103]
+
+
+def test_stored_history_endpoint(client, store):
+    store.client.history[("EU", "y1q9")] = [_sale(100, 1)]
+
+    with patch("app.api.v1.auction.history_store", store):
+        response = client.get("/api/v1/auction/eu/y1q9/history/stored")
+
+    assert response.status_code == 200
+    assert response.json()["total"] == 1
+    assert response.json()["prices"][0]["price"] == 100
@@ -0,0 +1,44 @@
+"""
+Tests for the shared HTTP connection pool
+"""
+
+import pytest
+from app.clients.http import HTTPClientPool
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_client_per_host():
+    """Same host -> same client, different host -> different client"""
+    pool = HTTPClientPool()
+
+    lots = pool.get("https://eapi.stalcraft.net/EU/auction/y1q9/lots")
+    history = pool.get("https://eapi.stalcraft.net/EU/auction/y1q9/history")
+    github = pool.get("https://api.github.com/repos/x/y/contents")
+
+    assert lots is history
+    assert lots is not github
+    assert sorted(pool.hosts) == [
+        "https://api.github.com",
+        "https://eapi.stalcraft.net",
+    ]
+
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_close_and_recreate():
+    """Closed pool lazily creates a fresh client on next use"""
+    pool = HTTPClientPool()
+    await pool.startup(["https://stalcraft.wiki"])
+
+    client = pool.get("https://stalcraft.wiki/api/available-lots")
+    await pool.close()
+
+    assert client.is_closed
+    assert pool.hosts == []
+
+    new_client = pool.get("https://stalcraft.wiki/api/available-lots")
+    assert new_client is not client
+    assert not new_client.is_closed
+
+    await pool.close()
@@ -0,0 +1,319 @@
+"""
+Tests for the items database index builder
+"""
+
+import asyncio
+import io
+import json
+import tarfile
+import httpx
+import pytest
+from unittest.mock import patch
+from app.config import settings
+from app.services.items_database_manager import (
+    ItemsDatabaseManager,
+    build_item_entry,
+    group_item_paths,
+)
+
+CATEGORIES = ["weapon/pistol", "weapon/device", "artefact"]
+
+TREE = [
+    "weapon/pistol/abc.json",
+    "weapon/device/det.json",
+    "artefact/electro/deep/x1.json",
+    "artefact/_variants/x1_v2.json",
+    "artefact/electro/_deprecated/old.json",
+    "artefact/readme.md",
+    "food/bread.json",
+]
+
+
+def _item(name: str) -> dict:
+    return {"name": {"type": "translation", "lines": {"ru": name, "en": name}}}
+
+
+def test_group_item_paths_at_any_depth():
+    grouped = group_item_paths(TREE, CATEGORIES)
+
+    assert grouped == {
+        "weapon/pistol": ["abc"],
+        "weapon/device": ["det"],
+        "artefact": ["electro/deep/x1"],
+    }
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = ItemsDatabaseManager()
+    manager.categories = CATEGORIES
+    manager.index_file = tmp_path / "search_index.json"
+    manager.metadata_file = tmp_path / "metadata.json"
+    return manager
+
+
+class FakeGitHub:
+    """Branch ref (with ETag), recursive trees and raw item files"""
+
+    def __init__(self, tree: dict[str, str]):
+        self.tree = tree  # {path: blob sha}
+        self.commit = "c1"
+        self.truncated: set[str] = set()  # tree paths answered truncated
+        self.requests: list[str] = []
+        self.in_flight = self.max_in_flight = 0
+
+    async def get(self, url: str, headers=None, **kwargs) -> httpx.Response:
+        self.requests.append(url)
+        request = httpx.Request("GET", url)
+        if "/git/ref/" in url:
+            etag = f'"{self.commit}"'
+            if (headers or {}).get("If-None-Match") == etag:
+                return httpx.Response(304, request=request)
+            body = {"object": {"sha": self.commit}}
+            return httpx.Response(
+                200, json=body, headers={"ETag": etag}, request=request
+            )
+        if "/git/trees/" in url:
+            # {ref}:{realm}/items[/{category}]
+            path = url.split(":", 2)[-1].split("/", 2)[2:]
+            prefix = f"{path[0]}/" if path else ""
+            tree = [
+                {"path": p.removeprefix(prefix), "type": "blob", "sha": s}
+                for p, s in self.tree.items()
+                if p.startswith(prefix)
+            ]
+            if not prefix:
+                tree.append({"path": "artefact/electro", "type": "tree", "sha": "t"})
+            body = {"tree": tree, "truncated": prefix.rstrip("/") in self.truncated}
+            return httpx.Response(200, json=body, request=request)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+        name = url.rsplit("/", 1)[-1].removesuffix(".json")
+        return httpx.Response(200, json=_item(name), request=request)
+
+    def downloads(self) -> list[str]:
+        return [url for url in self.requests if "raw.githubusercontent" in url]
+
+
+@pytest.fixture
+def github():
+    fake = FakeGitHub({path: "v1" for path in TREE})
+    with patch("app.services.items_database_manager.resilient_get", fake.get):
+        yield fake
+
+
+@pytest.mark.asyncio
+async def test_update_lists_realm_with_one_tree_request(manager, github):
+    await manager.update_database(["ru"])
+
+    tree_requests = [url for url in github.requests if "/git/trees/" in url]
+    assert tree_requests == [f"{manager.trees_base_url}/c1:ru/items"]
+    assert sorted(item["id"] for item in manager.search_index["ru"]) == [
+        "abc",
+        "det",
+        "electro/deep/x1",
+    ]
+    assert all("/c1/ru/items/" in url for url in github.downloads())
+    assert manager.index_file.exists()
+
+
+@pytest.mark.asyncio
+async def test_realms_and_categories_share_one_download_limit(manager, github):
+    with patch.object(settings, "ITEMS_DB_CONCURRENCY", 2):
+        await manager.update_database(["ru", "global"])
+
+    assert len(github.downloads()) == 6
+    assert github.max_in_flight == 2
+    assert [item["id"] for item in manager.search_index["global"]] == [
+        "abc",
+        "det",
+        "electro/deep/x1",
+    ]
+    assert manager.commit_sha == "c1"
+
+
+@pytest.mark.asyncio
+async def test_refresh_downloads_only_changed_blobs(manager, github):
+    await manager.update_database(["ru"])
+
+    # Unchanged head: one conditional request, answered with 304
+    github.requests.clear()
+    await manager.update_database(["ru"])
+    assert github.requests == [manager.ref_url]
+
+    # New commit: one file changed, one deleted, one added
+    github.commit = "c2"
+    github.tree["weapon/pistol/abc.json"] = "v2"
+    del github.tree["weapon/device/det.json"]
+    github.tree["weapon/device/new.json"] = "v1"
+    github.requests.clear()
+    await manager.update_database(["ru"])
+
+    assert sorted(url.rsplit("/", 1)[-1] for url in github.downloads()) == [
+        "abc.json",
+        "new.json",
+    ]
+    assert sorted(item["id"] for item in manager.search_index["ru"]) == [
+        "abc",
+        "electro/deep/x1",
+        "new",
+    ]
+    assert manager.commit_sha == "c2"
+
+    # Revision survives a restart
+    restored = ItemsDatabaseManager()
+    restored.index_file, restored.metadata_file = (
+        manager.index_file,
+        manager.metadata_file,
+    )
+    restored._load_from_cache()
+    assert restored.blobs["ru"]["weapon/pistol/abc.json"] == "v2"
+
+
+@pytest.mark.asyncio
+async def test_truncated_tree_is_listed_per_category(manager, github):
+    github.truncated = {""}
+    await manager.update_database(["ru"])
+
+    tree_requests = [url for url in github.requests if "/git/trees/" in url]
+    assert tree_requests[1:] == [
+        f"{manager.trees_base_url}/c1:ru/items/{category}" for category in CATEGORIES
+    ]
+    assert sorted(item["id"] for item in manager.search_index["ru"]) == [
+        "abc",
+        "det",
+        "electro/deep/x1",
+    ]
+    assert manager.commit_sha == "c1"
+
+
+@pytest.mark.asyncio
+async def test_truncated_category_keeps_index_and_revision(manager, github):
+    await manager.update_database(["ru"])
+
+    # The new commit cannot be listed in full: nothing is treated as deleted
+    github.commit = "c2"
+    github.truncated = {"", "artefact"}
+    del github.tree["weapon/device/det.json"]
+    await manager.update_database(["ru"])
+
+    assert sorted(item["id"] for item in manager.search_index["ru"]) == [
+        "abc",
+        "det",
+        "electro/deep/x1",
+    ]
+    assert "weapon/device/det.json" in manager.blobs["ru"]
+    assert manager.commit_sha == "c1"
+
+    # A complete listing later applies the deletion
+    github.truncated = set()
+    await manager.update_database(["ru"])
+    assert "det" not in [item["id"] for item in manager.search_index["ru"]]
+    assert manager.commit_sha == "c2"
+
+
+def _write_checkout(root) -> None:
+    for path in TREE:
+        file = root / "ru" / "items" / path
+        file.parent.mkdir(parents=True, exist_ok=True)
+        name = path.rsplit("/", 1)[-1].removesuffix(".json")
+        file.write_text(json.dumps(_item(name)), encoding="utf-8")
+    (root / "ru" / "items" / "weapon" / "pistol" / "broken.json").write_text("{")
+
+
+def _pack(root, archive) -> None:
+    with tarfile.open(archive, "w:gz") as tar:
+        tar.add(root / "ru", arcname="stalcraft-database-main/ru")
+        readme = b"# db"
+        info = tarfile.TarInfo("stalcraft-database-main/README.md")
+        info.size = len(readme)
+        tar.addfile(info, io.BytesIO(readme))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("source", ["checkout", "archive"])
+async def test_local_source_builds_same_index(manager, tmp_path, source):
+    root = tmp_path / "stalcraft-database"
+    _write_checkout(root)
+    if source == "archive":
+        _pack(root, tmp_path / "main.tar.gz")
+        root = tmp_path / "main.tar.gz"
+
+    with (
+        patch.object(settings, "ITEMS_DB_SOURCE", "local"),
+        patch.object(settings, "ITEMS_DB_LOCAL_PATH", str(root)),
+        patch.object(settings, "ITEMS_DB_WORKERS", 2),
+    ):
+        await manager.update_database(["ru", "global"])
+
+    items = manager.search_index["ru"]
+    # Category order of self.categories, unreadable files skipped
+    assert [(item["category"], item["id"]) for item in items] == [
+        ("weapon/pistol", "abc"),
+        ("weapon/device", "det"),
+        ("artefact", "electro/deep/x1"),
+    ]
+    assert items[2]["name_en"] == "x1"
+    assert "global" not in manager.search_index
+    assert manager.commit_sha is None and manager.index_file.exists()
+
+
+def _linear_search(items: list[dict], query: str, limit: int) -> list[str]:
+    query = query.lower()
+    return [
+        item["id"]
+        for item in items
+        if query in item["name_lower"]
+        or query in item["id"].lower()
+        or query in item["name_ru"]
+        or query in item["name_en"]
+    ][:limit]
+
+
+def test_search_matches_linear_substring_scan(manager):
+    names = [("Винтовка АК-74", "AK-74 Rifle"), ("Вино", "Wine"), ("Ключ", "Key")]
+    manager.search_index["ru"] = [
+        build_item_entry(
+            {"name": {"type": "translation", "lines": {"ru": ru, "en": en}}},
+            "ru",
+            "misc",
+            f"sub/ID{i}",
+            "",
+        )
+        for i, (ru, en) in enumerate(names * 5)
+    ]
+
+    for query in ["", "в", "ин", "вин", "винт", "AK-7", "e", "sub/id1", "id1", "zzz"]:
+        found = [item["id"] for item in manager.search(query, limit=7)]
+        assert found == _linear_search(manager.search_index["ru"], query, 7), query
+
+    # Replacing the realm list rebuilds the index
+    manager.search_index["ru"] = manager.search_index["ru"][:1]
+    assert [item["id"] for item in manager.search("вин")] == ["sub/ID0"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("corruption", ["not an archive", "broken gzip", "truncated"])
+async def test_unreadable_local_source_keeps_index(manager, tmp_path, corruption):
+    archive = tmp_path / "main.tar.gz"
+    if corruption == "truncated":
+        _write_checkout(tmp_path / "db")
+        _pack(tmp_path / "db", archive)
+        archive.write_bytes(archive.read_bytes()[:-100])
+    else:
+        archive.write_bytes(
+            b"not an archive" if corruption == "not an archive" else b"\x1f\x8bbroken"
+        )
+    manager.search_index["ru"] = [{"id": "kept"}]
+
+    with (
+        patch.object(settings, "ITEMS_DB_SOURCE", "local"),
+        patch.object(settings, "ITEMS_DB_LOCAL_PATH", str(archive)),
+        patch.object(settings, "ITEMS_DB_WORKERS", 1),
+    ):
+        await manager.update_database(["ru"])
+
+    assert manager.search_index["ru"] == [{"id": "kept"}]
+    assert not manager.index_file.exists()
@@ -0,0 +1,145 @@
+"""
+Tests for the SSE live lot feed
+"""
+
+import pytest
+from unittest.mock import patch
+from app.config import settings
+from app.core.exceptions import SubscriberLimitError
+from app.services.live_feed import LiveFeed
+from app.services.lot_diff import LotBookTracker
+from app.services.watchlist_poller import WatchlistPoller
+from tests.conftest import make_lot
+
+
+@pytest.fixture
+def feed():
+    with patch("app.services.watchlist_poller.lot_tracker", LotBookTracker()):
+        poller = WatchlistPoller()
+        yield LiveFeed(poller)
+
+
+def _drain(subscriber) -> list[str]:
+    messages = []
+    while not subscriber.queue.empty():
+        messages.append(subscriber.queue.get_nowait())
+    return messages
+
+
+def _event_names(messages: list[str]) -> list[str]:
+    return [
+        line.removeprefix("event: ")
+        for m in messages
+        for line in m.split("\n")
+        if line.startswith("event: ")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_subscribers_share_one_poll(fake_stalcraft, feed):
+    fake_stalcraft.lots[("EU", "y1q9")] = [make_lot(buyout=100)]
+    first = feed.subscribe("eu", "y1q9")
+    second = feed.subscribe("EU", "y1q9")
+
+    assert list(feed.poller.items) == [("EU", "y1q9")]
+
+    item = feed.poller.items[("EU", "y1q9")]
+    await feed.poller.poll(item)
+    assert fake_stalcraft.calls.count(("lots", "EU", "y1q9")) == 1
+    assert _event_names(_drain(first)) == ["snapshot"]
+
+    # Unchanged book: nothing is pushed
+    await feed.poller.poll(item)
+    assert _drain(first) == []
+
+    fake_stalcraft.lots[("EU", "y1q9")].append(make_lot(buyout=90))
+    await feed.poller.poll(item)
+    messages = _drain(second)
+    assert _event_names(messages) == ["snapshot", "snapshot", "events"]
+    assert '"type":"new"' in messages[-1]
+
+    # Late joiner gets the current book immediately
+    late = feed.subscribe("EU", "y1q9")
+    assert '"buyoutPrice":90' in _drain(late)[0]
+
+
+@pytest.mark.asyncio
+async def test_failed_poll_is_pushed_as_error(fake_stalcraft, feed):
+    fake_stalcraft.failing.add(("EU", "y1q9"))
+    subscriber = feed.subscribe("EU", "y1q9")
+    item = feed.poller.items[("EU", "y1q9")]
+
+    await feed.poller.poll(item)
+    assert _event_names(_drain(subscriber)) == ["error"]
+    # Joining while upstream is down: the error right away
+    late = feed.subscribe("EU", "y1q9")
+    assert _event_names(_drain(late)) == ["error"]
+
+    # Recovered with an unchanged (empty) book: a snapshot clears the error
+    fake_stalcraft.failing.clear()
+    await feed.poller.poll(item)
+    assert _event_names(_drain(subscriber)) == ["snapshot"]
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_is_evicted(fake_stalcraft, feed):
+    fake_stalcraft.lots[("EU", "y1q9")] = []
+    with patch.object(settings, "LIVE_SUBSCRIBER_BUFFER", 2):
+        slow = feed.subscribe("EU", "y1q9")
+        fast = feed.subscribe("EU", "y1q9")
+    item = feed.poller.items[("EU", "y1q9")]
+
+    await feed.poller.poll(item)
+    for buyout in (100, 200):
+        _drain(fast)
+        fake_stalcraft.lots[("EU", "y1q9")].append(make_lot(buyout=buyout))
+        await feed.poller.poll(item)
+
+    assert slow.evicted and not fast.evicted
+    assert await slow.next_message(timeout=0) is None
+    assert feed.evictions == 1
+    assert feed.stats()["subscribers"] == 1
+
+
+def test_last_unsubscribe_releases_the_item(feed):
+    feed.poller.add("EU", "keep")
+    own = feed.subscribe("EU", "y1q9")
+    shared = feed.subscribe("EU", "keep")
+
+    feed.unsubscribe(own)
+    feed.unsubscribe(shared)
+
+    # Items added by someone else stay in the watchlist
+    assert list(feed.poller.items) == [("EU", "keep")]
+
+
+def test_item_shared_with_alerts_outlives_subscribers(feed):
+    feed.poller.add("EU", "y1q9", owner="alerts")
+    subscriber = feed.subscribe("EU", "y1q9")
+
+    feed.unsubscribe(subscriber)
+    assert ("EU", "y1q9") in feed.poller.items
+
+    feed.poller.release("EU", "y1q9", owner="alerts")
+    assert feed.poller.items == {}
+
+
+def test_subscriber_limit(feed):
+    with patch.object(settings, "LIVE_MAX_SUBSCRIBERS", 1):
+        feed.subscribe("EU", "y1q9")
+        with pytest.raises(SubscriberLimitError):
+            feed.subscribe("EU", "other")
+
+
+@pytest.mark.asyncio
+async def test_stream_endpoint(client, fake_stalcraft, feed):
+    fake_stalcraft.lots[("EU", "y1q9")] = [make_lot(buyout=777)]
+    await feed.poller.poll(feed.poller.add("EU", "y1q9"))
+
+    with patch("app.api.v1.auction.live_feed", feed):
+        response = client.get("/api/v1/auction/eu/y1q9/stream?limit=1")
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.startswith("event: snapshot\ndata: ")
+    assert '"buyoutPrice":777' in response.text
+    assert feed.stats()["subscribers"] == 0
@@ -0,0 +1,122 @@
+"""
+Tests for lot-book snapshot diffing
+"""
+
+from datetime import datetime, timezone
+from unittest.mock import patch
+from app.models.auction import AuctionLotsResponse
+from app.services.lot_diff import LotBookTracker
+from tests.conftest import make_lot
+
+NOW = datetime(2026, 1, 12, 12, 0, tzinfo=timezone.utc)
+
+
+def _lot(hour: int, buyout: int = 200, end: str = "2026-01-13T10:00:00Z", **fields):
+    return make_lot(
+        buyout=buyout, startTime=f"2026-01-12T{hour:02d}:00:00Z", endTime=end, **fields
+    )
+
+
+def _book(lots: list[dict], total: int | None = None) -> AuctionLotsResponse:
+    return AuctionLotsResponse(total=len(lots) if total is None else total, lots=lots)
+
+
+def _types(events) -> list[tuple[str, int]]:
+    return sorted((event.type, event.buyout_price) for event in events)
+
+
+def test_first_snapshot_has_no_events():
+    tracker = LotBookTracker()
+    assert tracker.update("eu", "y1q9", _book([_lot(1)]), NOW) == []
+    assert tracker.snapshot("EU", "y1q9").covered_from is None
+
+
+def test_diff_detects_new_sold_expired_and_price_changes():
+    tracker = LotBookTracker()
+    tracker.update(
+        "EU",
+        "y1q9",
+        _book(
+            [
+                _lot(1, buyout=100),
+                _lot(2, buyout=200, currentPrice=150),
+                _lot(3, buyout=300),
+                _lot(4, buyout=400, end="2026-01-12T11:00:00Z"),
+            ]
+        ),
+        NOW,
+    )
+
+    events = tracker.update(
+        "EU",
+        "y1q9",
+        _book(
+            [
+                _lot(1, buyout=100),
+                _lot(2, buyout=200, currentPrice=180),
+                _lot(5, buyout=500),
+            ]
+        ),
+        NOW,
+    )
+
+    assert _types(events) == [
+        ("expired", 400),
+        ("new", 500),
+        ("price_changed", 200),
+        ("sold", 300),
+    ]
+    changed = next(e for e in events if e.type == "price_changed")
+    assert (changed.previous_price, changed.price) == (150, 180)
+    assert tracker.recent_events("eu", "y1q9", limit=2) == events[-2:][::-1]
+
+
+def test_identical_lots_are_matched_one_to_one():
+    tracker = LotBookTracker()
+    tracker.update("EU", "y1q9", _book([_lot(1), _lot(1)]), NOW)
+
+    events = tracker.update("EU", "y1q9", _book([_lot(1)]), NOW)
+
+    assert _types(events) == [("sold", 200)]
+
+
+def test_partial_page_does_not_report_lots_outside_it():
+    tracker = LotBookTracker()
+    # Page of the 2 newest lots out of 4 (time_created desc)
+    tracker.update("EU", "y1q9", _book([_lot(9), _lot(8)], total=4), NOW)
+
+    # Lot 9 sold: lot 7 shifts into the page but is not new
+    events = tracker.update("EU", "y1q9", _book([_lot(8), _lot(7)], total=3), NOW)
+    assert _types(events) == [("sold", 200)]
+    assert events[0].start_time.hour == 9
+
+    # A lot that falls out of the page is not reported as removed
+    events = tracker.update(
+        "EU", "y1q9", _book([_lot(10, buyout=1), _lot(8)], total=4), NOW
+    )
+    assert _types(events) == [("new", 1)]
+
+
+def test_listeners_receive_events():
+    tracker = LotBookTracker()
+    received = []
+    tracker.add_listener(received.extend)
+
+    tracker.update("EU", "y1q9", _book([]), NOW)
+    tracker.update("EU", "y1q9", _book([_lot(1)]), NOW)
+    tracker.remove_listener(received.extend)
+    tracker.update("EU", "y1q9", _book([]), NOW)
+
+    assert [event.type for event in received] == ["new"]
+
+
+def test_events_endpoint(client):
+    tracker = LotBookTracker()
+    tracker.update("EU", "y1q9", _book([]), NOW)
+    tracker.update("EU", "y1q9", _book([_lot(1)]), NOW)
+
+    with patch("app.api.v1.auction.lot_tracker", tracker):
+        response = client.get("/api/v1/auction/eu/y1q9/events")
+
+    assert response.status_code == 200
+    assert [event["type"] for event in response.json()] == ["new"]
@@ -0,0 +1,97 @@
+"""
+Tests for auto-paginating lot / history iterators
+"""
+
+import asyncio
+import httpx
+import pytest
+from unittest.mock import patch
+from app.clients.http import http_pool
+from app.clients.stalcraft import StalcraftAPIClient
+from app.config import Settings
+from app.models.auction import AuctionLot, AuctionPriceHistory
+
+TOTAL = 450
+
+
+def make_lot(index: int) -> dict:
+    return {
+        "itemId": "y1q9",
+        "amount": 1,
+        "startPrice": index,
+        "buyoutPrice": index,
+        "startTime": "2026-01-12T10:00:00Z",
+        "endTime": "2026-01-13T10:00:00Z",
+    }
+
+
+def paged_upstream():
+    """Official-API-like upstream honouring limit/offset"""
+    state = {"in_flight": 0, "max_in_flight": 0, "requests": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        state["requests"] += 1
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+
+        offset = int(request.url.params["offset"])
+        limit = int(request.url.params["limit"])
+        indexes = range(offset, min(offset + limit, TOTAL))
+        if request.url.path.endswith("/lots"):
+            return httpx.Response(
+                200, json={"total": TOTAL, "lots": [make_lot(i) for i in indexes]}
+            )
+        return httpx.Response(
+            200,
+            json={
+                "total": TOTAL,
+                "prices": [
+                    {"amount": 1, "price": i, "time": "2026-01-12T10:00:00Z"}
+                    for i in indexes
+                ],
+            },
+        )
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler)), state
+
+
+def official_settings() -> Settings:
+    return Settings(API_SOURCE="demo", UPSTREAM_RATE_LIMIT_RPS=1000.0)
+
+
+@pytest.mark.asyncio
+async def test_iter_auction_lots_walks_whole_book_in_order():
+    mock_client, state = paged_upstream()
+
+    with patch("app.clients.stalcraft.settings", official_settings()), patch.object(
+        http_pool, "get", return_value=mock_client
+    ):
+        client = StalcraftAPIClient()
+        lots = [lot async for lot in client.iter_auction_lots("EU", "y1q9", prefetch=2)]
+
+    assert all(isinstance(lot, AuctionLot) for lot in lots)
+    assert [lot.startPrice for lot in lots] == list(range(TOTAL))
+    assert state["requests"] == 3  # 0, 200, 400
+    assert state["max_in_flight"] <= 2
+    await mock_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_iter_auction_history_can_stop_early():
+    mock_client, state = paged_upstream()
+
+    with patch("app.clients.stalcraft.settings", official_settings()), patch.object(
+        http_pool, "get", return_value=mock_client
+    ):
+        client = StalcraftAPIClient()
+        sales = []
+        async for sale in client.iter_auction_history("EU", "y1q9", page_size=100):
+            assert isinstance(sale, AuctionPriceHistory)
+            sales.append(sale)
+            if len(sales) == 150:
+                break
+
+    assert [sale.price for sale in sales] == list(range(150))
+    await mock_client.aclose()
@@ -0,0 +1,137 @@
+"""
+Tests for the upstream token-bucket rate limiter
+"""
+
+import asyncio
+import heapq
+import httpx
+import pytest
+from unittest.mock import patch
+from app.clients.rate_limit import (
+    Priority,
+    TokenBucket,
+    observe_upstream_attempts,
+    request_priority,
+    retry_after_seconds,
+)
+from app.clients.http import http_pool
+from app.clients.stalcraft import StalcraftAPIClient
+from app.config import Settings
+
+
+@pytest.mark.asyncio
+async def test_burst_is_served_immediately():
+    bucket = TokenBucket(rate=1, burst=3)
+
+    for _ in range(3):
+        await asyncio.wait_for(bucket.acquire(), timeout=0.1)
+
+    assert bucket.waited == 0
+    assert bucket.acquired == 3
+
+
+@pytest.mark.asyncio
+async def test_interactive_requests_go_before_background():
+    bucket = TokenBucket(rate=200, burst=1)
+    await bucket.acquire()  # drain the bucket
+    order = []
+
+    async def worker(name: str, priority: Priority):
+        with request_priority(priority):
+            await bucket.acquire()
+        order.append(name)
+
+    tasks = [
+        asyncio.create_task(worker("bg1", Priority.BACKGROUND)),
+        asyncio.create_task(worker("bg2", Priority.BACKGROUND)),
+        asyncio.create_task(worker("ui", Priority.INTERACTIVE)),
+    ]
+    await asyncio.wait_for(asyncio.gather(*tasks), timeout=1)
+
+    assert order == ["ui", "bg1", "bg2"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_is_skipped():
+    bucket = TokenBucket(rate=100, burst=1)
+    await bucket.acquire()
+
+    cancelled = asyncio.create_task(bucket.acquire())
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    await asyncio.wait_for(bucket.acquire(), timeout=1)
+    assert bucket.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_token_granted_to_cancelled_waiter_is_returned():
+    bucket = TokenBucket(rate=0.001, burst=1)
+    await bucket.acquire()
+
+    waiter = asyncio.create_task(bucket.acquire())
+    await asyncio.sleep(0)
+
+    # The dispatcher grants the token, the caller times out before waking up
+    _, _, future = heapq.heappop(bucket._waiters)
+    future.set_result(None)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert bucket.tokens >= 1
+    await asyncio.wait_for(bucket.acquire(), timeout=1)
+    await bucket.close()
+
+
+def test_exhausted_remaining_header_pauses_bucket():
+    bucket = TokenBucket(rate=10, burst=10)
+    bucket.update_from_headers({"x-ratelimit-remaining": "0", "x-ratelimit-reset": "5"})
+
+    stats = bucket.stats()
+    assert stats["tokens"] == 0
+    assert 4 < stats["paused_for"] <= 5
+
+
+def test_remaining_header_caps_tokens():
+    bucket = TokenBucket(rate=10, burst=10)
+    bucket.update_from_headers({"x-ratelimit-remaining": "2"})
+    assert bucket.tokens == 2
+
+
+def test_retry_after_seconds():
+    assert retry_after_seconds({"retry-after": "3"}) == 3
+    assert retry_after_seconds({}, default=1.5) == 1.5
+
+
+@pytest.mark.asyncio
+async def test_client_waits_and_retries_on_429():
+    """429 is retried after Retry-After instead of surfacing as an error"""
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "0.01"}),
+        httpx.Response(200, json={"total": 0, "lots": []}),
+    ]
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return responses.pop(0)
+
+    mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    test_settings = Settings(
+        API_SOURCE="demo",
+        UPSTREAM_RATE_LIMIT_RPS=100.0,
+        UPSTREAM_RATE_LIMIT_MAX_WAIT=1.0,
+    )
+
+    with patch("app.clients.stalcraft.settings", test_settings), patch.object(
+        http_pool, "get", return_value=mock_client
+    ):
+        client = StalcraftAPIClient()
+        attempts = []
+        with observe_upstream_attempts(lambda: attempts.append(1)):
+            data = await client.get_auction_lots("EU", "y1q9")
+
+    assert data == {"total": 0, "lots": []}
+    assert responses == []
+    assert len(attempts) == 2
+    await mock_client.aclose()
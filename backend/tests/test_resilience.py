@@ -0,0 +1,119 @@
+"""
+Tests for upstream retries and per-host circuit breakers
+"""
+
+import httpx
+import pytest
+from unittest.mock import patch
+from app.clients.http import http_pool
+from app.clients.resilience import (
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    CircuitState,
+    backoff_delay,
+    resilient_get,
+)
+from app.core.exceptions import CircuitOpenError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_breaker_opens_after_threshold_and_half_opens():
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        "host", failure_threshold=3, recovery_timeout=10, clock=clock
+    )
+
+    for _ in range(3):
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request()
+
+    clock.now = 10
+    assert breaker.allow_request()  # probe
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert not breaker.allow_request()  # only one probe at a time
+
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.allow_request()
+
+
+def test_failed_probe_reopens_circuit():
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        "host", failure_threshold=1, recovery_timeout=5, clock=clock
+    )
+
+    breaker.record_failure()
+    clock.now = 5
+    assert breaker.allow_request()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.OPEN
+    clock.now = 9
+    assert not breaker.allow_request()
+
+
+def test_backoff_delay_is_bounded():
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt, base=0.2, max_delay=2.0) <= 2.0
+
+
+def _mock_upstream(statuses: list[int]):
+    calls = {"count": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls["count"] += 1
+        return httpx.Response(statuses.pop(0))
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler)), calls
+
+
+@pytest.mark.asyncio
+async def test_resilient_get_retries_5xx():
+    mock_client, calls = _mock_upstream([503, 502, 200])
+
+    with patch("app.clients.resilience.settings") as mock_settings, patch(
+        "app.clients.resilience.circuit_breakers", CircuitBreakerRegistry()
+    ), patch.object(http_pool, "get", return_value=mock_client):
+        mock_settings.UPSTREAM_RETRY_ATTEMPTS = 2
+        mock_settings.UPSTREAM_RETRY_BASE_DELAY = 0.001
+        mock_settings.UPSTREAM_RETRY_MAX_DELAY = 0.001
+        mock_settings.CIRCUIT_FAILURE_THRESHOLD = 5
+        mock_settings.CIRCUIT_RECOVERY_TIMEOUT = 30
+
+        response = await resilient_get("https://eapi.stalcraft.net/EU/auction/x/lots")
+
+    assert response.status_code == 200
+    assert calls["count"] == 3
+    await mock_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_resilient_get_fails_fast_when_circuit_open():
+    mock_client, calls = _mock_upstream([500, 500, 500])
+
+    with patch("app.clients.resilience.settings") as mock_settings, patch(
+        "app.clients.resilience.circuit_breakers", CircuitBreakerRegistry()
+    ), patch.object(http_pool, "get", return_value=mock_client):
+        mock_settings.UPSTREAM_RETRY_ATTEMPTS = 0
+        mock_settings.CIRCUIT_FAILURE_THRESHOLD = 2
+        mock_settings.CIRCUIT_RECOVERY_TIMEOUT = 30
+
+        url = "https://stalcraft.wiki/api/available-lots"
+        assert (await resilient_get(url)).status_code == 500
+        assert (await resilient_get(url)).status_code == 500
+        with pytest.raises(CircuitOpenError):
+            await resilient_get(url)
+
+    assert calls["count"] == 2
+    await mock_client.aclose()
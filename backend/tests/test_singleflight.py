@@ -0,0 +1,189 @@
+"""
+Tests for single-flight coalescing of identical in-flight requests
+"""
+
+import asyncio
+import httpx
+import pytest
+from unittest.mock import patch
+from app.clients.http import http_pool
+from app.clients.rate_limit import (
+    Priority,
+    TokenBucket,
+    current_priority,
+    request_priority,
+)
+from app.config import Settings
+from app.clients.stalcraft import StalcraftAPIClient
+from app.core.exceptions import StalcraftAPIError
+from app.utils.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"total": 1}
+
+    results = await asyncio.gather(*[flight.do("k", fetch) for _ in range(50)])
+
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+    assert flight.coalesced == 49
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_error_propagates_to_every_waiter():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise StalcraftAPIError("boom")
+
+    results = await asyncio.gather(
+        *[flight.do("k", fetch) for _ in range(3)], return_exceptions=True
+    )
+
+    assert all(isinstance(result, StalcraftAPIError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelling_one_waiter_keeps_call_for_others():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(flight.do("k", fetch))
+    second = asyncio.create_task(flight.do("k", fetch))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+@pytest.mark.asyncio
+async def test_cancelling_all_waiters_cancels_call():
+    flight = SingleFlight()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def fetch():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    waiter = asyncio.create_task(flight.do("k", fetch))
+    await started.wait()
+    waiter.cancel()
+
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_interactive_joiner_raises_priority_of_queued_call():
+    bucket = TokenBucket(rate=200, burst=1)
+    await bucket.acquire()
+    flight = SingleFlight()
+    order = []
+
+    async def fetch():
+        await bucket.acquire()
+        order.append("shared")
+        return 1
+
+    async def other_background():
+        with request_priority(Priority.BACKGROUND):
+            await bucket.acquire()
+        order.append("bg")
+
+    async def background_flight():
+        with request_priority(Priority.BACKGROUND):
+            return await flight.do("k", fetch)
+
+    other = asyncio.create_task(other_background())
+    await asyncio.sleep(0)
+    started = asyncio.create_task(background_flight())
+    for _ in range(3):
+        await asyncio.sleep(0)
+    assert bucket.queued == 2
+
+    # Interactive request joins the background flight queued behind "bg"
+    joined = await asyncio.wait_for(flight.do("k", fetch), timeout=1)
+    await asyncio.wait_for(asyncio.gather(other, started), timeout=1)
+
+    assert joined == 1
+    assert order == ["shared", "bg"]
+    await bucket.close()
+
+
+@pytest.mark.asyncio
+async def test_joiner_priority_does_not_leak_to_starter_context():
+    flight = SingleFlight()
+    seen = []
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return 1
+
+    async def background_flight():
+        with request_priority(Priority.BACKGROUND):
+            await flight.do("k", fetch)
+            seen.append(current_priority())
+
+    started = asyncio.create_task(background_flight())
+    await asyncio.sleep(0)
+    await flight.do("k", fetch)
+    await started
+
+    assert seen == [Priority.BACKGROUND]
+
+
+@pytest.mark.asyncio
+async def test_wiki_requests_coalesce_across_pagination_params():
+    """Wiki API ignores limit/offset, so different pages share one upstream call"""
+    upstream_calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal upstream_calls
+        upstream_calls += 1
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"total": 0, "lots": []})
+
+    mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    test_settings = Settings(
+        API_SOURCE="wiki",
+        STALCRAFT_WIKI_API_KEY="key",
+        UPSTREAM_RATE_LIMIT_RPS=100.0,
+    )
+
+    with patch("app.clients.stalcraft.settings", test_settings), patch.object(
+        http_pool, "get", return_value=mock_client
+    ):
+        client = StalcraftAPIClient()
+        await asyncio.gather(
+            client.get_auction_lots("EU", "y1q9", limit=20, offset=0),
+            client.get_auction_lots("EU", "y1q9", limit=20, offset=20),
+            client.get_auction_lots("EU", "y1q9", limit=50, sort="buyout_price"),
+        )
+
+    assert upstream_calls == 1
+    await mock_client.aclose()
@@ -0,0 +1,122 @@
+"""
+Tests for the vectorized price statistics
+"""
+
+import numpy as np
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import patch
+from app.config import settings
+from app.services.history_store import HistoryStore
+from app.services.stats_service import (
+    distribution,
+    stats_service,
+    trimmed_mean,
+    unit_prices,
+)
+from tests.conftest import FakeStalcraftClient, make_lot, make_sale
+
+
+def test_unit_prices_handles_zero_amount():
+    prices = np.array([100, 300, 50])
+    amounts = np.array([1, 3, 0])
+    assert unit_prices(prices, amounts).tolist() == [100.0, 100.0, 50.0]
+
+
+def test_trimmed_mean_drops_outliers():
+    values = np.array([1.0, 10, 10, 10, 10, 10, 10, 10, 10, 1000])
+    assert trimmed_mean(values, 0.1) == 10
+    assert trimmed_mean(values, 0.0) == pytest.approx(values.mean())
+
+
+def test_distribution_summary():
+    values = np.arange(1, 101, dtype=np.float64)
+    result = distribution(values, [10, 90], trim=0.05, bins=4)
+
+    assert result.count == 100
+    assert result.median == 50.5
+    assert result.percentiles == {
+        "p10": pytest.approx(10.9),
+        "p90": pytest.approx(90.1),
+    }
+    assert result.histogram == [25, 25, 25, 25]
+    assert len(result.bin_edges) == 5
+    assert distribution(np.array([]), [50], 0.1, 10).count == 0
+
+
+@pytest.fixture
+def stats_env(tmp_path):
+    fake = FakeStalcraftClient()
+    store = HistoryStore(tmp_path / "history.sqlite3")
+    store.client = fake
+    stats_service._lot_cache.clear()
+    with patch.object(stats_service, "client", fake), patch.object(
+        stats_service, "history", store
+    ):
+        yield fake
+    store.close()
+
+
+def test_stats_endpoint(client, stats_env):
+    stats_env.history[("EU", "y1q9")] = [
+        make_sale(100, time="2026-01-10T10:00:00Z"),  # outside the window
+        make_sale(200, amount=2, time="2026-01-12T10:00:00Z"),
+        make_sale(300, time="2026-01-12T11:00:00Z"),
+    ]
+    stats_env.lots[("EU", "y1q9")] = [
+        make_lot(buyout=500, amount=5),
+        make_lot(buyout=0),
+    ]
+
+    response = client.get(
+        "/api/v1/auction/eu/y1q9/stats",
+        params={"since": "2026-01-11T00:00:00Z", "percentiles": [50]},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["sales"]["count"] == 2
+    assert data["sales"]["median"] == 200  # unit prices 100 and 300
+    assert data["sales"]["percentiles"] == {"p50": 200}
+    assert data["sales_volume"] == 3
+    assert data["sales_vwap"] == pytest.approx(500 / 3)
+    assert data["lots"]["count"] == 1  # lots without buyout are skipped
+    assert data["lots"]["min"] == 100
+
+
+def test_stats_rejects_bad_percentiles(client, stats_env):
+    response = client.get("/api/v1/auction/eu/y1q9/stats?percentiles=150")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_stats_default_window(stats_env):
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    stats_env.history[("EU", "y1q9")] = [
+        make_sale(100, time="2020-01-01T00:00:00Z"),
+        make_sale(200, time=now),
+    ]
+
+    result = await stats_service.get_stats("eu", "y1q9")
+
+    assert result.sales.count == 1
+    assert result.lots.count == 0
+
+
+@pytest.mark.asyncio
+async def test_lot_distribution_uses_cheapest_lots_and_is_memoized(stats_env):
+    stats_env.lots[("EU", "y1q9")] = [
+        make_lot(buyout=900),  # newest, but the most expensive
+        make_lot(buyout=500),
+        make_lot(buyout=600, amount=3),  # cheapest per unit
+        make_lot(buyout=300),
+    ]
+
+    with patch.object(settings, "STATS_MAX_LOTS", 3):
+        first = await stats_service.get_stats("eu", "y1q9")
+        second = await stats_service.get_stats("EU", "y1q9")
+
+    assert first.lots.count == 3
+    assert (first.lots.min, first.lots.max) == (200, 500)
+    assert second.lots == first.lots
+    assert stats_env.calls.count(("lots", "EU", "y1q9")) == 1
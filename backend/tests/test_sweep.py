@@ -0,0 +1,106 @@
+"""
+Tests for market-wide sweeps
+"""
+
+import pytest
+from unittest.mock import patch
+from app.config import settings
+from app.services.auction_service import auction_service
+from app.services.items_database_manager import items_db_manager
+from app.services.market_sweep import MarketSweeper
+from tests.conftest import make_lot
+
+INDEX = {
+    "global": [{"id": f"item{i}", "name": f"Item {i}"} for i in range(10)],
+    "ru": [{"id": "weapon/y1q9", "name": "Винтовка"}],
+}
+
+
+@pytest.fixture(autouse=True)
+def search_index():
+    with patch.object(items_db_manager, "search_index", INDEX):
+        yield
+
+
+@pytest.mark.asyncio
+async def test_sweep_refreshes_every_item_of_the_realm(fake_stalcraft):
+    fake_stalcraft.lots[("RU", "y1q9")] = [make_lot(buyout=300, amount=3)]
+    sweeper = MarketSweeper()
+
+    job = sweeper.start_sweep("ru")
+    await job.task
+
+    status = job.status(include_items=True)
+    assert (status.state, status.realm, status.progress) == ("completed", "ru", 1.0)
+    assert status.items[0].min_buyout_price == 100
+    assert status.latency_ms.max is not None
+
+    # The /lots default query is served from the primed cache
+    await auction_service.get_lots("RU", "y1q9")
+    assert len(fake_stalcraft.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_sweep_stops_at_request_budget_and_records_failures(fake_stalcraft):
+    fake_stalcraft.failing.add(("EU", "item1"))
+    sweeper = MarketSweeper()
+
+    job = sweeper.start_sweep("EU", request_budget=4)
+    await job.task
+
+    status = job.status()
+    assert status.state == "budget_exhausted"
+    assert (status.requests_used, status.done_items, status.failed_items) == (4, 4, 1)
+    assert len(fake_stalcraft.calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_budget_counts_upstream_retries(fake_stalcraft):
+    # item0 takes three attempts (two retries), the rest one each
+    fake_stalcraft.attempts[("EU", "item0")] = 3
+    fake_stalcraft.queue_delay = 0.05
+    sweeper = MarketSweeper()
+
+    with patch.object(settings, "SWEEP_CONCURRENCY", 1):
+        job = sweeper.start_sweep("EU", request_budget=4)
+        await job.task
+
+    status = job.status(include_items=True)
+    assert (status.state, status.requests_used, status.done_items) == (
+        "budget_exhausted",
+        4,
+        2,
+    )
+    # Waiting for a rate-limit token is not request latency
+    assert status.latency_ms.max < 40
+
+
+@pytest.mark.asyncio
+async def test_sweep_stops_at_deadline(fake_stalcraft):
+    job = MarketSweeper().start_sweep("EU", time_window=0)
+    await job.task
+
+    assert job.status().state == "deadline_reached"
+    assert fake_stalcraft.calls == []
+
+
+@pytest.mark.asyncio
+async def test_running_sweep_is_reused_and_cancellable(fake_stalcraft):
+    sweeper = MarketSweeper()
+    job = sweeper.start_sweep("EU")
+
+    assert sweeper.start_sweep("eu") is job
+    await sweeper.cancel(job.id)
+
+    assert job.state == "cancelled"
+    assert job.finished_at is not None
+
+
+def test_sweep_endpoints(client):
+    sweeper = MarketSweeper()
+
+    with patch("app.api.v1.sweeps.market_sweeper", sweeper):
+        assert client.get("/api/v1/sweeps").json() == []
+        assert client.get("/api/v1/sweeps/unknown").status_code == 404
+        assert client.post("/api/v1/sweeps/unknown/cancel").status_code == 404
+        assert client.post("/api/v1/sweeps/xx").status_code == 422
@@ -0,0 +1,108 @@
+"""
+Tests for the background watchlist poller
+"""
+
+import asyncio
+import pytest
+from unittest.mock import patch
+from app.config import settings
+from app.core.exceptions import InvalidRegionError
+from app.services.lot_diff import LotBookTracker
+from app.services.watchlist_poller import WatchlistPoller, parse_watchlist_entry
+from tests.conftest import make_lot
+
+
+@pytest.fixture(autouse=True)
+def tracker():
+    """Fresh lot-book snapshots for every poller created in a test"""
+    with patch("app.services.watchlist_poller.lot_tracker", LotBookTracker()) as t:
+        yield t
+
+
+@pytest.fixture
+def intervals():
+    with patch.object(settings, "WATCHLIST_MIN_INTERVAL", 10.0), patch.object(
+        settings, "WATCHLIST_MAX_INTERVAL", 40.0
+    ), patch.object(settings, "WATCHLIST_BACKOFF_FACTOR", 2.0):
+        yield
+
+
+def test_parse_watchlist_entry():
+    assert parse_watchlist_entry("eu: y1q9") == ("EU", "y1q9")
+    with pytest.raises(ValueError):
+        parse_watchlist_entry("y1q9")
+
+
+def test_add_rejects_unknown_region():
+    with pytest.raises(InvalidRegionError):
+        WatchlistPoller().add("xx", "y1q9")
+
+
+@pytest.mark.asyncio
+async def test_interval_adapts_to_lot_book_changes(fake_stalcraft, intervals):
+    poller = WatchlistPoller()
+    item = poller.add("EU", "y1q9")
+    fake_stalcraft.lots[("EU", "y1q9")] = [make_lot(buyout=100)]
+
+    # Unchanged book: interval grows up to the maximum
+    for expected in (20.0, 40.0, 40.0):
+        await poller.poll(item)
+        assert item.interval == expected
+    assert item.changes == 0
+
+    # Book changed: interval shrinks down to the minimum
+    fake_stalcraft.lots[("EU", "y1q9")].append(make_lot(buyout=90))
+    await poller.poll(item)
+    assert item.interval == 20.0
+    assert item.changes == 1
+
+    fake_stalcraft.failing.add(("EU", "y1q9"))
+    await poller.poll(item)
+    assert item.failures == 1
+    assert item.interval == 40.0
+
+
+def test_poll_warms_lots_cache(client, fake_stalcraft, intervals):
+    poller = WatchlistPoller()
+    fake_stalcraft.lots[("EU", "y1q9")] = [make_lot(buyout=100)]
+
+    asyncio.run(poller.poll(poller.add("eu", "y1q9")))
+    response = client.get("/api/v1/auction/eu/y1q9/lots")
+
+    assert response.status_code == 200
+    assert response.json()["lots"][0]["buyoutPrice"] == 100
+    # The lots call is the poll; the history call is the background refresh
+    assert fake_stalcraft.calls == [("lots", "EU", "y1q9"), ("history", "EU", "y1q9")]
+    assert poller.latest("EU", "y1q9").total == 1
+
+
+@pytest.mark.asyncio
+async def test_scheduler_polls_watchlist_within_budget(fake_stalcraft):
+    with patch.object(settings, "WATCHLIST", ["EU:a", "EU:b", "EU:c"]), patch.object(
+        settings, "WATCHLIST_MIN_INTERVAL", 0.01
+    ), patch.object(settings, "WATCHLIST_REQUEST_BUDGET", 600):
+        poller = WatchlistPoller()
+        poller.start()
+        await asyncio.sleep(0.15)
+        await poller.stop()
+
+    # 10 requests/second with burst 1: ~2 polls in 150 ms, never all at once
+    assert 1 <= len(fake_stalcraft.calls) <= 3
+    assert not poller.stats()["running"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_keeps_polling_a_single_item(fake_stalcraft):
+    # The only item is in flight while the scheduler waits: the finished poll
+    # must wake it up, not a later change of the watchlist
+    with patch.object(settings, "WATCHLIST", ["EU:a"]), patch.object(
+        settings, "WATCHLIST_MIN_INTERVAL", 0.02
+    ), patch.object(settings, "WATCHLIST_MAX_INTERVAL", 0.02), patch.object(
+        settings, "WATCHLIST_REQUEST_BUDGET", 6000
+    ):
+        poller = WatchlistPoller()
+        poller.start()
+        await asyncio.sleep(0.3)
+        await poller.stop()
+
+    assert len(fake_stalcraft.calls) >= 5
@@ -0,0 +1,105 @@
+"""
+Tests for wiki full-book caching with local sort and pagination
+"""
+
+import httpx
+import pytest
+from unittest.mock import patch
+from app.clients.http import http_pool
+from app.clients.stalcraft import StalcraftAPIClient
+from app.clients.wiki_book import HistoryBook, LotBook
+from app.config import Settings
+
+
+def make_lot(hour: int, buyout: int, current: int | None = None) -> dict:
+    return {
+        "itemId": "y1q9",
+        "amount": 1,
+        "startPrice": 100,
+        "currentPrice": current,
+        "buyoutPrice": buyout,
+        "startTime": f"2026-01-12T{hour:02d}:00:00Z",
+        "endTime": f"2026-01-13T{23 - hour:02d}:00:00Z",
+        "additional": {"qlt": hour},
+    }
+
+
+LOTS = [make_lot(1, 500), make_lot(3, 100, 150), make_lot(2, 300)]
+
+
+def buyouts(page: dict) -> list[int]:
+    return [lot["buyoutPrice"] for lot in page["lots"]]
+
+
+def test_lot_book_sorts_and_paginates_like_official_api():
+    book = LotBook.from_payload({"total": 3, "lots": LOTS})
+
+    # Default: newest first
+    assert buyouts(book.page()) == [100, 300, 500]
+    assert buyouts(book.page(sort="buyout_price", order="asc")) == [100, 300, 500]
+    assert buyouts(book.page(sort="buyout_price", order="desc", limit=2)) == [
+        500,
+        300,
+    ]
+    assert buyouts(book.page(sort="buyout_price", order="desc", offset=2)) == [100]
+    assert buyouts(book.page(sort="time_left", order="asc")) == [100, 300, 500]
+    assert book.page(offset=10)["lots"] == []
+    assert book.page(limit=1)["total"] == 3
+
+
+def test_lot_book_current_price_falls_back_to_start_price():
+    book = LotBook.from_payload({"lots": LOTS})
+    page = book.page(sort="current_price", order="desc", limit=1)
+    assert page["lots"][0]["currentPrice"] == 150
+
+
+def test_additional_is_stripped_unless_requested():
+    book = LotBook.from_payload({"lots": LOTS})
+
+    assert all(lot["additional"] == {} for lot in book.page()["lots"])
+    assert book.page(additional=True, sort="buyout_price", order="asc", limit=1)[
+        "lots"
+    ][0]["additional"] == {"qlt": 3}
+    # Cached lots are not modified
+    assert LOTS[0]["additional"] == {"qlt": 1}
+
+
+def test_history_book_is_newest_first():
+    book = HistoryBook.from_payload(
+        {
+            "prices": [
+                {"amount": 1, "price": 10, "time": "2026-01-12T10:00:00Z"},
+                {"amount": 1, "price": 30, "time": "2026-01-12T12:00:00Z"},
+                {"amount": 1, "price": 20, "time": "2026-01-12T11:00:00Z"},
+            ]
+        }
+    )
+
+    page = book.page(limit=2, offset=1)
+    assert [sale["price"] for sale in page["prices"]] == [20, 10]
+    assert page["total"] == 3
+
+
+@pytest.mark.asyncio
+async def test_wiki_pages_are_served_from_one_download():
+    upstream_calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal upstream_calls
+        upstream_calls += 1
+        return httpx.Response(200, json={"total": 3, "lots": LOTS})
+
+    mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    test_settings = Settings(API_SOURCE="wiki", UPSTREAM_RATE_LIMIT_RPS=100.0)
+
+    with patch("app.clients.stalcraft.settings", test_settings), patch.object(
+        http_pool, "get", return_value=mock_client
+    ):
+        client = StalcraftAPIClient()
+        first = await client.get_auction_lots("EU", "y1q9", limit=2)
+        second = await client.get_auction_lots("EU", "y1q9", limit=2, offset=2)
+
+    assert upstream_calls == 1
+    assert buyouts(first) == [100, 300]
+    assert buyouts(second) == [500]
+    await mock_client.aclose()
@@ -22,6 +22,49 @@ class APIClient {
         }
     }
 
+    /**
+     * Subscribe to live lot-book updates (Server-Sent Events)
+     * The server polls the item once for all subscribers; no client-side timer
+     * @param {string} region - Region (eu, ru, na, sea)
+     * @param {string} itemId - Item ID
+     * @param {object} handlers - { onSnapshot(lotsData), onEvents(events), onError(error) }
+     * @returns {object} Subscription, call close() to unsubscribe
+     */
+    subscribeAuctionLots(region, itemId, { onSnapshot, onEvents, onError } = {}) {
+        const subscription = { source: null, close() { this.source.close(); } };
+
+        const connect = () => {
+            const source = new EventSource(`${API_BASE}/auction/${region}/${itemId}/stream`);
+            subscription.source = source;
+
+            source.addEventListener('snapshot', (event) => {
+                if (onSnapshot) onSnapshot(JSON.parse(event.data));
+            });
+            source.addEventListener('events', (event) => {
+                if (onEvents) onEvents(JSON.parse(event.data));
+            });
+            source.addEventListener('evicted', () => {
+                // Fell behind the stream: reconnect for a fresh snapshot
+                console.warn('Live feed evicted, reconnecting');
+                source.close();
+                connect();
+            });
+            source.onerror = (event) => {
+                if (!onError) return;
+                if (event.data) {
+                    // Server-sent "error" event: upstream poll failed, the stream stays open
+                    onError(new Error(JSON.parse(event.data).detail));
+                } else if (source.readyState === EventSource.CLOSED) {
+                    // EventSource reconnects by itself unless the server refused the stream
+                    onError(new Error('Live feed connection closed'));
+                }
+            };
+        };
+
+        connect();
+        return subscription;
+    }
+
     /**
      * Get auction history
      */
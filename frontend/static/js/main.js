@@ -20,6 +20,9 @@ const historyError = document.getElementById('history-error');
 
 const apiBadge = document. getElementById('api-badge');
 
+// Live lot feed of the selected item
+let lotsSubscription = null;
+
 /**
  * Load and display auction data
  */
@@ -34,16 +37,22 @@ async function loadAuctionData(region, itemId) {
     lotsLoading.style.display = 'block';
     historyLoading.style.display = 'block';
     
-    // Load lots
-    try {
-        const lotsData = await apiClient. getAuctionLots(region, itemId);
-        lotsLoading.style.display = 'none';
-        AuctionTable.renderLotsTable(lotsData.lots, lotsContainer);
-    } catch (error) {
-        lotsLoading. style.display = 'none';
-        lotsError.textContent = `Ошибка загрузки лотов: ${error.message}`;
-        lotsError.style.display = 'block';
+    // Subscribe to lots: the server pushes a new snapshot on every change
+    if (lotsSubscription) {
+        lotsSubscription.close();
     }
+    lotsSubscription = apiClient.subscribeAuctionLots(region, itemId, {
+        onSnapshot: (lotsData) => {
+            lotsLoading.style.display = 'none';
+            lotsError.style.display = 'none';
+            AuctionTable.renderLotsTable(lotsData.lots, lotsContainer);
+        },
+        onError: (error) => {
+            lotsLoading.style.display = 'none';
+            lotsError.textContent = `Ошибка загрузки лотов: ${error.message}`;
+            lotsError.style.display = 'block';
+        },
+    });
     
     // Load history
     try {
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк обработки ответа /lots на 200 лотов: обычный путь против fast path
+
+Обычный путь (AUCTION_RESPONSE_MODE=model):
+    response.json() -> AuctionLotsResponse(**data) -> FastAPI response_model
+    (повторная валидация + jsonable_encoder) -> json.dumps
+Fast path (AUCTION_RESPONSE_MODE=fast):
+    orjson.loads -> TypeAdapter.validate_python -> TypeAdapter.dump_json
+Passthrough (AUCTION_RESPONSE_MODE=passthrough):
+    orjson.loads -> orjson.dumps
+
+Запуск:
+    python scripts/benchmark_fast_path.py [--lots 200] [--runs 2000]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import timeit
+from pathlib import Path
+
+# Добавить backend в путь
+backend_path = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+# Import после изменения sys.path
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import TypeAdapter
+
+from app.models.auction import AuctionLotsResponse
+from app.utils import fastjson
+
+
+def make_payload(count: int) -> bytes:
+    """Ответ upstream в формате Stalcraft API"""
+    lots = [
+        {
+            "itemId": "y1q9",
+            "amount": 1 + i % 5,
+            "startPrice": 10000 + i,
+            "currentPrice": 12000 + i,
+            "buyoutPrice": 15000 + i,
+            "startTime": "2026-01-12T10:00:00Z",
+            "endTime": "2026-01-13T10:00:00Z",
+            "additional": {"qlt": i % 6, "ptn": i % 16},
+        }
+        for i in range(count)
+    ]
+    return json.dumps({"total": count, "lots": lots}).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lots", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=2000)
+    args = parser.parse_args()
+
+    body = make_payload(args.lots)
+    response_field = create_response_field("response", AuctionLotsResponse)
+    adapter = TypeAdapter(AuctionLotsResponse)
+
+    # serialize_response is async (as it is called inside FastAPI routing)
+    loop = asyncio.new_event_loop()
+
+    def model_path() -> bytes:
+        data = json.loads(body)
+        model = AuctionLotsResponse(**data)
+        content = loop.run_until_complete(
+            serialize_response(field=response_field, response_content=model)
+        )
+        return json.dumps(jsonable_encoder(content)).encode()
+
+    def fast_path() -> bytes:
+        return adapter.dump_json(adapter.validate_python(fastjson.loads(body)))
+
+    def passthrough_path() -> bytes:
+        return fastjson.dumps(fastjson.loads(body))
+
+    # Sanity check: fast path produces the same document
+    assert json.loads(fast_path()) == json.loads(model_path())
+
+    print(f"JSON backend: {fastjson.backend()}")
+    print(f"Payload: {args.lots} lots, {len(body)} bytes, {args.runs} runs\n")
+
+    baseline = None
+    for name, fn in [
+        ("model (before)", model_path),
+        ("fast", fast_path),
+        ("passthrough", passthrough_path),
+    ]:
+        seconds = min(timeit.repeat(fn, number=args.runs, repeat=3)) / args.runs
+        baseline = baseline or seconds
+        print(
+            f"{name:<16} {seconds * 1e6:9.1f} µs/response"
+            f"   x{baseline / seconds:5.1f}"
+        )
+
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк поиска предметов: линейный проход против n-gram индекса
+
+Линейный проход (до этого изменения): до четырёх проверок подстроки на
+каждый предмет realm на каждый запрос. Индекс: ItemsDatabaseManager.search
+поверх NgramIndex (строится один раз при загрузке/обновлении).
+
+Использует закешированный индекс (backend/data/items_cache/search_index.json),
+если он есть, иначе синтетические предметы.
+
+Запуск:
+    python scripts/benchmark_item_search.py [--items 10000] [--runs 200]
+"""
+import argparse
+import random
+import sys
+import time
+import timeit
+from pathlib import Path
+
+# Добавить backend в путь
+backend_path = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+# Import после изменения sys.path
+from app.services.items_database_manager import (
+    ItemsDatabaseManager,
+    build_item_entry,
+)
+
+QUERIES = ["а", "ак", "вин", "винтовка", "rifle", "ar15", "броня", "zzz", "1"]
+
+
+def make_items(count: int) -> list[dict]:
+    """Синтетические предметы с русскими и английскими названиями"""
+    rng = random.Random(42)
+    ru = ["Винтовка", "Броня", "Аптечка", "Граната", "Артефакт", "Пистолет", "Ключ"]
+    en = ["Rifle", "Armor", "Medkit", "Grenade", "Artefact", "Pistol", "Key"]
+    items = []
+    for i in range(count):
+        kind = rng.randrange(len(ru))
+        suffix = f"{rng.choice('АБВГДЕ')}-{rng.randrange(100)}"
+        data = {
+            "name": {
+                "type": "translation",
+                "lines": {"ru": f"{ru[kind]} {suffix}", "en": f"{en[kind]} {suffix}"},
+            }
+        }
+        items.append(build_item_entry(data, "ru", "misc", f"sub/{i:05x}", ""))
+    return items
+
+
+def linear_search(items: list[dict], query: str, limit: int) -> list[dict]:
+    """ItemsDatabaseManager.search до n-gram индекса"""
+    query_lower = query.lower()
+    results = []
+    for item in items:
+        if (
+            query_lower in item["name_lower"]
+            or query_lower in item["id"].lower()
+            or (item["name_ru"] and query_lower in item["name_ru"])
+            or (item["name_en"] and query_lower in item["name_en"])
+        ):
+            results.append(item)
+            if len(results) >= limit:
+                break
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    manager = ItemsDatabaseManager()
+    manager.index_file = backend_path / "data" / "items_cache" / "search_index.json"
+    manager.metadata_file = manager.index_file.with_name("metadata.json")
+    if manager.index_file.exists() and manager.metadata_file.exists():
+        manager._load_from_cache()
+        realm = max(manager.search_index, key=lambda r: len(manager.search_index[r]))
+        source = f"cache, realm {realm}"
+    else:
+        realm = "ru"
+        manager.search_index[realm] = make_items(args.items)
+        source = "synthetic"
+    items = manager.search_index[realm]
+
+    started = time.perf_counter()
+    manager._build_ngram_index(realm)
+    build_ms = (time.perf_counter() - started) * 1e3
+
+    print(f"Items: {len(items)} ({source}), limit {args.limit}, {args.runs} runs")
+    print(f"Index build: {build_ms:.1f} ms\n")
+    print(f"{'query':<12} {'linear':>12} {'index':>12}")
+
+    for query in QUERIES:
+        # Sanity check: same results
+        expected = [item["id"] for item in linear_search(items, query, args.limit)]
+        found = [item["id"] for item in manager.search(query, realm, args.limit)]
+        assert found == expected, query
+
+        times = []
+        for fn in [
+            lambda: linear_search(items, query, args.limit),
+            lambda: manager.search(query, realm, args.limit),
+        ]:
+            seconds = min(timeit.repeat(fn, number=args.runs, repeat=3)) / args.runs
+            times.append(seconds)
+        print(
+            f"{query:<12} {times[0] * 1e6:9.1f} µs {times[1] * 1e6:9.1f} µs"
+            f"   x{times[0] / times[1]:6.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()